@@ -12,7 +12,8 @@ import logging
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 from collectors.review_collector import ReviewCollector
-from utils.database import ReviewDatabase
+from collectors.async_review_collector import AsyncReviewCollector
+from utils.database import get_database
 from utils.notifications import EmailNotifier
 from config.settings import Config
 
@@ -34,9 +35,9 @@ def main():
     
     # Initialize components
     config = Config()
-    db = ReviewDatabase()
+    db = get_database()
     notifier = EmailNotifier()
-    collector = ReviewCollector(config)
+    collector = AsyncReviewCollector() if config.use_async_collector else ReviewCollector()
     
     logger.info(f"Starting automated review collection for {run_date}")
     
@@ -108,6 +109,10 @@ def main():
             logger.error(f"Failed to send error notification: {email_error}")
         
         raise
+    
+    finally:
+        collector.db.close()
+        db.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
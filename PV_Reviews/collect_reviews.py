@@ -7,7 +7,12 @@ from pathlib import Path
 # Add src to Python path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from collectors.review_collector import main
+from config.settings import config
+
+if config.use_async_collector:
+    from collectors.async_review_collector import main
+else:
+    from collectors.review_collector import main
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
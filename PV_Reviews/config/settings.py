@@ -7,6 +7,16 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+@dataclass(frozen=True)
+class Listing:
+    """A Google Business listing (outlet) to collect reviews for."""
+    
+    name: str
+    listing_id: str
+    url: str
+    shard_filters: tuple = ()  # Overrides Config.shard_filters for this listing
+    max_tabs: int = 0  # Tabs this listing may have open at once (0 = shard_concurrency)
+
 @dataclass
 class Config:
     """Application configuration."""
@@ -21,10 +31,13 @@ class Config:
     supabase_anon_key: str = os.getenv('SUPABASE_ANON_KEY', '')
     supabase_service_key: str = os.getenv('SUPABASE_SERVICE_KEY', '')
     use_database: bool = True  # Switch between CSV and database modes
+    storage_backend: str = os.getenv('STORAGE_BACKEND', 'supabase')  # Database mode store: "supabase" or "sqlite" (local file at sqlite_path)
+    sqlite_path: Path = Path(__file__).parent.parent / "data" / "reviews.db"
     
     # Business Details
     business_listing_id: str = "11382416837896137085"
     business_url: str = "https://g.co/kgs/HgU3VjS"
+    listings: tuple = ()  # Listing entries to collect; empty = just the listing above
     
     # Browser Settings
     headless: bool = False  # Google auth requires visible browser
@@ -32,12 +45,66 @@ class Config:
     viewport_width: int = 1920
     viewport_height: int = 1080
     
+    # Session Reuse
+    session_encryption_key: str = os.getenv('SESSION_ENCRYPTION_KEY', '')
+    session_state_path: Path = Path(__file__).parent.parent / "data" / "google_session.enc"
+    session_probe_url: str = "https://myaccount.google.com/"
+    headless_with_session: bool = True  # A valid saved session needs no visible login
+    
+    # Resource Blocking (applied after login)
+    block_resources: bool = True
+    blocked_resource_types: tuple = ('image', 'media', 'font')
+    blocked_url_patterns: tuple = (
+        'google-analytics.com', 'googletagmanager.com', 'doubleclick.net',
+        '/gen_204', '/log?', 'play.google.com/log', '/jserror'
+    )
+    
     # Data Settings  
     data_dir: Path = Path(__file__).parent.parent / "data"
     max_reviews: int = 1000  # Increased to collect all reviews
     batch_size: int = 25
     batch_delay_mins: int = 15
     
+    # Extraction
+    use_async_collector: bool = os.getenv('USE_ASYNC_COLLECTOR', 'false').lower() == 'true'  # Use AsyncReviewCollector (playwright.async_api)
+    extraction_mode: str = "bulk"  # "bulk" (single evaluate call), "snapshot" (parse dumped HTML), "network" (decode XHR payloads) or "locator" (per-field locators)
+    extraction_benchmark_sample: int = 0  # Cards to re-extract with the locator path for timing comparison
+    expand_timeout_ms: int = 5000  # Wait for expanded "read more" texts to render after the batch expansion pass
+    flush_every: int = 50  # Records per database/CSV flush and checkpoint
+    checkpoint_max_age_hours: int = 24  # Older checkpoints are treated as abandoned
+    detect_edits: bool = True  # Database mode: re-read known reviews on loaded pages so edits are caught by content hash
+    incremental_collection: bool = True  # Stop paginating once pages only contain known review IDs
+    incremental_stale_pages: int = 2  # Consecutive pages without new IDs before stopping
+    selector_probe_timeout_ms: int = 1500  # Longest wait on one selector candidate before trying the next
+    card_budget_min_ms: int = 2000  # Floor of the adaptive per-card budget (per-field extraction)
+    card_budget_max_ms: int = 15000  # Ceiling of the budget; also the budget of deferred-card retries
+    card_budget_multiplier: float = 3.0  # Budget = multiplier x p90 of recent card latencies
+    card_budget_window: int = 50  # Recent cards the budget is computed from
+    
+    # Pagination waits (milliseconds)
+    pagination_card_timeout_ms: int = 10000  # Wait for the card count to go up
+    pagination_button_timeout_ms: int = 2000  # Wait for "More Reviews" to disappear
+    pagination_stale_attempts: int = 2  # Attempts in a row with no new cards (button still shown) before stopping
+    pagination_xhr_timeout_ms: int = 10000  # Wait for the reviews XHR after a click
+    review_xhr_pattern: str = "batchexecute"  # URL fragment of the reviews XHR
+    
+    # Sharded Collection
+    shard_filters: tuple = ()  # Extra filter button labels in the reviews panel, one tab per label (empty = single list)
+    shard_concurrency: int = 3  # Tabs paginated at the same time, across all listings and shards
+    
+    # Full-History Sync
+    collection_mode: str = os.getenv('COLLECTION_MODE', 'unreplied')  # "unreplied" (Unreplied filter) or "sync" (all reviews, newest first, down to the sync cursor)
+    sync_max_pages: int = 300  # Pagination cap of a sync run; a first sync walks the whole history
+    
+    # Network Extraction
+    network_sample_size: int = 20  # DOM cards used to calibrate and cross-check payload decoding
+    network_min_agreement: float = 0.8  # Share of sample cards a field must match to be trusted
+    
+    # Failure Debugging (written to data/debug only when extraction fails)
+    failure_buffer_size: int = 20  # Recent incomplete cards whose HTML is kept in memory
+    failure_tracing: bool = False  # Record a Playwright trace, kept only for failed runs
+    debug_max_bytes: int = 50 * 1024 * 1024  # Oldest debug files are removed beyond this
+    
     # Response Generation
     claude_model: str = "claude-3-5-sonnet-20241022"
     response_max_tokens: int = 600
@@ -47,8 +114,10 @@ class Config:
     review_cutoff_weeks: int = 16
 
     def __post_init__(self):
-        """Ensure data directory exists."""
+        """Ensure data directory exists and there is at least one listing."""
         self.data_dir.mkdir(exist_ok=True)
+        if not self.listings:
+            self.listings = (Listing('main', self.business_listing_id, self.business_url),)
 
 # Global config instance
 config = Config()
\ No newline at end of file
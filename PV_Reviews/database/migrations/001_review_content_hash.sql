@@ -0,0 +1,8 @@
+-- Content-hash change detection for edited reviews
+-- Run in the Supabase SQL Editor on databases created before these columns were added to schema.sql.
+-- Existing rows get their hash on the next collection that sees them, without being flagged as edited.
+
+ALTER TABLE reviews ADD COLUMN IF NOT EXISTS content_hash TEXT;
+ALTER TABLE reviews ADD COLUMN IF NOT EXISTS is_edited BOOLEAN DEFAULT FALSE;
+
+CREATE INDEX IF NOT EXISTS idx_reviews_is_edited ON reviews(is_edited) WHERE is_edited;
@@ -0,0 +1,16 @@
+-- Full-history sync: owner replies and the per-listing sync cursor
+-- Run in the Supabase SQL Editor on databases created before these were added to schema.sql.
+
+ALTER TABLE reviews ADD COLUMN IF NOT EXISTS owner_reply_text TEXT;
+
+CREATE TABLE IF NOT EXISTS sync_cursors (
+    listing_id TEXT PRIMARY KEY,
+    review_id TEXT NOT NULL,
+    review_time TEXT,
+    synced_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE sync_cursors ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role can access all sync cursors" ON sync_cursors
+    FOR ALL USING (auth.role() = 'service_role');
@@ -0,0 +1,4 @@
+-- Local review-ID index: keyset paging over (updated_at, review_id)
+-- Run in the Supabase SQL Editor on databases created before this was added to schema.sql.
+
+CREATE INDEX IF NOT EXISTS idx_reviews_updated_at_review_id ON reviews(updated_at, review_id);
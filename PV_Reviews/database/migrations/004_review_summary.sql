@@ -0,0 +1,48 @@
+-- Run summary computed in the database: exact counts and recent runs in one call
+-- Run in the Supabase SQL Editor on databases created before this was added to schema.sql.
+
+CREATE OR REPLACE FUNCTION get_review_summary(days INTEGER DEFAULT 7)
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'total_reviews', (SELECT COUNT(*) FROM reviews),
+        'unreplied_reviews', (SELECT COUNT(*) FROM reviews WHERE NOT has_response),
+        'reviews_by_rating', (
+            SELECT COALESCE(jsonb_object_agg(rating, total), '{}'::jsonb)
+            FROM (SELECT rating, COUNT(*) AS total FROM reviews GROUP BY rating) ratings
+        ),
+        'responses_by_sentiment', (
+            SELECT COALESCE(jsonb_object_agg(sentiment, total), '{}'::jsonb)
+            FROM (
+                SELECT COALESCE(NULLIF(sentiment, ''), 'unknown') AS sentiment, COUNT(*) AS total
+                FROM review_responses GROUP BY 1
+            ) sentiments
+        ),
+        'responses_by_status', (
+            SELECT COALESCE(jsonb_object_agg(status, total), '{}'::jsonb)
+            FROM (
+                SELECT COALESCE(status, 'unknown') AS status, COUNT(*) AS total
+                FROM review_responses GROUP BY 1
+            ) statuses
+        ),
+        -- Only the log fields reports show, newest first, without the bulky metadata
+        'recent_runs', (
+            SELECT COALESCE(jsonb_agg(run ORDER BY started_at DESC), '[]'::jsonb)
+            FROM (
+                SELECT started_at, jsonb_build_object(
+                    'process_type', process_type,
+                    'status', status,
+                    'started_at', started_at,
+                    'run_date', COALESCE(metadata->>'run_date', started_at::TEXT),
+                    'reviews_collected', reviews_processed,
+                    'new_reviews', COALESCE((metadata->>'new_reviews')::INTEGER, 0),
+                    'duration_seconds', COALESCE((metadata->>'duration_seconds')::NUMERIC, 0),
+                    'error_message', error_message
+                ) AS run
+                FROM processing_logs
+                WHERE started_at >= NOW() - make_interval(days => days)
+                ORDER BY started_at DESC
+                LIMIT 50
+            ) recent
+        )
+    );
+$$ LANGUAGE sql STABLE;
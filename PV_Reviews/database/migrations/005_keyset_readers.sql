@@ -0,0 +1,5 @@
+-- Keyset-paged readers: newest-first scans of unreplied reviews and pending responses
+-- Run in the Supabase SQL Editor on databases created before these were added to schema.sql.
+
+CREATE INDEX IF NOT EXISTS idx_reviews_unreplied_keyset ON reviews(created_at DESC, id DESC) WHERE NOT has_response;
+CREATE INDEX IF NOT EXISTS idx_review_responses_pending_keyset ON review_responses(generated_at DESC, id DESC) WHERE status = 'generated';
@@ -0,0 +1,19 @@
+-- Save generated responses and flag their reviews in one transaction
+-- Run in the Supabase SQL Editor on databases created before this was added to schema.sql.
+
+CREATE OR REPLACE FUNCTION save_review_responses(responses JSONB)
+RETURNS INTEGER AS $$
+BEGIN
+    -- responses: [{review_id, response_text, sentiment, issues}, ...]
+    WITH inserted AS (
+        INSERT INTO review_responses (review_id, response_text, sentiment, issues, status)
+        SELECT r.review_id, r.response_text, COALESCE(r.sentiment, ''), COALESCE(r.issues, ''), 'generated'
+        FROM jsonb_to_recordset(responses) AS r(review_id TEXT, response_text TEXT, sentiment TEXT, issues TEXT)
+        RETURNING review_id
+    )
+    UPDATE reviews SET has_response = TRUE
+    WHERE review_id IN (SELECT review_id FROM inserted);
+
+    RETURN jsonb_array_length(responses);
+END;
+$$ LANGUAGE plpgsql;
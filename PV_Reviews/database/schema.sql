@@ -3,6 +3,7 @@
 DROP TABLE IF EXISTS review_responses;
 DROP TABLE IF EXISTS reviews;
 DROP TABLE IF EXISTS processing_logs;
+DROP TABLE IF EXISTS sync_cursors;
 
 -- Reviews table - stores all scraped reviews
 CREATE TABLE reviews (
@@ -26,6 +27,9 @@ CREATE TABLE reviews (
     atmosphere_rating INTEGER,
     images TEXT[],                   -- Array of image URLs
     has_response BOOLEAN DEFAULT FALSE,
+    content_hash TEXT,               -- sha256 of rating, text and sub-ratings
+    is_edited BOOLEAN DEFAULT FALSE, -- Content changed after it was first collected
+    owner_reply_text TEXT,           -- Reply shown on Google, captured by full-history sync
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -58,12 +62,24 @@ CREATE TABLE processing_logs (
     metadata JSONB                   -- Additional process-specific data
 );
 
+-- Sync cursors - newest review seen per listing by the last full-history sync
+CREATE TABLE sync_cursors (
+    listing_id TEXT PRIMARY KEY,
+    review_id TEXT NOT NULL,
+    review_time TEXT,                -- Relative time string from Google, for reference
+    synced_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
 -- Indexes for performance
 CREATE INDEX idx_reviews_review_id ON reviews(review_id);
 CREATE INDEX idx_reviews_has_response ON reviews(has_response);
 CREATE INDEX idx_reviews_created_at ON reviews(created_at DESC);
+CREATE INDEX idx_reviews_is_edited ON reviews(is_edited) WHERE is_edited;
+CREATE INDEX idx_reviews_updated_at_review_id ON reviews(updated_at, review_id);
+CREATE INDEX idx_reviews_unreplied_keyset ON reviews(created_at DESC, id DESC) WHERE NOT has_response;
 CREATE INDEX idx_review_responses_review_id ON review_responses(review_id);
 CREATE INDEX idx_review_responses_status ON review_responses(status);
+CREATE INDEX idx_review_responses_pending_keyset ON review_responses(generated_at DESC, id DESC) WHERE status = 'generated';
 CREATE INDEX idx_processing_logs_process_type ON processing_logs(process_type);
 CREATE INDEX idx_processing_logs_started_at ON processing_logs(started_at DESC);
 
@@ -71,6 +87,7 @@ CREATE INDEX idx_processing_logs_started_at ON processing_logs(started_at DESC);
 ALTER TABLE reviews ENABLE ROW LEVEL SECURITY;
 ALTER TABLE review_responses ENABLE ROW LEVEL SECURITY;
 ALTER TABLE processing_logs ENABLE ROW LEVEL SECURITY;
+ALTER TABLE sync_cursors ENABLE ROW LEVEL SECURITY;
 
 -- Create policies to allow service role full access
 CREATE POLICY "Service role can access all reviews" ON reviews
@@ -82,6 +99,9 @@ CREATE POLICY "Service role can access all responses" ON review_responses
 CREATE POLICY "Service role can access all logs" ON processing_logs
     FOR ALL USING (auth.role() = 'service_role');
 
+CREATE POLICY "Service role can access all sync cursors" ON sync_cursors
+    FOR ALL USING (auth.role() = 'service_role');
+
 -- Function to update the updated_at column
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -93,4 +113,69 @@ $$ language 'plpgsql';
 
 -- Trigger to automatically update updated_at
 CREATE TRIGGER update_reviews_updated_at BEFORE UPDATE ON reviews
-    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
\ No newline at end of file
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Run summary for reports: exact counts by rating, sentiment and status plus recent runs
+CREATE OR REPLACE FUNCTION get_review_summary(days INTEGER DEFAULT 7)
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'total_reviews', (SELECT COUNT(*) FROM reviews),
+        'unreplied_reviews', (SELECT COUNT(*) FROM reviews WHERE NOT has_response),
+        'reviews_by_rating', (
+            SELECT COALESCE(jsonb_object_agg(rating, total), '{}'::jsonb)
+            FROM (SELECT rating, COUNT(*) AS total FROM reviews GROUP BY rating) ratings
+        ),
+        'responses_by_sentiment', (
+            SELECT COALESCE(jsonb_object_agg(sentiment, total), '{}'::jsonb)
+            FROM (
+                SELECT COALESCE(NULLIF(sentiment, ''), 'unknown') AS sentiment, COUNT(*) AS total
+                FROM review_responses GROUP BY 1
+            ) sentiments
+        ),
+        'responses_by_status', (
+            SELECT COALESCE(jsonb_object_agg(status, total), '{}'::jsonb)
+            FROM (
+                SELECT COALESCE(status, 'unknown') AS status, COUNT(*) AS total
+                FROM review_responses GROUP BY 1
+            ) statuses
+        ),
+        -- Only the log fields reports show, newest first, without the bulky metadata
+        'recent_runs', (
+            SELECT COALESCE(jsonb_agg(run ORDER BY started_at DESC), '[]'::jsonb)
+            FROM (
+                SELECT started_at, jsonb_build_object(
+                    'process_type', process_type,
+                    'status', status,
+                    'started_at', started_at,
+                    'run_date', COALESCE(metadata->>'run_date', started_at::TEXT),
+                    'reviews_collected', reviews_processed,
+                    'new_reviews', COALESCE((metadata->>'new_reviews')::INTEGER, 0),
+                    'duration_seconds', COALESCE((metadata->>'duration_seconds')::NUMERIC, 0),
+                    'error_message', error_message
+                ) AS run
+                FROM processing_logs
+                WHERE started_at >= NOW() - make_interval(days => days)
+                ORDER BY started_at DESC
+                LIMIT 50
+            ) recent
+        )
+    );
+$$ LANGUAGE sql STABLE;
+
+-- Save generated responses and flag their reviews atomically; takes a JSON array of responses
+CREATE OR REPLACE FUNCTION save_review_responses(responses JSONB)
+RETURNS INTEGER AS $$
+BEGIN
+    -- responses: [{review_id, response_text, sentiment, issues}, ...]
+    WITH inserted AS (
+        INSERT INTO review_responses (review_id, response_text, sentiment, issues, status)
+        SELECT r.review_id, r.response_text, COALESCE(r.sentiment, ''), COALESCE(r.issues, ''), 'generated'
+        FROM jsonb_to_recordset(responses) AS r(review_id TEXT, response_text TEXT, sentiment TEXT, issues TEXT)
+        RETURNING review_id
+    )
+    UPDATE reviews SET has_response = TRUE
+    WHERE review_id IN (SELECT review_id FROM inserted);
+
+    RETURN jsonb_array_length(responses);
+END;
+$$ LANGUAGE plpgsql;
\ No newline at end of file
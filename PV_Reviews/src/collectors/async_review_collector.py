@@ -0,0 +1,760 @@
+"""Asyncio variant of the review collector built on playwright.async_api.
+
+Reads the fields of a card concurrently, paginates shard tabs concurrently,
+and hands extracted reviews to a writer task so database/CSV flushes overlap
+with extraction of the next cards. collect_unreplied_reviews() keeps the
+ReviewCollector return contract, so callers can switch with
+USE_ASYNC_COLLECTOR.
+"""
+import asyncio
+import random
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import sys
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from playwright.async_api import (
+    async_playwright, Browser, BrowserContext, Page, FrameLocator, TimeoutError as PlaywrightTimeoutError
+)
+
+from config.settings import Listing, config
+from src.utils.database import get_database
+from src.utils.session_store import SessionStore
+from src.utils.resource_policy import ResourcePolicy
+from src.utils.checkpoint import CollectionCheckpoint
+from src.utils.failure_recorder import FailureRecorder
+from src.utils.selector_registry import SelectorRegistry
+from src.utils.budget import BudgetExceeded, CardBudget, CardDeadline
+from src.utils.sync_cursor import SyncCursor
+from src.utils.timing import RunTimer
+from src.collectors.review_record import build_review_record, is_complete
+from src.collectors.snapshot_parser import SnapshotParser
+from src.collectors.review_collector import (
+    BULK_EXTRACT_JS, EXPAND_ALL_JS, OWNER_REPLY_JS, EXPANDED_TEXT_SELECTOR, MAX_PAGINATION_ATTEMPTS, POPUP_CLOSE_SELECTORS,
+    REVIEW_IDS_JS, ReviewCollector, logger, mark_partial
+)
+
+IMAGE_SOURCES_JS = "els => els.map(el => el.getAttribute('src')).filter(Boolean)"
+
+
+class AsyncGoogleAuthenticator:
+    """Async counterpart of GoogleAuthenticator, sharing its saved session."""
+
+    def __init__(self, session_store: Optional[SessionStore] = None):
+        self.session_store = session_store or SessionStore()
+
+    async def open_session(self, playwright) -> Optional[Tuple[Browser, BrowserContext, Page]]:
+        """Launch a browser with an authenticated context, reusing a saved session when valid."""
+        state = self.session_store.load()
+        if state:
+            browser, context, page = await self._launch(
+                playwright, config.headless or config.headless_with_session, storage_state=state
+            )
+            if await self.is_session_valid(page):
+                logger.info("Reusing saved Google session")
+                return browser, context, page
+
+            logger.info("Saved Google session is no longer valid - doing full login")
+            await browser.close()
+            self.session_store.clear()
+
+        browser, context, page = await self._launch(playwright, config.headless)
+        if not await self.authenticate(page):
+            await browser.close()
+            return None
+
+        await self.save_session(context)
+        return browser, context, page
+
+    async def is_session_valid(self, page: Page) -> bool:
+        """Cheap probe: a signed-in session is not redirected to the sign-in page."""
+        try:
+            await page.goto(config.session_probe_url, timeout=20000)
+            return 'accounts.google.com' not in page.url
+        except Exception as e:
+            logger.warning(f"Session probe failed: {e}")
+            return False
+
+    async def save_session(self, context: BrowserContext) -> None:
+        """Persist the context's cookies and storage for the next run."""
+        if self.session_store.enabled and self.session_store.save(await context.storage_state()):
+            logger.info("Saved Google session")
+
+    async def _launch(self, playwright, headless: bool,
+                      storage_state: Optional[Dict] = None) -> Tuple[Browser, BrowserContext, Page]:
+        """Launch Chromium and open a page in a fresh context."""
+        browser = await playwright.chromium.launch(
+            headless=headless,
+            args=['--disable-blink-features=AutomationControlled']
+        )
+        context = await browser.new_context(
+            user_agent=config.user_agent,
+            viewport={'width': config.viewport_width, 'height': config.viewport_height},
+            storage_state=storage_state,
+            # Service workers would bypass the resource policy's routes
+            service_workers='block' if config.block_resources else 'allow'
+        )
+        return browser, context, await context.new_page()
+
+    async def authenticate(self, page: Page) -> bool:
+        """Authenticate with Google account."""
+        try:
+            logger.info("Starting Google authentication")
+            await page.goto('https://accounts.google.com/')
+            await asyncio.sleep(random.uniform(2, 5))
+
+            # Fill email
+            await page.locator('input[type="email"]').fill(config.google_email)
+            await page.click('button:has-text("Next")')
+            await page.wait_for_selector('input[type="password"]', timeout=30000)
+
+            # Fill password
+            await page.locator('input[type="password"]').fill(config.google_password)
+            await page.click('button:has-text("Next")')
+
+            # Handle any popup windows that might appear
+            await asyncio.sleep(3)
+            for selector in POPUP_CLOSE_SELECTORS:
+                try:
+                    close_btn = page.locator(selector).first
+                    if await close_btn.is_visible(timeout=2000):
+                        await close_btn.click()
+                        logger.info(f"Closed popup using selector: {selector}")
+                        await asyncio.sleep(1)
+                        break
+                except Exception:
+                    continue
+
+            # Wait for authentication
+            await page.wait_for_url('https://myaccount.google.com/?pli=1', timeout=60000)
+            logger.info("Google authentication successful")
+            return True
+
+        except Exception as e:
+            logger.error(f"Authentication failed: {e}")
+            return False
+
+
+class AsyncReviewExtractor:
+    """Async counterpart of ReviewExtractor (bulk, snapshot and locator modes)."""
+
+    def __init__(self):
+        self.failure_recorder = FailureRecorder()
+        self.timer = RunTimer()
+        self.selectors = SelectorRegistry()
+        self.budget = CardBudget()
+        self.cursors: Dict[str, str] = {}  # listing_id -> sync cursor review ID, in sync mode
+
+    async def open_reviews(self, page: Page, stats: Dict, label: Optional[str] = None,
+                           listing: Optional[Listing] = None) -> Optional[FrameLocator]:
+        """Open a listing's Unreplied list (all reviews in sync mode), optionally narrowed by a shard filter button."""
+        listing = listing or config.listings[0]
+        try:
+            logger.info(f"Navigating to reviews page of {listing.name}")
+            await page.goto(listing.url, timeout=20000)
+
+            # Handle "Not Now" button if present
+            try:
+                not_now_button = page.locator('g-raised-button:has-text("Not now")')
+                if await not_now_button.is_visible():
+                    await not_now_button.click()
+                    logger.info("Dismissed 'Not Now' popup")
+            except Exception:
+                pass
+
+            read_reviews_button = await self.selectors.find_async(page, 'read_reviews', wait=True)
+            if not read_reviews_button:
+                raise RuntimeError("'Read reviews' button not found")
+            await read_reviews_button.first.click()
+            logger.info("Opened reviews panel")
+            await asyncio.sleep(random.uniform(2, 4))
+
+            iframe_locator = page.frame_locator(f'iframe[src*="/local/business/{listing.listing_id}/customers/reviews"]')
+            if config.collection_mode == 'sync':
+                stats['cursor_review_id'] = self.cursors.get(listing.listing_id)
+                logger.info(f"Syncing all reviews down to cursor {stats['cursor_review_id']}")
+            else:
+                unreplied_button = await self.selectors.find_async(iframe_locator, 'unreplied_filter', wait=True)
+                if not unreplied_button:
+                    raise RuntimeError("'Unreplied' filter not found")
+                await unreplied_button.first.click()
+                logger.info("Applied 'Unreplied' filter")
+
+            if label:
+                await self._click_and_wait_for_xhr(page, iframe_locator.locator(f'button:has-text("{label}")').first, stats)
+                logger.info(f"Applied shard filter '{label}'")
+
+            await self._wait_for_signal(
+                'initial_cards',
+                lambda timeout: iframe_locator.locator('div.noyJyc').first.wait_for(timeout=timeout),
+                config.pagination_card_timeout_ms,
+                stats
+            )
+            return iframe_locator
+
+        except Exception as e:
+            logger.error(f"Failed to navigate to reviews: {e}")
+            return None
+
+    async def load_all_reviews(self, page: Page, iframe_locator: FrameLocator, stats: Dict,
+                               known_ids: Optional[set] = None) -> None:
+        """Paginate until exhausted, stalled, the attempt cap, the incremental watermark or the sync cursor."""
+        incremental = config.incremental_collection and known_ids is not None
+        stats.update({
+            'incremental': incremental,
+            'pages_loaded': 0,
+            'cards_loaded': 0,
+            'new_ids_seen': 0,
+            'stop_reason': 'max_attempts',
+            'last_new_review_id': None
+        })
+        cards = iframe_locator.locator('div.noyJyc')
+        more_reviews_button = iframe_locator.locator('button[aria-label="More Reviews"]')
+        try:
+            stale_pages = 0
+            stalled_attempts = 0
+            checked_count = 0
+            watch = incremental or stats.get('cursor_review_id')
+            if watch:
+                checked_count, has_new = await self._check_watermark(iframe_locator, known_ids, checked_count, stats)
+                stale_pages = 0 if has_new else 1
+
+            max_pages = config.sync_max_pages if config.collection_mode == 'sync' else MAX_PAGINATION_ATTEMPTS
+            for attempt in range(1, max_pages + 1):
+                if 'cursor_index' in stats:
+                    stats['stop_reason'] = 'cursor'
+                    break
+                if incremental and stale_pages >= config.incremental_stale_pages:
+                    stats['stop_reason'] = 'watermark'
+                    break
+
+                initial_count = await cards.count()
+                if await more_reviews_button.count() > 0 and await more_reviews_button.first.is_visible():
+                    logger.info(f"Clicking 'More Reviews' button (attempt {attempt})")
+                    await self._click_and_wait_for_xhr(page, more_reviews_button.first, stats)
+                else:
+                    try:
+                        await cards.last.scroll_into_view_if_needed(timeout=3000)
+                    except PlaywrightTimeoutError:
+                        pass
+
+                if await self._wait_for_signal(
+                    'card_count',
+                    lambda timeout: cards.nth(initial_count).wait_for(state='attached', timeout=timeout),
+                    config.pagination_card_timeout_ms,
+                    stats
+                ):
+                    stats['pages_loaded'] += 1
+                    stalled_attempts = 0
+                    if watch:
+                        checked_count, has_new = await self._check_watermark(iframe_locator, known_ids, checked_count, stats)
+                        stale_pages = 0 if has_new else stale_pages + 1
+                elif await self._wait_for_signal(
+                    'button_hidden',
+                    lambda timeout: more_reviews_button.first.wait_for(state='hidden', timeout=timeout),
+                    config.pagination_button_timeout_ms,
+                    stats
+                ):
+                    stats['stop_reason'] = 'exhausted'
+                    break
+                else:
+                    stalled_attempts += 1
+                    if stalled_attempts >= config.pagination_stale_attempts:
+                        logger.warning(f"Stopping pagination: {stalled_attempts} attempts loaded no new cards")
+                        stats['stop_reason'] = 'stalled'
+                        break
+
+        except Exception as e:
+            logger.warning(f"Error during pagination: {e}")
+            stats['stop_reason'] = 'error'
+            self.failure_recorder.dump(f"pagination error: {e}")
+
+        try:
+            stats['cards_loaded'] = await cards.count()
+        except Exception:
+            pass
+        logger.info(f"Pagination stopped ({stats['stop_reason']}): {stats}")
+
+    async def _click_and_wait_for_xhr(self, page: Page, button, stats: Dict) -> None:
+        """Click a pagination button and wait for the reviews XHR it triggers."""
+        start = time.perf_counter()
+        try:
+            async with page.expect_response(
+                lambda response: config.review_xhr_pattern in response.url,
+                timeout=config.pagination_xhr_timeout_ms
+            ):
+                await button.click()
+            self._record_wait('xhr', start, True, stats)
+        except PlaywrightTimeoutError:
+            self._record_wait('xhr', start, False, stats)
+
+    async def _wait_for_signal(self, name: str, wait, timeout_ms: int, stats: Dict) -> bool:
+        """Run a Playwright wait with its own timeout and record how long it took."""
+        start = time.perf_counter()
+        try:
+            await wait(timeout_ms)
+            self._record_wait(name, start, True, stats)
+            return True
+        except PlaywrightTimeoutError:
+            self._record_wait(name, start, False, stats)
+            return False
+
+    def _record_wait(self, name: str, start: float, satisfied: bool, stats: Dict) -> None:
+        """Add a single wait to the pagination wait totals."""
+        elapsed = time.perf_counter() - start
+        totals = stats.setdefault('waits', {}).setdefault(name, {'count': 0, 'timeouts': 0, 'seconds': 0.0})
+        totals['count'] += 1
+        totals['seconds'] = round(totals['seconds'] + elapsed, 3)
+        if not satisfied:
+            totals['timeouts'] += 1
+
+    async def _check_watermark(self, iframe_locator, known_ids: Optional[set], checked_count: int,
+                               stats: Dict) -> Tuple[int, bool]:
+        """Check review IDs loaded since checked_count against the known-ID set (and the sync cursor)."""
+        review_ids = await iframe_locator.locator('div.noyJyc div.KuKPRc').evaluate_all(REVIEW_IDS_JS)
+        new_ids = [review_id for review_id in review_ids[checked_count:] if review_id and review_id not in (known_ids or ())]
+        if review_ids and not stats.get('newest_review_id'):
+            stats['newest_review_id'] = review_ids[0]
+        cursor_id = stats.get('cursor_review_id')
+        if cursor_id and cursor_id in review_ids[checked_count:]:
+            stats['cursor_index'] = review_ids.index(cursor_id)
+        if new_ids:
+            stats['new_ids_seen'] += len(new_ids)
+            stats['last_new_review_id'] = new_ids[-1]
+        return len(review_ids), bool(new_ids)
+
+    async def extract_review_data(self, card, index: int = 0,
+                                  deadline: Optional[CardDeadline] = None) -> Optional[Dict]:
+        """Extract one card, reading all of its fields concurrently.
+
+        With a deadline, raises BudgetExceeded once the card runs over it.
+        If the card's full text never renders after its "read more" click, the
+        truncated text is kept and the record is marked PARTIAL_TEXT.
+        """
+        try:
+            try:
+                await card.scroll_into_view_if_needed(timeout=deadline.timeout_ms(10000) if deadline else 10000)
+            except PlaywrightTimeoutError:
+                logger.warning(f"Could not scroll review {index} into view")
+            if deadline:
+                deadline.check('scroll')
+
+            # Expand truncated text before the concurrent reads, unless the batch pass did
+            selectors = self.selectors
+            expanded = bool(await card.get_attribute('data-pv-expanded'))
+            clicked = False
+            try:
+                expand = await selectors.find_async(card, 'read_more')
+                if not expanded and expand and await expand.first.is_visible():
+                    await expand.first.click()
+                    clicked = True
+            except Exception:
+                pass
+
+            # The full text renders after the click; wait for it as for review_meta
+            full_text = None
+            if clicked:
+                full_text = await selectors.find_async(card, 'review_text_full', wait=True)
+                if not full_text:
+                    logger.warning(f"Review {index} did not render its full text - keeping the truncated text")
+                if deadline:
+                    deadline.check('review text')
+
+            meta = await selectors.find_async(card, 'review_meta', wait=True)
+            if not meta:
+                logger.warning(f"Review {index} has no review ID element")
+                return None
+            if deadline:
+                deadline.check('review ID')
+            reads = {
+                'review_id': meta.first.get_attribute('data-review-id', timeout=selectors.probe_timeout_ms),
+                'listing_id': meta.first.get_attribute('data-listing-id', timeout=selectors.probe_timeout_ms),
+                'share_url': meta.first.get_attribute('data-share-review-url', timeout=selectors.probe_timeout_ms),
+                'reviewer_name': selectors.text_async(card, 'reviewer_name'),
+                'reviewer_profile_url': selectors.attribute_async(card, 'reviewer_profile', 'href'),
+                'reviewer_details': selectors.text_async(card, 'reviewer_details'),
+                'rating': selectors.attribute_async(card, 'rating', 'aria-label'),
+                'time': selectors.text_async(card, 'review_time'),
+                'review_text': (
+                    full_text.first.inner_text(timeout=selectors.probe_timeout_ms) if full_text
+                    else selectors.text_async(card, 'review_text_full' if expanded else 'review_text')
+                ),
+                'metadata': self._all_texts(card, 'metadata'),
+                'ratings_text': selectors.text_async(card, 'sub_ratings'),
+                'images': self._image_sources(card),
+                'owner_reply_text': card.evaluate(OWNER_REPLY_JS)
+            }
+            reading = asyncio.gather(*reads.values(), return_exceptions=True)
+            try:
+                values = await asyncio.wait_for(reading, timeout=deadline.remaining if deadline else None)
+            except asyncio.TimeoutError:
+                raise BudgetExceeded(f"over {deadline.seconds:.1f}s budget while reading fields")
+            raw = {key: None if isinstance(value, Exception) else value for key, value in zip(reads, values)}
+            raw['index'] = index
+
+            if not is_complete(raw):
+                logger.warning(f"Failed to extract review {index}: missing required fields")
+                return None
+            return mark_partial(build_review_record(raw), clicked and not full_text)
+
+        except BudgetExceeded:
+            raise
+        except Exception as e:
+            logger.warning(f"Failed to extract review data: {e}")
+            return None
+
+    async def extract_cards(self, cards, indexes: List[int], stats: Dict) -> AsyncIterator[Tuple[int, Optional[Dict]]]:
+        """Extract cards within the adaptive budget, then retry the deferred ones.
+
+        Same contract as ReviewExtractor.extract_cards.
+        """
+        deferred = []
+        for index in indexes:
+            deadline = self.budget.start()
+            try:
+                review_data = await self.extract_review_data(cards.nth(index), index, deadline)
+            except BudgetExceeded as e:
+                logger.warning(f"Review {index} {e} - deferring it")
+                deferred.append(index)
+                continue
+            if review_data:
+                self.budget.observe(deadline.elapsed)
+            yield index, review_data
+
+        stats['deferred'] = stats.get('deferred', 0) + len(deferred)
+        stats.setdefault('recovered', 0)
+        if deferred:
+            logger.info(f"Retrying {len(deferred)} deferred reviews")
+        for index in deferred:
+            try:
+                review_data = await self.extract_review_data(cards.nth(index), index, self.budget.start(retry=True))
+            except BudgetExceeded as e:
+                logger.warning(f"Review {index} {e} on retry")
+                review_data = None
+            if review_data:
+                stats['recovered'] += 1
+            yield index, review_data
+
+    async def _all_texts(self, card, field: str) -> List[str]:
+        """Inner texts of every match of a registry field, without waiting for absent elements."""
+        locator = await self.selectors.find_async(card, field)
+        return await locator.all_inner_texts() if locator else []
+
+    async def _image_sources(self, card) -> List[str]:
+        locator = await self.selectors.find_async(card, 'images')
+        return await locator.evaluate_all(IMAGE_SOURCES_JS) if locator else []
+
+    async def expand_truncated_reviews(self, iframe_locator: FrameLocator, indexes: Optional[List[int]] = None) -> Dict:
+        """Expand every truncated review in one pass, then wait once for the full texts."""
+        start = time.perf_counter()
+        expanded = await iframe_locator.locator('div.noyJyc').evaluate_all(EXPAND_ALL_JS, indexes)
+        rendered = True
+        if expanded:
+            try:
+                await iframe_locator.locator(EXPANDED_TEXT_SELECTOR).last.wait_for(
+                    state='visible', timeout=config.expand_timeout_ms
+                )
+            except PlaywrightTimeoutError:
+                rendered = False
+                logger.warning(f"Expanded review texts did not render within {config.expand_timeout_ms} ms")
+
+        elapsed = time.perf_counter() - start
+        logger.info(f"Expanded {expanded} truncated reviews in {elapsed:.2f}s")
+        return {'expanded': expanded, 'expand_seconds': round(elapsed, 3), 'expand_rendered': rendered}
+
+    async def iter_reviews(self, iframe_locator: FrameLocator, limit: Optional[int] = None,
+                           skip_ids: Optional[set] = None, stats: Optional[Dict] = None) -> AsyncIterator[Dict]:
+        """Yield extracted reviews as they are read, skipping IDs in skip_ids.
+
+        Extraction stats are written into the caller's stats dict, since tabs
+        extract concurrently with the same extractor.
+        """
+        skip_ids = skip_ids or set()
+        start = time.perf_counter()
+        cards = iframe_locator.locator('div.noyJyc')
+        card_ids = await iframe_locator.locator('div.noyJyc div.KuKPRc').evaluate_all(REVIEW_IDS_JS)
+        if limit is not None:
+            card_ids = card_ids[:limit]
+        indexes = [index for index, review_id in enumerate(card_ids) if str(review_id) not in skip_ids]
+
+        mode = config.extraction_mode
+        if mode == 'network':
+            logger.warning("Network extraction is not available in the async collector - using bulk")
+            mode = 'bulk'
+        stats = {} if stats is None else stats
+        stats.update({'mode': mode, 'fallback_cards': 0, 'fallback_recovered': 0, 'deferred': 0, 'recovered': 0})
+        stats.update(await self.expand_truncated_reviews(iframe_locator, None if mode == 'snapshot' else indexes))
+        partial = not stats['expand_rendered']
+        yielded = 0
+
+        if mode == 'snapshot':
+            html = await iframe_locator.locator('html').evaluate('el => el.outerHTML')
+            for review_data in SnapshotParser().parse_html(html)[:len(card_ids)]:
+                if str(review_data.get('Review ID', '')) not in skip_ids:
+                    yielded += 1
+                    yield mark_partial(review_data, partial)
+
+        elif mode == 'locator':
+            async for index, review_data in self.extract_cards(cards, indexes, stats):
+                if review_data:
+                    yielded += 1
+                    yield mark_partial(review_data, partial)
+                else:
+                    self.failure_recorder.dump(f"review {index} could not be extracted")
+
+        else:
+            for offset in range(0, len(indexes), config.flush_every):
+                raw_records = await cards.evaluate_all(BULK_EXTRACT_JS, indexes[offset:offset + config.flush_every])
+                failed = {}
+                for raw in raw_records:
+                    if is_complete(raw):
+                        yielded += 1
+                        yield mark_partial(build_review_record(raw), partial)
+                    else:
+                        failed[raw['index']] = raw
+
+                stats['fallback_cards'] += len(failed)
+                async for index, review_data in self.extract_cards(cards, list(failed), stats):
+                    raw = failed[index]
+                    if not review_data:
+                        self.failure_recorder.dump(f"review {index} could not be extracted: {raw.get('error')}", raw.get('html'))
+                        continue
+                    self.failure_recorder.record(index, raw.get('html'))
+                    stats['fallback_recovered'] += 1
+                    yielded += 1
+                    yield mark_partial(review_data, partial)
+
+        stats.update({
+            'cards': len(card_ids),
+            'skipped': len(card_ids) - len(indexes),
+            'extracted': yielded,
+            'seconds': round(time.perf_counter() - start, 3)
+        })
+        logger.info(
+            f"Extraction ({mode}): {yielded} reviews from {len(indexes)} cards in {stats['seconds']:.2f}s"
+            + (f", {stats['deferred']} deferred ({stats['recovered']} recovered)" if stats['deferred'] else '')
+        )
+
+
+class AsyncReviewCollector(ReviewCollector):
+    """ReviewCollector on playwright.async_api, with flushes overlapping extraction."""
+
+    def __init__(self):
+        self.authenticator = AsyncGoogleAuthenticator()
+        self.extractor = AsyncReviewExtractor()
+        self.db = get_database()
+
+    def collect_unreplied_reviews(self) -> Tuple[int, Optional[str]]:
+        """Collect unreplied reviews; same return contract as ReviewCollector."""
+        return asyncio.run(self.collect_unreplied_reviews_async())
+
+    async def collect_unreplied_reviews_async(self) -> Tuple[int, Optional[str]]:
+        logger.info("Starting async review collection process")
+        timer = self.extractor.timer = RunTimer()
+
+        with timer.phase('load_known_ids') as span:
+            existing_ids = await asyncio.to_thread(self._get_existing_review_ids)
+            span['items'] = len(existing_ids)
+        checkpoint = CollectionCheckpoint()
+        skip_ids = checkpoint.load()
+        sync_mode = config.collection_mode == 'sync'
+        if not (config.use_database and (config.detect_edits or sync_mode)):
+            skip_ids = skip_ids | existing_ids
+        sync_cursor = SyncCursor(self.db if config.use_database else None) if sync_mode else None
+        if sync_cursor:
+            cursors = await asyncio.gather(*(
+                asyncio.to_thread(sync_cursor.load, listing.listing_id) for listing in config.listings
+            ))
+            self.extractor.cursors = {
+                listing.listing_id: (cursor or {}).get('review_id') for listing, cursor in zip(config.listings, cursors)
+            }
+        self.listing_runs = {
+            listing.listing_id: {'listing': listing, 'collected': 0, 'saved': 0, 'save': {}, 'pagination': [], 'extraction': []}
+            for listing in config.listings
+        }
+        self._backup_path = config.data_dir / f"reviews_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+
+        async with async_playwright() as p:
+            with timer.phase('auth'):
+                session = await self.authenticator.open_session(p)
+            if not session:
+                return 0, None
+            browser, context, page = session
+
+            resource_policy = ResourcePolicy() if config.block_resources else None
+            if resource_policy:
+                await resource_policy.install_async(context)
+
+            # The trace is only written to disk if something fails
+            failure_recorder = self.extractor.failure_recorder
+            if config.failure_tracing:
+                await context.tracing.start(screenshots=True, snapshots=True)
+
+            try:
+                queue: asyncio.Queue = asyncio.Queue()
+                writer = asyncio.create_task(self._write_reviews(queue, checkpoint))
+                seen_ids: set = set()
+                known_ids = None if sync_mode else existing_ids
+
+                # Sync mode reads one unfiltered list per listing
+                tasks = [
+                    (listing, label)
+                    for listing in config.listings
+                    for label in ((None,) if sync_mode else listing.shard_filters or config.shard_filters or (None,))
+                ]
+                try:
+                    if tasks == [(config.listings[0], None)]:
+                        await self._collect_list(page, config.listings[0], None, known_ids, skip_ids, seen_ids, queue)
+                    else:
+                        # Every (listing, shard) gets its own tab, within the global and per-listing tab limits
+                        tab_limit = asyncio.Semaphore(config.shard_concurrency)
+                        listing_limits = {
+                            listing.listing_id: asyncio.Semaphore(listing.max_tabs or config.shard_concurrency)
+                            for listing in config.listings
+                        }
+
+                        async def run_tab(listing: Listing, label: Optional[str]) -> None:
+                            async with listing_limits[listing.listing_id], tab_limit:
+                                tab_page = await context.new_page()
+                                try:
+                                    await self._collect_list(tab_page, listing, label, known_ids, skip_ids, seen_ids, queue)
+                                finally:
+                                    await tab_page.close()
+
+                        # A failed tab must not stop the others or strand what they queued
+                        results = await asyncio.gather(
+                            *(run_tab(listing, label) for listing, label in tasks), return_exceptions=True
+                        )
+                        for (listing, label), result in zip(tasks, results):
+                            if isinstance(result, Exception):
+                                logger.error(f"Tab for {listing.listing_id}{f' ({label})' if label else ''} failed: {result}")
+                                failure_recorder.dump(f"tab error: {result}")
+                finally:
+                    # Flush whatever was queued, even if collection failed
+                    await queue.put(None)
+                    await writer
+                if sync_cursor:
+                    for run in self.listing_runs.values():
+                        for stats in run['pagination']:
+                            await asyncio.to_thread(
+                                self._advance_sync_cursor, sync_cursor, run['listing'], stats, stats.get('newest_review_time')
+                            )
+                runs = self.listing_runs.values()
+                if not any(run['extraction'] for run in runs):
+                    return 0, None
+                reviews_collected = sum(run['collected'] for run in runs)
+                total_saved = sum(run['saved'] for run in runs)
+                checkpoint.clear()
+
+                # Tabs overlap, so phase times can add up to more than the duration
+                timer.log_summary('Collection')
+                if config.use_database:
+                    self._log_listing_runs(timer, resource_policy)
+
+                if not reviews_collected:
+                    return 0, None
+                if config.use_database:
+                    logger.info(f"Successfully saved {total_saved} new or edited reviews to database")
+                    return total_saved, "database"
+
+                master_db_path = config.data_dir / 'reviews_master_database.csv'
+                logger.info(f"Successfully saved {reviews_collected} new reviews to master database")
+                return reviews_collected, str(master_db_path)
+
+            except Exception as e:
+                logger.error(f"Error during review collection: {e}")
+                failure_recorder.dump(f"collection error: {e}")
+                return 0, None
+
+            finally:
+                if config.failure_tracing:
+                    try:
+                        trace_path = failure_recorder.trace_path
+                        await context.tracing.stop(path=trace_path)
+                        if trace_path:
+                            logger.warning(f"Saved Playwright trace: {trace_path}")
+                            failure_recorder.prune()
+                    except Exception as e:
+                        logger.warning(f"Failed to stop tracing: {e}")
+                if resource_policy:
+                    resource_policy.log_summary()
+                self.extractor.selectors.log_summary()
+                self.extractor.selectors.save()
+                await self.authenticator.save_session(context)
+                await browser.close()
+
+    async def _collect_list(self, page: Page, listing: Listing, label: Optional[str], known_ids: Optional[set],
+                            skip_ids: set, seen_ids: set, queue: asyncio.Queue) -> None:
+        """Open, paginate and extract one listing's review list onto the writer queue."""
+        run = self.listing_runs[listing.listing_id]
+        stats = {'listing_id': listing.listing_id, 'waits': {}}
+        if label:
+            stats['shard'] = label
+        run['pagination'].append(stats)
+        timer = self.extractor.timer
+        with timer.phase('navigate'):
+            iframe_locator = await self.extractor.open_reviews(page, stats, label, listing)
+        if not iframe_locator:
+            stats['stop_reason'] = 'error'
+            return
+        with timer.phase('paginate') as span:
+            await self.extractor.load_all_reviews(page, iframe_locator, stats, known_ids)
+            span['items'] = stats.get('cards_loaded', 0)
+
+        # A sync reads only the cards above its cursor
+        limit = stats.get('cursor_index') if config.collection_mode == 'sync' else config.max_reviews
+        extraction: Dict = {}
+        with timer.phase('extract') as span:
+            async for review_data in self.extractor.iter_reviews(iframe_locator, limit, skip_ids | seen_ids, extraction):
+                review_id = str(review_data.get('Review ID'))
+                # Another shard may have yielded this review since extraction started
+                if review_id in seen_ids:
+                    continue
+                seen_ids.add(review_id)
+                if review_id == stats.get('newest_review_id'):
+                    stats['newest_review_time'] = review_data.get('Time')
+                review_data['Listing ID'] = review_data.get('Listing ID') or listing.listing_id
+                span['items'] += 1
+                await queue.put((listing.listing_id, review_data))
+        run['extraction'].append(extraction)
+
+    async def _write_reviews(self, queue: asyncio.Queue, checkpoint: CollectionCheckpoint) -> None:
+        """Drain (listing_id, review) items from the queue, flushing each listing every flush_every reviews.
+
+        Flushes run in a worker thread, one at a time; totals go to listing_runs.
+        """
+        chunks: Dict[str, List[Dict]] = {}
+        while True:
+            item = await queue.get()
+            if item is None:
+                for listing_id, chunk in chunks.items():
+                    if chunk:
+                        await asyncio.to_thread(self._flush_reviews, chunk, checkpoint, listing_id)
+                return
+
+            listing_id, review_data = item
+            chunk = chunks.setdefault(listing_id, [])
+            chunk.append(review_data)
+            if len(chunk) >= config.flush_every:
+                chunks[listing_id] = []
+                await asyncio.to_thread(self._flush_reviews, chunk, checkpoint, listing_id)
+
+
+def main():
+    """Main entry point."""
+    collector = AsyncReviewCollector()
+    try:
+        count, filename = collector.collect_unreplied_reviews()
+    finally:
+        collector.db.close()
+
+    if count > 0:
+        print(f"Successfully collected {count} unreplied reviews")
+        print(f"Saved to: {filename}")
+    else:
+        print("No reviews were collected - check logs for errors")
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,10 @@ from datetime import datetime
 from pathlib import Path
 import pandas as pd
 import re
+import sys
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.utils.selector_registry import SelectorRegistry
 
 # Load environment variables
 load_dotenv()
@@ -28,6 +32,7 @@ def collect_reviews():
         )
 
         page = context.new_page()
+        selectors = SelectorRegistry()
         
         metadata = {
             'business_id': 'PV',
@@ -71,8 +76,8 @@ def collect_reviews():
 
             # Wait for the "Read reviews" button and click it
             try:
-                read_reviews_button = page.locator('button:has-text("Read reviews")')
-                read_reviews_button.click()
+                read_reviews_button = selectors.find(page, 'read_reviews', wait=True)
+                read_reviews_button.first.click()
                 print("Clicked 'Read reviews' button.")
             except Exception as e:
                 print(f"Could not click 'Read reviews' button: {e}")
@@ -90,8 +95,8 @@ def collect_reviews():
             # Interact with the "Unreplied" button inside the iframe
             try:
                 # Wait for the "Unreplied" button inside the iframe to appear
-                unreplied_button = iframe_locator.locator('button:has(span:has-text("Unreplied"))')
-                unreplied_button.click()
+                unreplied_button = selectors.find(iframe_locator, 'unreplied_filter', wait=True)
+                unreplied_button.first.click()
                 print("Clicked 'Unreplied' button inside iframe.")
             except Exception as e:
                 print(f"Could not click 'Unreplied' button inside iframe: {e}")
@@ -99,21 +104,11 @@ def collect_reviews():
             # Create an empty list to store review data
             reviews_data = []
 
-            def get_element_text(locator, selector):
+            def get_element_text(locator, field):
                 try:
-                    return locator.locator(selector).first.inner_text()
-                except:
-                    alternative_selectors = [
-                        f"{selector}:first-child",
-                        f"{selector}:not(.Fv38Af)",
-                        f"{selector}:has-text('Local Guide')"
-                    ]
-                    for alt_selector in alternative_selectors:
-                        try:
-                            return locator.locator(alt_selector).inner_text()
-                        except:
-                            pass
-                return None
+                    return selectors.text(locator, field)
+                except Exception:
+                    return None
 
             # Locate all review elements on the page
             review_elements = iframe_locator.locator('div.noyJyc').all()
@@ -123,14 +118,14 @@ def collect_reviews():
             for review in review_elements:
                 try:
                     # Extract unique identifiers
-                    review_id = review.locator('div.KuKPRc').get_attribute('data-review-id')
-                    listing_id = review.locator('div.KuKPRc').get_attribute('data-listing-id')
-                    share_url = review.locator('div.KuKPRc').get_attribute('data-share-review-url')
+                    review_id = selectors.attribute(review, 'review_meta', 'data-review-id')
+                    listing_id = selectors.attribute(review, 'review_meta', 'data-listing-id')
+                    share_url = selectors.attribute(review, 'review_meta', 'data-share-review-url')
 
                     # Extract reviewer name, and other details
-                    reviewer_name = review.locator('a.PskQHd[jsname="xs1xe"]').inner_text()
-                    reviewer_profile_url = review.locator('a.PskQHd[aria-label*="Link to reviewer profile"]').get_attribute('href')
-                    reviewer_details = get_element_text(review, 'div.PROnRd.vq72z')  # e.g., "Local Guide • 36 reviews • 7 photos"
+                    reviewer_name = get_element_text(review, 'reviewer_name')
+                    reviewer_profile_url = selectors.attribute(review, 'reviewer_profile', 'href')
+                    reviewer_details = get_element_text(review, 'reviewer_details') or ''  # e.g., "Local Guide • 36 reviews • 7 photos"
                     
                     # Parse reviewer details
                     is_local_guide = "Local Guide" in reviewer_details
@@ -142,19 +137,17 @@ def collect_reviews():
                         photo_count = int(re.search(r"(\d+)\s+photos", reviewer_details).group(1))
                     
                     # Extract review rating (count the number of stars)
-                    stars_element = review.locator('span[role="img"]')
-                    review_rating = stars_element.get_attribute('aria-label') if stars_element else "No rating"
+                    review_rating = selectors.attribute(review, 'rating', 'aria-label') or "No rating"
                     
                     # Extract review time
-                    review_time = review.locator('span.KEfuhb').inner_text()
+                    review_time = get_element_text(review, 'review_time')
 
                     # Review metadata
                     dine_in = None
                     session = None
                     price_range = None
-                    metadata_spans = review.locator('span.PROnRd.mpP9nc').all()
-                    for span in metadata_spans:
-                        text = span.inner_text()
+                    metadata_spans = selectors.find(review, 'metadata')
+                    for text in (metadata_spans.all_inner_texts() if metadata_spans else []):
                         if "Dine in" in text:
                             dine_in = True
                         if "Lunch" in text:
@@ -165,24 +158,24 @@ def collect_reviews():
                             price_range = text
 
                     # Extract Full Review and Ratings (Food, Service, Atmosphere)
-                    full_review_btn = review.locator('a[jsname="ix0Hvc"]').first
+                    full_review_btn = selectors.find(review, 'read_more')
                     review_text = None
                     food_rating = None
                     service_rating = None
                     atmosphere_rating = None
-                    if full_review_btn.is_visible():
-                        full_review_btn.click()
-                        review_text = review.locator('div[jsname="PBWx0c"]').inner_text()
-                        ratings_text = review.locator('div.fjB0Xb').inner_text()
+                    if full_review_btn and full_review_btn.first.is_visible():
+                        full_review_btn.first.click()
+                        review_text = selectors.find(review, 'review_text_full', wait=True).first.inner_text()
+                        ratings_text = get_element_text(review, 'sub_ratings') or ''
                         food_rating = re.search(r"Food:\s*(\d+)/5", ratings_text).group(1) if "Food" in ratings_text else None
                         service_rating = re.search(r"Service:\s*(\d+)/5", ratings_text).group(1) if "Service" in ratings_text else None
                         atmosphere_rating = re.search(r"Atmosphere:\s*(\d+)/5", ratings_text).group(1) if "Atmosphere" in ratings_text else None
                     else:
-                        review_text = review.locator('div.gyKkFe.JhRJje.Fv38Af').inner_text()
+                        review_text = get_element_text(review, 'review_text')
 
                     # Images
-                    images = review.locator('img.T3g1hc')
-                    image_urls = [img.get_attribute('src') for img in images.all() if img.get_attribute('src')]
+                    images = selectors.find(review, 'images')
+                    image_urls = [img.get_attribute('src') for img in images.all() if img.get_attribute('src')] if images else []
                     
                     # Extract review text
                     # review_text = review.locator('div.fjB0Xb').inner_text() if full_review_btn.count() > 0 else review.locator('div.dGCoId').inner_text()
@@ -232,6 +225,7 @@ def collect_reviews():
             return 0, None  # Return defaults if there's an error
         
         finally:
+            selectors.save()
             browser.close()
     
         return total_reviews, "reviews.csv"
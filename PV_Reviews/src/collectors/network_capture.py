@@ -0,0 +1,292 @@
+"""Review collection from the reviews iframe's background XHR payloads.
+
+The reviews iframe is filled by batchexecute calls whose payloads are
+undocumented nested JSON arrays. Instead of hard-coding array positions, the
+decoder learns where each field lives from a small sample of cards extracted
+from the DOM, then checks that mapping against a second DOM sample before it
+is trusted for the rest of the payload. Fields that are not calibrated
+(Local Guide status and the dining metadata) are left out of decoded
+records rather than guessed. The owner reply is calibrated like any other
+field, but only from sampled reviews that have one.
+"""
+import json
+import logging
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from config.settings import config
+from src.collectors.review_record import extract_number
+
+logger = logging.getLogger(__name__)
+
+XSSI_PREFIX = ")]}'"
+# Review IDs are base64 protobufs starting "Ch"; place IDs ("ChIJ...") share the prefix
+REVIEW_ID_PATTERN = re.compile(r'^Ch(?!IJ)[A-Za-z0-9_\-]{16,}$')
+
+# Record fields whose position in the payload is learned from the DOM sample
+CALIBRATED_FIELDS = (
+    'Reviewer Name', 'Reviewer Profile URL', 'Rating', 'Time', 'Review Text',
+    'Listing ID', 'Share URL', 'Review Count', 'Photo Count',
+    'Food Rating', 'Service Rating', 'Atmosphere Rating', 'Owner Reply Text'
+)
+# Fields that must calibrate and cross-check for the payload path to be used
+REQUIRED_FIELDS = ('Reviewer Name', 'Rating', 'Review Text')
+
+LeafPath = Tuple[int, ...]
+
+
+def parse_batchexecute(body: str) -> List[Any]:
+    """Return the JSON payloads carried in a batchexecute (or plain JSON) response."""
+    text = body.strip()
+    if text.startswith(XSSI_PREFIX):
+        text = text[len(XSSI_PREFIX):]
+
+    decoder = json.JSONDecoder()
+    chunks = []
+    position = 0
+    while position < len(text):
+        # Skip whitespace and the length prefixes between chunks
+        while position < len(text) and (text[position].isspace() or text[position].isdigit()):
+            position += 1
+        if position >= len(text):
+            break
+        try:
+            chunk, position = decoder.raw_decode(text, position)
+            chunks.append(chunk)
+        except json.JSONDecodeError:
+            break
+
+    payloads = []
+    for chunk in chunks:
+        envelopes = [entry for entry in chunk if isinstance(entry, list)] if isinstance(chunk, list) else []
+        inner = [entry[2] for entry in envelopes if len(entry) > 2 and entry[0] == 'wrb.fr' and isinstance(entry[2], str)]
+        if inner:
+            for data in inner:
+                try:
+                    payloads.append(json.loads(data))
+                except json.JSONDecodeError:
+                    continue
+        elif chunk is not None:
+            payloads.append(chunk)
+    return payloads
+
+
+def find_review_nodes(payload: Any, review_ids: Optional[Set[str]] = None) -> Dict[str, list]:
+    """Map review ID to the largest payload subtree mentioning only that review.
+
+    Any string shaped like a review ID keeps subtrees apart; with
+    review_ids (e.g. the data-review-id values of the loaded cards) only
+    those IDs are returned.
+    """
+    id_sets: Dict[int, frozenset] = {}
+    review_ids = review_ids or set()
+
+    def is_review_id(value: str) -> bool:
+        return value in review_ids or bool(REVIEW_ID_PATTERN.match(value))
+
+    def collect(node) -> frozenset:
+        if isinstance(node, str):
+            return frozenset([node]) if is_review_id(node) else frozenset()
+        if not isinstance(node, list):
+            return frozenset()
+        ids = frozenset().union(*(collect(child) for child in node)) if node else frozenset()
+        id_sets[id(node)] = ids
+        return ids
+
+    collect(payload)
+    nodes: Dict[str, list] = {}
+
+    def walk(node):
+        if not isinstance(node, list):
+            return
+        ids = id_sets.get(id(node), frozenset())
+        if len(ids) == 1:
+            nodes.setdefault(next(iter(ids)), node)
+        elif len(ids) > 1:
+            for child in node:
+                walk(child)
+
+    walk(payload)
+    if review_ids:
+        nodes = {review_id: node for review_id, node in nodes.items() if review_id in review_ids}
+    return nodes
+
+
+def iter_leaves(node: Any, path: LeafPath = ()):
+    """Yield (path, value) for every scalar in a nested list."""
+    if isinstance(node, list):
+        for index, child in enumerate(node):
+            yield from iter_leaves(child, path + (index,))
+    else:
+        yield path, node
+
+
+def value_at(node: Any, path: LeafPath) -> Any:
+    """Follow a path of list indexes, returning None if it does not exist."""
+    for index in path:
+        if not isinstance(node, list) or index >= len(node):
+            return None
+        node = node[index]
+    return node
+
+
+def _normalize(value: Any) -> Any:
+    """Comparable form of a record or payload value."""
+    if isinstance(value, str):
+        return ' '.join(value.split())
+    return value
+
+
+def _target(field: str, value: Any) -> Any:
+    """The payload value a DOM record field is expected to appear as."""
+    if field == 'Rating':
+        return extract_number(str(value), r'(\d+)')
+    return _normalize(value)
+
+
+def _matches(field: str, leaf: Any, target: Any) -> bool:
+    """Whether a payload leaf carries the DOM value of a field."""
+    if target is None or target == '' or isinstance(leaf, bool):
+        return False
+    if isinstance(target, int):
+        return isinstance(leaf, int) and leaf == target
+    if not isinstance(leaf, str):
+        return False
+    leaf = _normalize(leaf)
+    if field in ('Review Text', 'Owner Reply Text'):
+        # DOM text can carry the sub-ratings block after the review itself
+        return leaf == target or (len(leaf) >= 20 and leaf in target)
+    return leaf == target
+
+
+class ReviewPayloadDecoder:
+    """Turns captured review payloads into review records."""
+
+    def __init__(self, review_ids: Optional[Iterable[str]] = None):
+        self.review_ids = {str(review_id) for review_id in review_ids if review_id} if review_ids is not None else None
+        self.nodes: Dict[str, list] = {}
+        self.paths: Dict[str, LeafPath] = {}
+        self.agreement: Dict[str, float] = {}
+
+    def feed(self, body: str) -> int:
+        """Add one response body; returns the number of review nodes found."""
+        found = 0
+        for payload in parse_batchexecute(body):
+            for review_id, node in find_review_nodes(payload, self.review_ids).items():
+                if review_id not in self.nodes:
+                    found += 1
+                self.nodes[review_id] = node
+        return found
+
+    def calibrate(self, dom_records: List[Dict]) -> Dict[str, LeafPath]:
+        """Learn the payload path of each field from DOM-extracted records."""
+        candidates: Dict[str, Counter] = {field: Counter() for field in CALIBRATED_FIELDS}
+        present: Counter = Counter()
+
+        for record in dom_records:
+            node = self.nodes.get(str(record.get('Review ID')))
+            if node is None:
+                continue
+            leaves = list(iter_leaves(node))
+            for field in CALIBRATED_FIELDS:
+                target = _target(field, record.get(field))
+                if target is None or target == '':
+                    continue
+                present[field] += 1
+                for path, leaf in leaves:
+                    if _matches(field, leaf, target):
+                        candidates[field][path] += 1
+
+        self.paths, self.agreement = {}, {}
+        for field, counter in candidates.items():
+            if not counter:
+                continue
+            path, hits = counter.most_common(1)[0]
+            agreement = hits / present[field]
+            if agreement >= config.network_min_agreement:
+                self.paths[field] = path
+                self.agreement[field] = round(agreement, 2)
+        return self.paths
+
+    def cross_check(self, dom_records: List[Dict]) -> Dict[str, float]:
+        """Share of DOM records whose decoded field matches, per calibrated field."""
+        hits: Counter = Counter()
+        checked: Counter = Counter()
+        for record in dom_records:
+            node = self.nodes.get(str(record.get('Review ID')))
+            if node is None:
+                continue
+            for field, path in self.paths.items():
+                target = _target(field, record.get(field))
+                if target is None or target == '':
+                    continue
+                checked[field] += 1
+                if _matches(field, value_at(node, path), target):
+                    hits[field] += 1
+        return {field: round(hits[field] / checked[field], 2) for field in checked}
+
+    def decode(self, review_id: str) -> Optional[Dict]:
+        """Build a review record for one captured review.
+
+        Is Local Guide, Dine In, Session and Price Range are not in the
+        record, so saving it leaves the stored values alone. Owner Reply Text
+        is None if its path was not calibrated; callers must then read the
+        reply elsewhere, or a replied review is saved as unreplied.
+        """
+        node = self.nodes.get(review_id)
+        if node is None:
+            return None
+
+        values = {field: value_at(node, path) for field, path in self.paths.items()}
+        rating = values.get('Rating')
+        images = [
+            leaf for _, leaf in iter_leaves(node)
+            if isinstance(leaf, str) and leaf.startswith('https://lh3.googleusercontent.com/')
+            and '/a-/' not in leaf and '/a/' not in leaf
+        ]
+        return {
+            'Reviewer Name': values.get('Reviewer Name'),
+            'Reviewer Profile URL': values.get('Reviewer Profile URL'),
+            'Review Count': values.get('Review Count'),
+            'Photo Count': values.get('Photo Count'),
+            'Rating': f"{rating} out of 5 stars" if isinstance(rating, int) else rating,
+            'Time': values.get('Time'),
+            'Review Text': values.get('Review Text'),
+            'Review ID': review_id,
+            'Listing ID': values.get('Listing ID'),
+            'Share URL': values.get('Share URL'),
+            'Food Rating': values.get('Food Rating'),
+            'Service Rating': values.get('Service Rating'),
+            'Atmosphere Rating': values.get('Atmosphere Rating'),
+            'Images': list(dict.fromkeys(images)),
+            'Owner Reply Text': values.get('Owner Reply Text')
+        }
+
+
+class ReviewPayloadCapture:
+    """Collects review XHR responses from a page while it paginates."""
+
+    def __init__(self, page):
+        self.page = page
+        self.responses = []
+
+    def start(self) -> None:
+        self.page.on('response', self._on_response)
+
+    def stop(self) -> None:
+        self.page.remove_listener('response', self._on_response)
+
+    def _on_response(self, response) -> None:
+        if config.review_xhr_pattern in response.url:
+            self.responses.append(response)
+
+    def bodies(self) -> List[str]:
+        """Read the captured response bodies, skipping any that are gone."""
+        bodies = []
+        for response in self.responses:
+            try:
+                bodies.append(response.text())
+            except Exception as e:
+                logger.debug(f"Could not read captured response {response.url}: {e}")
+        return bodies
@@ -1,25 +1,222 @@
 """Improved Google Reviews collector with better structure and error handling."""
-from playwright.sync_api import sync_playwright, Page, FrameLocator
+from playwright.sync_api import (
+    sync_playwright, Browser, BrowserContext, Page, FrameLocator, TimeoutError as PlaywrightTimeoutError
+)
 import pandas as pd
 import time
 import random
-import re
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from collections import Counter
+from typing import Iterator, List, Dict, Optional, Tuple
 import sys
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from config.settings import config
+from config.settings import Listing, config
 from src.utils.logging_config import setup_logging
-from src.utils.database import ReviewDatabase
+from src.utils.database import PARTIAL_TEXT, get_database
+from src.utils.session_store import SessionStore
+from src.utils.resource_policy import ResourcePolicy
+from src.utils.checkpoint import CollectionCheckpoint
+from src.utils.failure_recorder import FailureRecorder
+from src.utils.selector_registry import SelectorRegistry
+from src.utils.budget import BudgetExceeded, CardBudget, CardDeadline
+from src.utils.sync_cursor import SyncCursor
+from src.utils.id_index import ReviewIdIndex
+from src.utils.timing import RunTimer
+from src.collectors.review_record import (
+    build_review_record, extract_number, is_complete, parse_individual_ratings, parse_metadata
+)
+from src.collectors.snapshot_parser import SnapshotParser
+from src.collectors.network_capture import REQUIRED_FIELDS, ReviewPayloadCapture, ReviewPayloadDecoder
 import glob
 
 logger = setup_logging()
 
+# The owner's reply to a review, or null. The reply section (div.UP87Yb) is a
+# sibling of the card's <article>; its Reply/Edit buttons are left out.
+OWNER_REPLY_JS = """
+card => {
+    const article = card.closest('article');
+    const section = article && article.parentElement && article.parentElement.querySelector('div.UP87Yb');
+    if (!section) return null;
+    const reply = section.cloneNode(true);
+    reply.querySelectorAll('button, textarea, [role="button"]').forEach(el => el.remove());
+    const text = (reply.textContent || '').trim();
+    return text || null;
+}
+"""
+
+# Reads every loaded review card (or only the given card indexes) in a single
+# round trip into the iframe. Cards that throw are returned as
+# {'index', 'error'} so they can be retried through the per-locator path.
+# Only cards that throw or lack a review ID or reviewer name carry their
+# outerHTML, for the failure recorder.
+BULK_EXTRACT_JS = """
+(cards, indexes) => {
+    const ownerReply = """ + OWNER_REPLY_JS.strip() + """;
+    return (indexes || cards.map((_, i) => i)).filter(i => i < cards.length).map(index => {
+        const card = cards[index];
+        try {
+            const first = (selector) => card.querySelector(selector);
+            const text = (selector) => {
+                const el = first(selector);
+                return el ? el.innerText : null;
+            };
+            const meta = first('div.KuKPRc');
+            const profile = first('a.PskQHd[aria-label*="Link to reviewer profile"]');
+            const stars = first('span[role="img"]');
+            const expand = first('a[jsname="ix0Hvc"]');
+            const fullText = first('div[jsname="PBWx0c"]');
+            const truncated = card.hasAttribute('data-pv-expanded') || !!(expand && expand.offsetParent !== null);
+            const record = {
+                index,
+                review_id: meta ? meta.getAttribute('data-review-id') : null,
+                listing_id: meta ? meta.getAttribute('data-listing-id') : null,
+                share_url: meta ? meta.getAttribute('data-share-review-url') : null,
+                reviewer_name: text('a.PskQHd[jsname="xs1xe"]'),
+                reviewer_profile_url: profile ? profile.getAttribute('href') : null,
+                reviewer_details: text('div.PROnRd.vq72z'),
+                rating: stars ? stars.getAttribute('aria-label') : null,
+                time: text('span.KEfuhb'),
+                review_text: truncated && fullText
+                    ? (fullText.innerText || fullText.textContent)
+                    : text('div.gyKkFe.JhRJje.Fv38Af'),
+                metadata: Array.from(card.querySelectorAll('span.PROnRd.mpP9nc')).map(el => el.innerText),
+                ratings_text: text('div.fjB0Xb'),
+                images: Array.from(card.querySelectorAll('img.T3g1hc'))
+                    .map(el => el.getAttribute('src'))
+                    .filter(Boolean),
+                owner_reply_text: ownerReply(card),
+            };
+            if (!record.review_id || !record.reviewer_name) {
+                record.html = card.outerHTML;
+            }
+            return record;
+        } catch (e) {
+            return {index, error: String(e), html: card ? card.outerHTML : null};
+        }
+    });
+}
+"""
+
+# Clicks every visible "read more" link among the given cards (all if no
+# indexes) in one pass and marks the expanded cards, so the extractors read
+# div[jsname="PBWx0c"] without clicking anything themselves.
+EXPAND_ALL_JS = """
+(cards, indexes) => {
+    let expanded = 0;
+    for (const index of (indexes || cards.map((_, i) => i))) {
+        const card = cards[index];
+        const expand = card && card.querySelector('a[jsname="ix0Hvc"]');
+        if (expand && expand.offsetParent !== null) {
+            expand.click();
+            card.setAttribute('data-pv-expanded', '1');
+            expanded++;
+        }
+    }
+    return expanded;
+}
+"""
+EXPANDED_TEXT_SELECTOR = 'div.noyJyc[data-pv-expanded] div[jsname="PBWx0c"]'
+
+MAX_PAGINATION_ATTEMPTS = 30  # Match original working code
+
+REVIEW_IDS_JS = "els => els.map(el => el.getAttribute('data-review-id'))"
+
+# Close buttons of popups that can appear after login, including home/address popups
+POPUP_CLOSE_SELECTORS = [
+    'button[aria-label="Close"]',
+    'button[data-testid="close"]', 
+    'button:has-text("Not now")',
+    'button:has-text("Skip")',
+    'button:has-text("Maybe later")',
+    'button:has-text("No thanks")',
+    'button:has-text("Dismiss")',
+    'button:has-text("Got it")',
+    '[role="dialog"] button',
+    '.modal-close',
+    '[aria-label*="close" i]',
+    '[aria-label*="dismiss" i]',
+    # Home/address related popups
+    'button:has-text("Use precise location")',
+    'button:has-text("Block")',
+    'button:has-text("Allow")',
+    '[data-value="dismiss"]',
+    # QR code popup
+    'button[aria-label="Close QR code"]',
+    'button:has-text("Close QR")',
+    '[aria-label*="QR" i] button'
+]
+
+def mark_partial(review_data: Dict, partial: bool) -> Dict:
+    """Flag a record read while expanded texts had not rendered, so saving skips edit detection."""
+    if partial:
+        review_data[PARTIAL_TEXT] = True
+    return review_data
+
 class GoogleAuthenticator:
     """Handles Google account authentication."""
     
+    def __init__(self, session_store: Optional[SessionStore] = None):
+        self.session_store = session_store or SessionStore()
+    
+    def open_session(self, playwright) -> Optional[Tuple[Browser, BrowserContext, Page]]:
+        """Launch a browser with an authenticated context.
+        
+        A saved session is reused (headless if allowed) when the probe shows it
+        is still valid; otherwise a full visible login is done and saved.
+        """
+        state = self.session_store.load()
+        if state:
+            browser, context, page = self._launch(
+                playwright, config.headless or config.headless_with_session, storage_state=state
+            )
+            if self.is_session_valid(page):
+                logger.info("Reusing saved Google session")
+                return browser, context, page
+            
+            logger.info("Saved Google session is no longer valid - doing full login")
+            browser.close()
+            self.session_store.clear()
+        
+        browser, context, page = self._launch(playwright, config.headless)
+        if not self.authenticate(page):
+            browser.close()
+            return None
+        
+        self.save_session(context)
+        return browser, context, page
+    
+    def is_session_valid(self, page: Page) -> bool:
+        """Cheap probe: a signed-in session is not redirected to the sign-in page."""
+        try:
+            page.goto(config.session_probe_url, timeout=20000)
+            return 'accounts.google.com' not in page.url
+        except Exception as e:
+            logger.warning(f"Session probe failed: {e}")
+            return False
+    
+    def save_session(self, context: BrowserContext) -> None:
+        """Persist the context's cookies and storage for the next run."""
+        if self.session_store.enabled and self.session_store.save(context.storage_state()):
+            logger.info("Saved Google session")
+    
+    def _launch(self, playwright, headless: bool, storage_state: Optional[Dict] = None) -> Tuple[Browser, BrowserContext, Page]:
+        """Launch Chromium and open a page in a fresh context."""
+        browser = playwright.chromium.launch(
+            headless=headless,
+            args=['--disable-blink-features=AutomationControlled']
+        )
+        context = browser.new_context(
+            user_agent=config.user_agent,
+            viewport={'width': config.viewport_width, 'height': config.viewport_height},
+            storage_state=storage_state,
+            # Service workers would bypass the resource policy's routes
+            service_workers='block' if config.block_resources else 'allow'
+        )
+        return browser, context, context.new_page()
+    
     def authenticate(self, page: Page) -> bool:
         """Authenticate with Google account."""
         try:
@@ -40,31 +237,7 @@ class GoogleAuthenticator:
             time.sleep(3)
             try:
                 # Check for common popup/modal close buttons including home/address popups
-                close_selectors = [
-                    'button[aria-label="Close"]',
-                    'button[data-testid="close"]', 
-                    'button:has-text("Not now")',
-                    'button:has-text("Skip")',
-                    'button:has-text("Maybe later")',
-                    'button:has-text("No thanks")',
-                    'button:has-text("Dismiss")',
-                    'button:has-text("Got it")',
-                    '[role="dialog"] button',
-                    '.modal-close',
-                    '[aria-label*="close" i]',
-                    '[aria-label*="dismiss" i]',
-                    # Home/address related popups
-                    'button:has-text("Use precise location")',
-                    'button:has-text("Block")',
-                    'button:has-text("Allow")',
-                    '[data-value="dismiss"]',
-                    # QR code popup
-                    'button[aria-label="Close QR code"]',
-                    'button:has-text("Close QR")',
-                    '[aria-label*="QR" i] button'
-                ]
-                
-                for selector in close_selectors:
+                for selector in POPUP_CLOSE_SELECTORS:
                     try:
                         close_btn = page.locator(selector).first
                         if close_btn.is_visible(timeout=2000):
@@ -89,12 +262,88 @@ class GoogleAuthenticator:
 class ReviewExtractor:
     """Extracts review data from Google My Business."""
     
-    def navigate_to_reviews(self, page: Page) -> Optional[FrameLocator]:
-        """Navigate to business reviews and return iframe locator."""
+    def __init__(self):
+        self.last_extraction_stats: Dict = {}
+        self.pagination_stats: Dict = {'waits': {}}
+        self.failure_recorder = FailureRecorder()
+        self.timer = RunTimer()
+        self.selectors = SelectorRegistry()
+        self.budget = CardBudget()
+        self.cursors: Dict[str, str] = {}  # listing_id -> sync cursor review ID, in sync mode
+    
+    @property
+    def max_pages(self) -> int:
+        """Pagination attempts per list; a full-history sync may need many more."""
+        return config.sync_max_pages if config.collection_mode == 'sync' else MAX_PAGINATION_ATTEMPTS
+    
+    def navigate_to_reviews(self, page: Page, known_ids: Optional[set] = None,
+                            listing: Optional[Listing] = None) -> Optional[FrameLocator]:
+        """Navigate to a listing's reviews (the first configured one by default) and return iframe locator.
+        
+        When known_ids is given and incremental collection is enabled,
+        pagination stops once pages stop yielding unseen review IDs.
+        """
+        self.pagination_stats = {'waits': {}}
+        with self.timer.phase('navigate'):
+            iframe_locator = self._open_review_list(page, self.pagination_stats, listing)
+        if iframe_locator:
+            with self.timer.phase('paginate') as span:
+                self._load_all_reviews(page, iframe_locator, known_ids)
+                span['items'] = self.pagination_stats.get('cards_loaded', 0)
+        return iframe_locator
+    
+    def open_shard(self, page: Page, label: Optional[str], stats: Dict,
+                   listing: Optional[Listing] = None) -> Optional[FrameLocator]:
+        """Open a listing's Unreplied list on a tab and apply the shard's filter button, if any."""
+        with self.timer.phase('navigate'):
+            iframe_locator = self._open_review_list(page, stats, listing)
+        if not iframe_locator or label is None:
+            return iframe_locator
+        try:
+            first_card = iframe_locator.locator('div.noyJyc').first
+            self._click_and_wait_for_xhr(page, iframe_locator.locator(f'button:has-text("{label}")').first, stats)
+            self._wait_for_signal(
+                'initial_cards',
+                lambda timeout: first_card.wait_for(timeout=timeout),
+                config.pagination_card_timeout_ms,
+                stats
+            )
+            logger.info(f"Applied shard filter '{label}'")
+            return iframe_locator
+        except Exception as e:
+            logger.error(f"Failed to apply shard filter '{label}': {e}")
+            return None
+    
+    def paginate_shards(self, pagers: List['ShardPager']) -> None:
+        """Paginate shard tabs round-robin so their review XHRs overlap.
+        
+        Every shard's "More Reviews" click is issued before any shard is
+        waited on, letting the browser load all shards' pages concurrently.
+        """
+        with self.timer.phase('paginate') as span:
+            active = list(pagers)
+            while active:
+                for pager in active:
+                    pager.request_more()
+                for pager in active:
+                    pager.await_more()
+                active = [pager for pager in active if not pager.done]
+            for pager in pagers:
+                pager.finish()
+            span['items'] = sum(pager.stats['cards_loaded'] for pager in pagers)
+    
+    def _open_review_list(self, page: Page, stats: Dict,
+                          listing: Optional[Listing] = None) -> Optional[FrameLocator]:
+        """Open the reviews panel and wait for the first cards.
+        
+        Applies the Unreplied filter, except in sync mode, which reads the
+        unfiltered newest-first list down to the listing's sync cursor.
+        """
+        listing = listing or config.listings[0]
         try:
-            logger.info("Navigating to reviews page")
+            logger.info(f"Navigating to reviews page of {listing.name}")
             time.sleep(5)
-            page.goto(config.business_url, timeout=20000)
+            page.goto(listing.url, timeout=20000)
             
             # Handle "Not Now" button if present
             try:
@@ -106,23 +355,35 @@ class ReviewExtractor:
                 pass
             
             # Click "Read reviews" button
-            read_reviews_button = page.locator('button:has-text("Read reviews")')
-            read_reviews_button.click()
+            read_reviews_button = self.selectors.find(page, 'read_reviews', wait=True)
+            if not read_reviews_button:
+                raise RuntimeError("'Read reviews' button not found")
+            read_reviews_button.first.click()
             logger.info("Opened reviews panel")
             
             time.sleep(random.uniform(2, 4))
             
             # Locate iframe
-            iframe_locator = page.frame_locator(f'iframe[src*="/local/business/{config.business_listing_id}/customers/reviews"]')
+            iframe_locator = page.frame_locator(f'iframe[src*="/local/business/{listing.listing_id}/customers/reviews"]')
             
-            # Click "Unreplied" filter
-            unreplied_button = iframe_locator.locator('button:has(span:has-text("Unreplied"))')
-            unreplied_button.click()
-            logger.info("Applied 'Unreplied' filter")
+            if config.collection_mode == 'sync':
+                stats['cursor_review_id'] = self.cursors.get(listing.listing_id)
+                logger.info(f"Syncing all reviews down to cursor {stats['cursor_review_id']}")
+            else:
+                # Click "Unreplied" filter
+                unreplied_button = self.selectors.find(iframe_locator, 'unreplied_filter', wait=True)
+                if not unreplied_button:
+                    raise RuntimeError("'Unreplied' filter not found")
+                unreplied_button.first.click()
+                logger.info("Applied 'Unreplied' filter")
             
-            # Load all reviews by handling pagination
-            time.sleep(3)  # Wait for initial reviews to load
-            self._load_all_reviews(iframe_locator)
+            # Wait for the first page of reviews
+            self._wait_for_signal(
+                'initial_cards',
+                lambda timeout: iframe_locator.locator('div.noyJyc').first.wait_for(timeout=timeout),
+                config.pagination_card_timeout_ms,
+                stats
+            )
             
             return iframe_locator
             
@@ -130,99 +391,219 @@ class ReviewExtractor:
             logger.error(f"Failed to navigate to reviews: {e}")
             return None
     
-    def _load_all_reviews(self, iframe_locator) -> None:
-        """Load all reviews by handling pagination and scrolling."""
+    def _load_all_reviews(self, page: Page, iframe_locator, known_ids: Optional[set] = None) -> None:
+        """Load all reviews by handling pagination and scrolling.
+        
+        Each page waits on real signals instead of fixed sleeps: the reviews
+        XHR finishing, the card count going up, or the "More Reviews" button
+        going away. Pagination stops after pagination_stale_attempts
+        attempts in a row that load no cards while the button stays.
+        """
+        incremental = config.incremental_collection and known_ids is not None
+        self.pagination_stats.update({
+            'incremental': incremental,
+            'pages_loaded': 0,
+            'cards_loaded': 0,
+            'new_ids_seen': 0,
+            'stop_reason': 'max_attempts',
+            'last_new_review_id': None
+        })
+        cards = iframe_locator.locator('div.noyJyc')
+        more_reviews_button = iframe_locator.locator('button[aria-label="More Reviews"]')
         try:
             logger.info("Loading all reviews with pagination...")
-            max_attempts = 30  # Match original working code
+            max_attempts = self.max_pages
             attempts = 0
+            stale_pages = 0
+            stalled_attempts = 0
+            checked_count = 0
+            watch = incremental or self.pagination_stats.get('cursor_review_id')
+            
+            if watch:
+                # The first page is already loaded by the filter click
+                checked_count, has_new = self._check_watermark(iframe_locator, known_ids, checked_count)
+                stale_pages = 0 if has_new else 1
             
             while attempts < max_attempts:
+                if 'cursor_index' in self.pagination_stats:
+                    self.pagination_stats['stop_reason'] = 'cursor'
+                    logger.info(f"Stopping pagination: reached the sync cursor at card {self.pagination_stats['cursor_index']}")
+                    break
+                if incremental and stale_pages >= config.incremental_stale_pages:
+                    self.pagination_stats['stop_reason'] = 'watermark'
+                    logger.info(f"Stopping pagination: {stale_pages} consecutive pages with no new review IDs")
+                    break
+                
                 attempts += 1
-                initial_count = len(iframe_locator.locator('div.noyJyc').all())
+                initial_count = cards.count()
                 
                 # Use the proven working selector from original code
                 button_clicked = False
                 try:
-                    more_reviews_button = iframe_locator.locator('button[aria-label="More Reviews"]')
                     if more_reviews_button.count() > 0 and more_reviews_button.first.is_visible():
                         logger.info(f"Clicking 'More Reviews' button (attempt {attempts})")
-                        more_reviews_button.first.click()
+                        self._click_and_wait_for_xhr(page, more_reviews_button.first)
                         button_clicked = True
-                        time.sleep(3)  # Use original timing
                     else:
                         logger.info("No more 'More Reviews' button found")
                 except Exception as e:
                     logger.warning(f"Error clicking 'More Reviews': {e}")
-                    # Take screenshot for debugging like original code
-                    try:
-                        # Access the page from iframe context for screenshot
-                        pass  # Screenshot logic can be added if needed
-                    except:
-                        pass
                 
                 # If no button found, try scrolling to bottom
                 if not button_clicked:
                     try:
-                        # Scroll to bottom of reviews container
-                        iframe_locator.locator('div[jsrenderer="vYiNxe"]').last.scroll_into_view_if_needed(timeout=3000)
-                        time.sleep(random.uniform(1, 3))
+                        cards.last.scroll_into_view_if_needed(timeout=3000)
                     except:
                         pass
                 
-                # Check if more reviews loaded
-                time.sleep(2)
-                new_count = len(iframe_locator.locator('div.noyJyc').all())
+                # Wait for the next card to be attached rather than sleeping
+                cards_grew = self._wait_for_signal(
+                    'card_count',
+                    lambda timeout: cards.nth(initial_count).wait_for(state='attached', timeout=timeout),
+                    config.pagination_card_timeout_ms
+                )
                 
-                if new_count > initial_count:
+                if cards_grew:
+                    new_count = cards.count()
                     logger.info(f"Loaded more reviews: {initial_count} → {new_count}")
+                    self.pagination_stats['pages_loaded'] += 1
+                    stalled_attempts = 0
+                    if watch:
+                        checked_count, has_new = self._check_watermark(iframe_locator, known_ids, checked_count)
+                        stale_pages = 0 if has_new else stale_pages + 1
+                elif self._wait_for_signal(
+                    'button_hidden',
+                    lambda timeout: more_reviews_button.first.wait_for(state='hidden', timeout=timeout),
+                    config.pagination_button_timeout_ms
+                ):
+                    logger.info(f"No more reviews to load. Final count: {initial_count}")
+                    self.pagination_stats['stop_reason'] = 'exhausted'
+                    break
                 else:
-                    # No new reviews loaded, try one more scroll
-                    try:
-                        iframe_locator.evaluate("() => window.scrollTo(0, document.body.scrollHeight)")
-                        time.sleep(3)
-                        final_count = len(iframe_locator.locator('div.noyJyc').all())
-                        if final_count <= new_count:
-                            logger.info(f"No more reviews to load. Final count: {final_count}")
-                            break
-                    except:
+                    stalled_attempts += 1
+                    if stalled_attempts >= config.pagination_stale_attempts:
+                        logger.warning(f"Stopping pagination: {stalled_attempts} attempts loaded no new cards")
+                        self.pagination_stats['stop_reason'] = 'stalled'
                         break
             
         except Exception as e:
             logger.warning(f"Error during pagination: {e}")
+            self.pagination_stats['stop_reason'] = 'error'
+            self.failure_recorder.dump(f"pagination error: {e}")
+        
+        try:
+            self.pagination_stats['cards_loaded'] = cards.count()
+        except Exception:
+            pass
+        logger.info(f"Pagination stopped ({self.pagination_stats['stop_reason']}): {self.pagination_stats}")
+    
+    def _click_and_wait_for_xhr(self, page: Page, button, stats: Optional[Dict] = None) -> None:
+        """Click a pagination button and wait for the reviews XHR it triggers."""
+        start = time.perf_counter()
+        try:
+            with page.expect_response(
+                lambda response: config.review_xhr_pattern in response.url,
+                timeout=config.pagination_xhr_timeout_ms
+            ):
+                button.click()
+            self._record_wait('xhr', start, True, stats)
+        except PlaywrightTimeoutError:
+            self._record_wait('xhr', start, False, stats)
+    
+    def _wait_for_signal(self, name: str, wait, timeout_ms: int, stats: Optional[Dict] = None) -> bool:
+        """Run a Playwright wait with its own timeout and record how long it took."""
+        start = time.perf_counter()
+        try:
+            wait(timeout_ms)
+            self._record_wait(name, start, True, stats)
+            return True
+        except PlaywrightTimeoutError:
+            self._record_wait(name, start, False, stats)
+            return False
+    
+    def _record_wait(self, name: str, start: float, satisfied: bool, stats: Optional[Dict] = None) -> None:
+        """Log a single wait and add it to the pagination wait totals (or to stats)."""
+        elapsed = time.perf_counter() - start
+        waits = (self.pagination_stats if stats is None else stats).setdefault('waits', {})
+        totals = waits.setdefault(name, {'count': 0, 'timeouts': 0, 'seconds': 0.0})
+        totals['count'] += 1
+        totals['seconds'] = round(totals['seconds'] + elapsed, 3)
+        if not satisfied:
+            totals['timeouts'] += 1
+        logger.info(f"Waited {elapsed:.2f}s for {name} ({'ok' if satisfied else 'timed out'})")
+    
+    def _check_watermark(self, iframe_locator, known_ids: Optional[set], checked_count: int,
+                         stats: Optional[Dict] = None) -> Tuple[int, bool]:
+        """Check review IDs loaded since checked_count against the known-ID set.
+        
+        Returns the new checked count and whether any unseen ID was found.
+        Also records the newest card's ID and, in sync mode, the position of
+        the sync cursor once it has been loaded.
+        """
+        stats = self.pagination_stats if stats is None else stats
+        review_ids = iframe_locator.locator('div.noyJyc div.KuKPRc').evaluate_all(REVIEW_IDS_JS)
+        new_ids = [review_id for review_id in review_ids[checked_count:] if review_id and review_id not in (known_ids or ())]
+        
+        if review_ids and not stats.get('newest_review_id'):
+            stats['newest_review_id'] = review_ids[0]
+        cursor_id = stats.get('cursor_review_id')
+        if cursor_id and cursor_id in review_ids[checked_count:]:
+            stats['cursor_index'] = review_ids.index(cursor_id)
+        
+        if new_ids:
+            stats['new_ids_seen'] += len(new_ids)
+            stats['last_new_review_id'] = new_ids[-1]
+        logger.info(f"Watermark check: {len(review_ids) - checked_count} cards, {len(new_ids)} new")
+        return len(review_ids), bool(new_ids)
     
-    def extract_review_data(self, review_element, index: int = 0) -> Optional[Dict]:
-        """Extract data from a single review element."""
+    def extract_review_data(self, review_element, index: int = 0,
+                            deadline: Optional[CardDeadline] = None) -> Optional[Dict]:
+        """Extract data from a single review element.
+        
+        With a deadline, raises BudgetExceeded once the card runs over it.
+        """
         try:
-            # Scroll element into view and wait for it to load
+            # Scroll element into view; its fields are awaited per selector below
             try:
-                review_element.scroll_into_view_if_needed(timeout=10000)
-                time.sleep(random.uniform(0.5, 1.5))
+                review_element.scroll_into_view_if_needed(timeout=deadline.timeout_ms(10000) if deadline else 10000)
             except:
                 logger.warning(f"Could not scroll review {index} into view")
+            if deadline:
+                deadline.check('scroll')
             
-            # Extract basic review information with increased timeouts
-            review_id = review_element.locator('div.KuKPRc').get_attribute('data-review-id', timeout=45000)
-            listing_id = review_element.locator('div.KuKPRc').get_attribute('data-listing-id', timeout=45000)
-            share_url = review_element.locator('div.KuKPRc').get_attribute('data-share-review-url', timeout=45000)
+            # Basic review information; a missing field costs at most one probe timeout per selector
+            selectors = self.selectors
+            meta = selectors.find(review_element, 'review_meta', wait=True)
+            if not meta:
+                logger.warning(f"Review {index} has no review ID element")
+                return None
+            review_id = meta.first.get_attribute('data-review-id', timeout=selectors.probe_timeout_ms)
+            listing_id = meta.first.get_attribute('data-listing-id', timeout=selectors.probe_timeout_ms)
+            share_url = meta.first.get_attribute('data-share-review-url', timeout=selectors.probe_timeout_ms)
+            if deadline:
+                deadline.check('review ID')
             
             # Reviewer information
-            reviewer_name = review_element.locator('a.PskQHd[jsname="xs1xe"]').inner_text()
-            reviewer_profile_url = review_element.locator('a.PskQHd[aria-label*="Link to reviewer profile"]').get_attribute('href')
+            reviewer_name = selectors.text(review_element, 'reviewer_name')
+            reviewer_profile_url = selectors.attribute(review_element, 'reviewer_profile', 'href')
             
             # Reviewer details parsing
-            reviewer_details = self._get_element_text(review_element, 'div.PROnRd.vq72z')
+            reviewer_details = self._get_element_text(review_element, 'reviewer_details')
             is_local_guide = "Local Guide" in reviewer_details if reviewer_details else False
-            review_count = self._extract_number(reviewer_details, r"(\d+)\s+reviews") if reviewer_details else None
-            photo_count = self._extract_number(reviewer_details, r"(\d+)\s+photos") if reviewer_details else None
+            review_count = extract_number(reviewer_details, r"(\d+)\s+reviews") if reviewer_details else None
+            photo_count = extract_number(reviewer_details, r"(\d+)\s+photos") if reviewer_details else None
             
             # Rating and timing
-            stars_element = review_element.locator('span[role="img"]')
-            review_rating = stars_element.get_attribute('aria-label') if stars_element else "No rating"
-            review_time = review_element.locator('span.KEfuhb').inner_text()
+            review_rating = selectors.attribute(review_element, 'rating', 'aria-label') or "No rating"
+            review_time = selectors.text(review_element, 'review_time')
+            
+            if deadline:
+                deadline.check('reviewer fields')
             
             # Extract review text
             review_text = self._extract_review_text(review_element)
+            if deadline:
+                deadline.check('review text')
             
             # Extract additional metadata
             dine_in, session, price_range = self._extract_metadata(review_element)
@@ -232,6 +613,7 @@ class ReviewExtractor:
             
             # Extract images
             image_urls = self._extract_images(review_element)
+            owner_reply_text = self._extract_owner_reply(review_element)
             
             return {
                 'Reviewer Name': reviewer_name,
@@ -251,77 +633,516 @@ class ReviewExtractor:
                 'Food Rating': food_rating,
                 'Service Rating': service_rating,
                 'Atmosphere Rating': atmosphere_rating,
-                'Images': image_urls
+                'Images': image_urls,
+                'Owner Reply Text': owner_reply_text
             }
             
+        except BudgetExceeded:
+            raise
         except Exception as e:
             logger.warning(f"Failed to extract review data: {e}")
             return None
     
-    def _get_element_text(self, locator, selector: str) -> Optional[str]:
-        """Safely extract text from element."""
+    def extract_cards(self, cards, indexes: List[int], stats: Dict) -> Iterator[Tuple[int, Optional[Dict]]]:
+        """Extract cards one at a time within the adaptive budget, then retry the deferred ones.
+        
+        Yields (index, record or None) for every card. Cards over budget are
+        retried after the others with the full card_budget_max_ms; the counts
+        go to stats['deferred'] and stats['recovered'].
+        """
+        deferred = []
+        for index in indexes:
+            deadline = self.budget.start()
+            try:
+                review_data = self.extract_review_data(cards.nth(index), index, deadline)
+            except BudgetExceeded as e:
+                logger.warning(f"Review {index} {e} - deferring it")
+                deferred.append(index)
+                continue
+            if review_data:
+                self.budget.observe(deadline.elapsed)
+            yield index, review_data
+        
+        stats['deferred'] = stats.get('deferred', 0) + len(deferred)
+        stats.setdefault('recovered', 0)
+        if deferred:
+            logger.info(f"Retrying {len(deferred)} deferred reviews")
+        for index in deferred:
+            try:
+                review_data = self.extract_review_data(cards.nth(index), index, self.budget.start(retry=True))
+            except BudgetExceeded as e:
+                logger.warning(f"Review {index} {e} on retry")
+                review_data = None
+            if review_data:
+                stats['recovered'] += 1
+            yield index, review_data
+    
+    def _get_element_text(self, locator, field: str) -> Optional[str]:
+        """Safely extract the text of a registry field."""
         try:
-            return locator.locator(selector).first.inner_text()
+            return self.selectors.text(locator, field)
         except:
             return None
     
-    def _extract_number(self, text: str, pattern: str) -> Optional[int]:
-        """Extract number using regex pattern."""
-        if not text:
-            return None
-        match = re.search(pattern, text)
-        return int(match.group(1)) if match else None
-    
     def _extract_review_text(self, review_element) -> Optional[str]:
         """Extract full review text."""
         try:
+            # Already expanded by expand_truncated_reviews
+            if review_element.get_attribute('data-pv-expanded'):
+                return self.selectors.text(review_element, 'review_text_full')
+            
             # Try full review button first
-            full_review_btn = review_element.locator('a[jsname="ix0Hvc"]').first
-            if full_review_btn.is_visible():
-                full_review_btn.click()
-                return review_element.locator('div[jsname="PBWx0c"]').inner_text()
+            full_review_btn = self.selectors.find(review_element, 'read_more')
+            if full_review_btn and full_review_btn.first.is_visible():
+                full_review_btn.first.click()
+                full_text = self.selectors.find(review_element, 'review_text_full', wait=True)
+                return full_text.first.inner_text() if full_text else None
             else:
-                return review_element.locator('div.gyKkFe.JhRJje.Fv38Af').inner_text()
+                return self.selectors.text(review_element, 'review_text')
         except:
             return None
     
     def _extract_metadata(self, review_element) -> Tuple[Optional[bool], Optional[str], Optional[str]]:
         """Extract dining metadata."""
-        dine_in, session, price_range = None, None, None
         try:
-            metadata_spans = review_element.locator('span.PROnRd.mpP9nc').all()
-            for span in metadata_spans:
-                text = span.inner_text()
-                if "Dine in" in text:
-                    dine_in = True
-                if "Lunch" in text:
-                    session = "Lunch"
-                elif "Dinner" in text:
-                    session = "Dinner"
-                if "₹" in text:
-                    price_range = text
+            metadata_spans = self.selectors.find(review_element, 'metadata')
+            return parse_metadata(metadata_spans.all_inner_texts() if metadata_spans else [])
         except:
-            pass
-        return dine_in, session, price_range
+            return None, None, None
     
     def _extract_individual_ratings(self, review_element) -> Tuple[Optional[str], Optional[str], Optional[str]]:
         """Extract Food, Service, Atmosphere ratings."""
         try:
-            ratings_text = review_element.locator('div.fjB0Xb').inner_text()
-            food_rating = self._extract_number(ratings_text, r"Food:\s*(\d+)/5")
-            service_rating = self._extract_number(ratings_text, r"Service:\s*(\d+)/5")  
-            atmosphere_rating = self._extract_number(ratings_text, r"Atmosphere:\s*(\d+)/5")
-            return food_rating, service_rating, atmosphere_rating
+            ratings_text = self.selectors.text(review_element, 'sub_ratings')
+            return parse_individual_ratings(ratings_text)
         except:
             return None, None, None
     
     def _extract_images(self, review_element) -> List[str]:
         """Extract image URLs from review."""
         try:
-            images = review_element.locator('img.T3g1hc')
-            return [img.get_attribute('src') for img in images.all() if img.get_attribute('src')]
+            images = self.selectors.find(review_element, 'images')
+            return [src for src in (img.get_attribute('src') for img in images.all()) if src] if images else []
         except:
             return []
+    
+    def _extract_owner_reply(self, review_element) -> Optional[str]:
+        """Extract the owner's reply, if the review has one."""
+        try:
+            return review_element.evaluate(OWNER_REPLY_JS, timeout=2000)
+        except Exception:
+            return None
+    
+    def _card_html(self, card) -> Optional[str]:
+        """outerHTML of a card for the failure recorder, or None if it cannot be read."""
+        try:
+            return card.evaluate('el => el.outerHTML', timeout=2000)
+        except Exception:
+            return None
+    
+    def expand_truncated_reviews(self, iframe_locator, indexes: Optional[List[int]] = None) -> Dict:
+        """Expand every truncated review in one pass, then wait once for the full texts.
+        
+        Returns the number of expansions and how long the pass took.
+        """
+        start = time.perf_counter()
+        expanded = iframe_locator.locator('div.noyJyc').evaluate_all(EXPAND_ALL_JS, indexes)
+        rendered = True
+        if expanded:
+            try:
+                iframe_locator.locator(EXPANDED_TEXT_SELECTOR).last.wait_for(
+                    state='visible', timeout=config.expand_timeout_ms
+                )
+            except PlaywrightTimeoutError:
+                rendered = False
+                logger.warning(f"Expanded review texts did not render within {config.expand_timeout_ms} ms")
+        
+        elapsed = time.perf_counter() - start
+        logger.info(f"Expanded {expanded} truncated reviews in {elapsed:.2f}s")
+        return {'expanded': expanded, 'expand_seconds': round(elapsed, 3), 'expand_rendered': rendered}
+    
+    def iter_reviews(self, iframe_locator, capture: Optional[ReviewPayloadCapture] = None,
+                     limit: Optional[int] = None, skip_ids: Optional[set] = None) -> Iterator[Dict]:
+        """Yield extracted reviews as they are read, skipping IDs in skip_ids.
+        
+        Bulk and per-locator extraction stream card by card (bulk in chunks of
+        flush_every) so callers can persist progress while extraction runs.
+        """
+        skip_ids = skip_ids or set()
+        start = time.perf_counter()
+        card_ids = iframe_locator.locator('div.noyJyc div.KuKPRc').evaluate_all(REVIEW_IDS_JS)
+        if limit is not None:
+            card_ids = card_ids[:limit]
+        indexes = [index for index, review_id in enumerate(card_ids) if str(review_id) not in skip_ids]
+        skipped = len(card_ids) - len(indexes)
+        logger.info(f"Found {len(card_ids)} review cards, {skipped} already processed")
+        
+        # Snapshots parse every card, so expand them all
+        expansion = self.expand_truncated_reviews(
+            iframe_locator, None if config.extraction_mode == 'snapshot' else indexes
+        )
+        partial = not expansion['expand_rendered']
+        
+        yielded = 0
+        if config.extraction_mode in ('snapshot', 'network'):
+            if config.extraction_mode == 'snapshot':
+                records = self.extract_reviews_from_snapshot(iframe_locator, limit=limit)
+            else:
+                records = self.extract_reviews_from_network(iframe_locator, capture, limit=limit)
+            stats = dict(self.last_extraction_stats)
+            for review_data in records:
+                if str(review_data.get('Review ID', '')) not in skip_ids:
+                    yielded += 1
+                    yield mark_partial(review_data, partial)
+        
+        elif config.extraction_mode == 'locator':
+            stats = {'mode': 'locator'}
+            cards = iframe_locator.locator('div.noyJyc')
+            for i, review_data in self.extract_cards(cards, indexes, stats):
+                if review_data:
+                    logger.info(f"Extracted review {i+1}/{len(card_ids)}: {review_data.get('Reviewer Name', 'Unknown')}")
+                    yielded += 1
+                    yield mark_partial(review_data, partial)
+                else:
+                    logger.warning(f"Failed to extract review {i+1}/{len(card_ids)}")
+                    self.failure_recorder.dump(f"review {i} could not be extracted", self._card_html(cards.nth(i)))
+        
+        else:
+            stats = {
+                'mode': 'bulk', 'bulk_seconds': 0.0, 'fallback_cards': 0, 'fallback_recovered': 0,
+                'fallback_seconds': 0.0, 'deferred': 0, 'recovered': 0
+            }
+            for offset in range(0, len(indexes), config.flush_every):
+                records = self.extract_reviews_bulk(iframe_locator, indexes=indexes[offset:offset + config.flush_every])
+                for key in ('bulk_seconds', 'fallback_cards', 'fallback_recovered', 'fallback_seconds', 'deferred', 'recovered'):
+                    stats[key] = round(stats[key] + self.last_extraction_stats[key], 3)
+                yielded += len(records)
+                yield from (mark_partial(review_data, partial) for review_data in records)
+        
+        elapsed = time.perf_counter() - start
+        stats.update({
+            'cards': len(card_ids),
+            'skipped': skipped,
+            'extracted': yielded,
+            'seconds': round(elapsed, 3),
+            **expansion
+        })
+        self.last_extraction_stats = stats
+        logger.info(
+            f"Extraction ({stats['mode']}): {yielded} reviews from {len(indexes)} cards in {elapsed:.2f}s"
+            + (f", {stats['deferred']} deferred ({stats['recovered']} recovered)" if stats.get('deferred') else '')
+        )
+        
+        if stats['mode'] == 'bulk' and config.extraction_benchmark_sample > 0 and indexes:
+            self._benchmark_locator_path(iframe_locator.locator('div.noyJyc'), len(indexes), stats['bulk_seconds'])
+    
+    def extract_reviews_bulk(self, iframe_locator, limit: Optional[int] = None,
+                             indexes: Optional[List[int]] = None) -> List[Dict]:
+        """Extract loaded review cards in one evaluate call.
+        
+        Reads the first `limit` cards, or only the card positions in `indexes`.
+        Cards the bulk pass cannot read are retried one at a time through
+        extract_review_data. Timings are kept in last_extraction_stats.
+        """
+        cards = iframe_locator.locator('div.noyJyc')
+        if indexes is None and limit is not None:
+            indexes = list(range(limit))
+        
+        start = time.perf_counter()
+        raw_records = cards.evaluate_all(BULK_EXTRACT_JS, indexes)
+        bulk_seconds = time.perf_counter() - start
+        
+        records = []
+        failed = []
+        for raw in raw_records:
+            if not is_complete(raw):
+                failed.append(raw)
+                continue
+            records.append(build_review_record(raw))
+        failed_indexes = [raw['index'] for raw in failed]
+        
+        fallback_start = time.perf_counter()
+        recovered = 0
+        budget_stats = {}
+        failed_by_index = {raw['index']: raw for raw in failed}
+        for index in failed_indexes:
+            logger.warning(f"Bulk extraction incomplete for review {index}, falling back to per-field extraction")
+        for index, review_data in self.extract_cards(cards, failed_indexes, budget_stats):
+            raw = failed_by_index[index]
+            if review_data:
+                self.failure_recorder.record(index, raw.get('html'))
+                records.append(review_data)
+                recovered += 1
+            else:
+                self.failure_recorder.dump(f"review {index} could not be extracted: {raw.get('error')}", raw.get('html'))
+        fallback_seconds = time.perf_counter() - fallback_start
+        
+        self.last_extraction_stats = {
+            'mode': 'bulk',
+            'cards': len(raw_records),
+            'bulk_seconds': round(bulk_seconds, 3),
+            'fallback_cards': len(failed_indexes),
+            'fallback_recovered': recovered,
+            'fallback_seconds': round(fallback_seconds, 3),
+            **budget_stats
+        }
+        logger.info(
+            f"Bulk extraction: {len(raw_records)} cards in {bulk_seconds:.2f}s "
+            f"({1000 * bulk_seconds / max(len(raw_records), 1):.1f} ms/card), "
+            f"{len(failed_indexes)} fallbacks ({recovered} recovered) in {fallback_seconds:.2f}s"
+        )
+        return records
+    
+    def extract_reviews_from_snapshot(self, iframe_locator, limit: Optional[int] = None) -> List[Dict]:
+        """Dump the reviews iframe HTML once and parse it off-browser.
+        
+        The snapshot is kept in data/snapshots so it can be re-parsed later.
+        """
+        start = time.perf_counter()
+        html = iframe_locator.locator('html').evaluate('el => el.outerHTML')
+        dump_seconds = time.perf_counter() - start
+        
+        snapshot_dir = config.data_dir / 'snapshots'
+        snapshot_dir.mkdir(exist_ok=True)
+        snapshot_path = snapshot_dir / f"reviews_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
+        snapshot_path.write_text(html, encoding='utf-8')
+        
+        start = time.perf_counter()
+        records = SnapshotParser().parse_html(html)
+        parse_seconds = time.perf_counter() - start
+        
+        if limit is not None:
+            records = records[:limit]
+        
+        self.last_extraction_stats = {
+            'mode': 'snapshot',
+            'cards': len(records),
+            'snapshot_bytes': len(html.encode('utf-8')),
+            'dump_seconds': round(dump_seconds, 3),
+            'parse_seconds': round(parse_seconds, 3),
+            'snapshot_path': str(snapshot_path)
+        }
+        logger.info(
+            f"Snapshot extraction: dumped {len(html) / 1024:.0f} KB in {dump_seconds:.2f}s, "
+            f"parsed {len(records)} reviews in {parse_seconds:.2f}s ({snapshot_path})"
+        )
+        return records
+    
+    def extract_reviews_from_network(self, iframe_locator, capture: ReviewPayloadCapture,
+                                     limit: Optional[int] = None) -> List[Dict]:
+        """Decode reviews from captured XHR payloads instead of the rendered DOM.
+        
+        A small DOM sample is used to learn where each field sits in the
+        payload and to cross-check that mapping; if the required fields do not
+        agree, extraction falls back to the bulk DOM path. Cards that never
+        appeared in a payload (e.g. the server-rendered first page) are read
+        from the DOM, as are owner replies when the reply path did not
+        cross-check.
+        """
+        start = time.perf_counter()
+        card_ids = iframe_locator.locator('div.noyJyc div.KuKPRc').evaluate_all(REVIEW_IDS_JS)
+        
+        # Only the loaded cards' IDs count as review IDs in the payloads
+        decoder = ReviewPayloadDecoder(card_ids)
+        if limit is not None:
+            card_ids = card_ids[:limit]
+        bodies = capture.bodies()
+        for body in bodies:
+            decoder.feed(body)
+        
+        # Only cards that also appeared in a payload are useful for calibration
+        decoded_indexes = [index for index, review_id in enumerate(card_ids) if review_id in decoder.nodes]
+        sample = self.extract_reviews_bulk(iframe_locator, indexes=decoded_indexes[:config.network_sample_size])
+        decoder.calibrate(sample[::2])
+        agreement = decoder.cross_check(sample[1::2])
+        
+        stats = {
+            'mode': 'network',
+            'payloads': len(bodies),
+            'payload_bytes': sum(len(body.encode('utf-8')) for body in bodies),
+            'decoded_reviews': len(decoder.nodes),
+            'calibrated_fields': sorted(decoder.paths),
+            'cross_check': agreement,
+            'dom_sample': len(sample)
+        }
+        
+        trusted = all(agreement.get(field, 0) >= config.network_min_agreement for field in REQUIRED_FIELDS)
+        if not trusted:
+            logger.warning(f"Network payloads failed the DOM cross-check ({agreement}) - falling back to DOM extraction")
+            records = self.extract_reviews_bulk(iframe_locator, limit=limit)
+            self.last_extraction_stats.update({'network': stats, 'network_fallback': True})
+            return records
+        
+        # Without a cross-checked reply path, replied reviews would be saved as
+        # unreplied and answered twice - read the replies from the DOM instead
+        dom_replies = None
+        if agreement.get('Owner Reply Text', 0) < config.network_min_agreement:
+            dom_replies = iframe_locator.locator('div.noyJyc').evaluate_all(
+                f"cards => cards.map({OWNER_REPLY_JS.strip()})"
+            )
+        
+        sample_by_id = {record['Review ID']: record for record in sample}
+        records = []
+        missing_indexes = []
+        for index, review_id in enumerate(card_ids):
+            if review_id in sample_by_id:
+                records.append(sample_by_id[review_id])
+            elif review_id in decoder.nodes:
+                record = decoder.decode(review_id)
+                if dom_replies is not None:
+                    record['Owner Reply Text'] = dom_replies[index] if index < len(dom_replies) else None
+                records.append(record)
+            else:
+                missing_indexes.append(index)
+        
+        if missing_indexes:
+            records.extend(self.extract_reviews_bulk(iframe_locator, indexes=missing_indexes))
+        
+        stats.update({
+            'cards': len(card_ids),
+            'dom_filled': len(missing_indexes),
+            'dom_replies': dom_replies is not None,
+            'seconds': round(time.perf_counter() - start, 3)
+        })
+        self.last_extraction_stats = stats
+        logger.info(
+            f"Network extraction: {len(card_ids)} cards, {len(decoder.nodes)} decoded from "
+            f"{len(bodies)} payloads, {len(missing_indexes)} read from DOM, "
+            f"cross-check {agreement} in {stats['seconds']:.2f}s"
+        )
+        return records
+    
+    def _benchmark_locator_path(self, cards, total_cards: int, bulk_seconds: float) -> None:
+        """Time the per-locator path on a sample of cards and log the comparison."""
+        sample_size = min(config.extraction_benchmark_sample, total_cards)
+        start = time.perf_counter()
+        for index in range(sample_size):
+            self.extract_review_data(cards.nth(index), index)
+        sample_seconds = time.perf_counter() - start
+        
+        per_card = sample_seconds / sample_size
+        projected = per_card * total_cards
+        speedup = projected / bulk_seconds if bulk_seconds > 0 else float('inf')
+        self.last_extraction_stats.update({
+            'locator_sample_cards': sample_size,
+            'locator_ms_per_card': round(1000 * per_card, 1),
+            'locator_projected_seconds': round(projected, 1)
+        })
+        logger.info(
+            f"Per-locator benchmark: {sample_size} cards in {sample_seconds:.2f}s "
+            f"({1000 * per_card:.1f} ms/card, projected {projected:.1f}s for {total_cards} cards) "
+            f"vs bulk {bulk_seconds:.2f}s - {speedup:.0f}x faster"
+        )
+
+class ShardPager:
+    """Pagination state for one shard tab, stepped by ReviewExtractor.paginate_shards."""
+    
+    def __init__(self, label: str, page: Page, iframe_locator: FrameLocator, extractor: ReviewExtractor,
+                 stats: Dict, known_ids: Optional[set] = None):
+        self.label = label
+        self.page = page
+        self.iframe_locator = iframe_locator
+        self.extractor = extractor
+        self.known_ids = known_ids
+        self.incremental = config.incremental_collection and known_ids is not None
+        self.cards = iframe_locator.locator('div.noyJyc')
+        self.more_reviews_button = iframe_locator.locator('button[aria-label="More Reviews"]')
+        self.stats = stats
+        self.stats.update({
+            'shard': label,
+            'incremental': self.incremental,
+            'pages_loaded': 0,
+            'cards_loaded': 0,
+            'new_ids_seen': 0,
+            'stop_reason': None,
+            'last_new_review_id': None
+        })
+        self.attempts = 0
+        self.stale_pages = 0
+        self.stalled_attempts = 0
+        self.checked_count = 0
+        self.requested_from = None
+        self.watch = self.incremental or stats.get('cursor_review_id')
+        
+        if self.watch:
+            # The first page is already loaded by the filter click
+            self.checked_count, has_new = extractor._check_watermark(iframe_locator, known_ids, 0, self.stats)
+            self.stale_pages = 0 if has_new else 1
+    
+    @property
+    def done(self) -> bool:
+        return self.stats['stop_reason'] is not None
+    
+    def request_more(self) -> None:
+        """Ask for the next page without waiting for it to load."""
+        if 'cursor_index' in self.stats:
+            self._stop('cursor')
+            return
+        if self.incremental and self.stale_pages >= config.incremental_stale_pages:
+            self._stop('watermark')
+            return
+        if self.attempts >= self.extractor.max_pages:
+            self._stop('max_attempts')
+            return
+        
+        self.attempts += 1
+        try:
+            self.requested_from = self.cards.count()
+            if self.more_reviews_button.count() > 0 and self.more_reviews_button.first.is_visible():
+                self.more_reviews_button.first.click()
+            else:
+                self.cards.last.scroll_into_view_if_needed(timeout=3000)
+        except Exception as e:
+            logger.warning(f"[{self.label}] Error requesting more reviews: {e}")
+            self._stop('error')
+    
+    def await_more(self) -> None:
+        """Wait for the page requested by request_more and update the stop state."""
+        if self.done or self.requested_from is None:
+            return
+        initial_count, self.requested_from = self.requested_from, None
+        
+        try:
+            cards_grew = self.extractor._wait_for_signal(
+                'card_count',
+                lambda timeout: self.cards.nth(initial_count).wait_for(state='attached', timeout=timeout),
+                config.pagination_card_timeout_ms,
+                self.stats
+            )
+            if cards_grew:
+                self.stats['pages_loaded'] += 1
+                self.stalled_attempts = 0
+                if self.watch:
+                    self.checked_count, has_new = self.extractor._check_watermark(
+                        self.iframe_locator, self.known_ids, self.checked_count, self.stats
+                    )
+                    self.stale_pages = 0 if has_new else self.stale_pages + 1
+            elif self.extractor._wait_for_signal(
+                'button_hidden',
+                lambda timeout: self.more_reviews_button.first.wait_for(state='hidden', timeout=timeout),
+                config.pagination_button_timeout_ms,
+                self.stats
+            ):
+                self._stop('exhausted')
+            else:
+                self.stalled_attempts += 1
+                if self.stalled_attempts >= config.pagination_stale_attempts:
+                    logger.warning(f"[{self.label}] Stopping pagination: {self.stalled_attempts} attempts loaded no new cards")
+                    self._stop('stalled')
+        except Exception as e:
+            logger.warning(f"[{self.label}] Error during pagination: {e}")
+            self._stop('error')
+    
+    def finish(self) -> None:
+        """Record the final card count."""
+        try:
+            self.stats['cards_loaded'] = self.cards.count()
+        except Exception:
+            pass
+        logger.info(f"[{self.label}] Pagination stopped ({self.stats['stop_reason']}): {self.stats}")
+    
+    def _stop(self, reason: str) -> None:
+        self.stats['stop_reason'] = reason
 
 class ReviewCollector:
     """Main review collection orchestrator."""
@@ -329,165 +1150,353 @@ class ReviewCollector:
     def __init__(self):
         self.authenticator = GoogleAuthenticator()
         self.extractor = ReviewExtractor()
-        self.db = ReviewDatabase()
+        self.db = get_database()
     
-    def _get_existing_review_ids(self) -> set:
-        """Get all Review IDs from database to prevent duplicates."""
-        try:
-            # Get all reviews from database and extract IDs
-            if config.use_database:
-                # Use database
-                all_reviews = self.db.client.table('reviews').select('review_id').execute()
-                existing_ids = {row['review_id'] for row in all_reviews.data if all_reviews.data}
-                logger.info(f"Found {len(existing_ids)} existing review IDs in database")
-                return existing_ids
-            else:
-                # Fall back to CSV (legacy mode)
-                existing_ids = set()
-                master_db_path = config.data_dir / 'reviews_master_database.csv'
+    def _get_existing_review_ids(self) -> ReviewIdIndex:
+        """Known review IDs from the local index, synced with the database (or master CSV) first."""
+        index = ReviewIdIndex()
+        index.sync(self.db if config.use_database else None)
+        return index
+    
+    def _iter_review_sources(self, page: Page, context: BrowserContext, known_ids: set
+                             ) -> Iterator[Tuple[Listing, FrameLocator, Optional[ReviewPayloadCapture], Dict]]:
+        """Yield (listing, iframe locator, payload capture, pagination stats) per paginated review list.
+        
+        With one listing and no shard_filters this is the Unreplied list on
+        the main page. Sync mode reads one unfiltered list per listing. Otherwise every (listing, shard filter) pair gets its
+        own tab in the same context; tabs are opened and paginated together in
+        batches limited by shard_concurrency and each listing's max_tabs, and
+        closed once their reviews have been extracted.
+        """
+        sync_mode = config.collection_mode == 'sync'
+        tasks = [
+            (listing, label)
+            for listing in config.listings
+            for label in ((None,) if sync_mode else listing.shard_filters or config.shard_filters or (None,))
+        ]
+        if tasks == [(config.listings[0], None)]:
+            capture = self._start_capture(page)
+            iframe_locator = self.extractor.navigate_to_reviews(page, known_ids, config.listings[0])
+            if capture:
+                capture.stop()
+            if iframe_locator:
+                yield config.listings[0], iframe_locator, capture, self.extractor.pagination_stats
+            return
+        
+        for batch in self._schedule_tabs(tasks):
+            pagers, captures = [], {}
+            try:
+                for listing, label in batch:
+                    tab_label = f"{listing.name}:{label}" if label else listing.name
+                    tab_page = context.new_page()
+                    capture = self._start_capture(tab_page)
+                    stats = {'listing_id': listing.listing_id, 'waits': {}}
+                    iframe_locator = self.extractor.open_shard(tab_page, label, stats, listing)
+                    if iframe_locator:
+                        pagers.append(ShardPager(tab_label, tab_page, iframe_locator, self.extractor, stats, known_ids))
+                        captures[tab_label] = (listing, capture)
+                    else:
+                        stats.update({'shard': tab_label, 'stop_reason': 'error'})
+                        self.listing_runs[listing.listing_id]['pagination'].append(stats)
+                        tab_page.close()
                 
+                self.extractor.paginate_shards(pagers)
+                for pager in pagers:
+                    listing, capture = captures[pager.label]
+                    if capture:
+                        capture.stop()
+                    yield listing, pager.iframe_locator, capture, pager.stats
+            finally:
+                for pager in pagers:
+                    pager.page.close()
+    
+    def _advance_sync_cursor(self, sync_cursor: SyncCursor, listing: Listing, pagination_stats: Dict,
+                             newest_time: Optional[str]) -> None:
+        """Move a listing's sync cursor to the newest review, if the sync covered everything above the old one.
+        
+        A sync that stopped early (page cap, error) or failed to save keeps the
+        old cursor, so the next run walks the gap again.
+        """
+        newest_id = pagination_stats.get('newest_review_id')
+        if not newest_id or newest_id == pagination_stats.get('cursor_review_id'):
+            return
+        if pagination_stats.get('stop_reason') not in ('cursor', 'exhausted'):
+            logger.warning(
+                f"Sync of {listing.name} stopped early ({pagination_stats.get('stop_reason')}) - keeping its cursor"
+            )
+            return
+        if self.listing_runs[listing.listing_id]['save'].get('failed'):
+            logger.warning(f"Some reviews of {listing.name} failed to save - keeping its cursor")
+            return
+        sync_cursor.save(listing.listing_id, newest_id, newest_time)
+        pagination_stats['cursor_advanced_to'] = newest_id
+    
+    def _schedule_tabs(self, tasks: List[Tuple[Listing, Optional[str]]]) -> List[List[Tuple[Listing, Optional[str]]]]:
+        """Split (listing, shard) tasks into batches of tabs that are open at the same time.
+        
+        A batch holds at most shard_concurrency tabs, and at most max_tabs
+        tabs of any one listing.
+        """
+        batches = []
+        pending = list(tasks)
+        while pending:
+            batch = []
+            tabs_per_listing = Counter()
+            for task in list(pending):
+                listing = task[0]
+                if len(batch) >= config.shard_concurrency:
+                    break
+                if tabs_per_listing[listing.listing_id] >= (listing.max_tabs or config.shard_concurrency):
+                    continue
+                batch.append(task)
+                tabs_per_listing[listing.listing_id] += 1
+                pending.remove(task)
+            batches.append(batch)
+        return batches
+    
+    def _start_capture(self, page: Page) -> Optional[ReviewPayloadCapture]:
+        """Capture review XHR payloads while paginating, in network mode."""
+        if config.extraction_mode != 'network':
+            return None
+        capture = ReviewPayloadCapture(page)
+        capture.start()
+        return capture
+    
+    def _stop_tracing(self, context: BrowserContext, failure_recorder: FailureRecorder) -> None:
+        """Save the trace if the run recorded a failure, otherwise discard it."""
+        try:
+            trace_path = failure_recorder.trace_path
+            context.tracing.stop(path=trace_path)
+            if trace_path:
+                logger.warning(f"Saved Playwright trace: {trace_path}")
+                failure_recorder.prune()
+        except Exception as e:
+            logger.warning(f"Failed to stop tracing: {e}")
+    
+    def _flush_reviews(self, reviews_data: List[Dict], checkpoint: CollectionCheckpoint,
+                       listing_id: Optional[str] = None) -> int:
+        """Persist a chunk of one listing's extracted reviews and checkpoint the IDs that were stored.
+        
+        Returns the number of reviews saved; the listing's run totals are updated.
+        Reviews that failed to save are not checkpointed, so a resumed run retries them.
+        """
+        with self.extractor.timer.phase('save', len(reviews_data)):
+            total_saved, stored_ids = self._persist_reviews(reviews_data)
+        checkpoint.add(stored_ids)
+        
+        run = self.listing_runs[listing_id or config.listings[0].listing_id]
+        run['collected'] += len(reviews_data)
+        run['saved'] += total_saved
+        if config.use_database:
+            for outcome, count in self.db.last_save_stats.items():
+                run['save'][outcome] = run['save'].get(outcome, 0) + count
+        return total_saved
+    
+    def _log_listing_runs(self, timer: RunTimer, resource_policy: Optional[ResourcePolicy]) -> None:
+        """Write one processing_logs entry per listing.
+        
+        Counts, save outcomes, pagination and extraction are the listing's
+        own. Listings share one browser and timer, so duration_seconds and
+        everything under metadata['run_totals'] cover the whole run.
+        A listing whose saves failed or whose pagination errored is logged
+        as PARTIAL instead of SUCCESS.
+        """
+        timestamp = datetime.now().strftime('%Y-%m-%d')
+        run_totals = {
+            'listings': len(self.listing_runs),
+            'phases': timer.summary()['phases'],
+            'resources': resource_policy.summary() if resource_policy else None,
+            'selectors': self.extractor.selectors.summary()
+        }
+        for run in self.listing_runs.values():
+            listing = run['listing']
+            degraded = run['save'].get('failed') or any(stats.get('stop_reason') == 'error' for stats in run['pagination'])
+            self.db.log_run(
+                run_date=timestamp,
+                reviews_collected=run['collected'],
+                new_reviews=run['save'].get('new', 0),
+                duration_seconds=round(timer.total_seconds, 2),
+                status='PARTIAL' if degraded else 'SUCCESS',
+                metadata={
+                    'listing_id': listing.listing_id,
+                    'listing_name': listing.name,
+                    'mode': config.collection_mode,
+                    'save': run['save'],
+                    'pagination': run['pagination'][0] if len(run['pagination']) == 1 else {'shards': run['pagination']},
+                    'extraction': run['extraction'][0] if len(run['extraction']) == 1 else run['extraction'],
+                    'run_totals': run_totals
+                }
+            )
+    
+    def _persist_reviews(self, reviews_data: List[Dict]) -> Tuple[int, List[str]]:
+        """Save reviews to the database, or append them to the CSV master and backup.
+        
+        Returns the number saved and the IDs that are now stored.
+        """
+        if config.use_database:
+            logger.info(f"Saving {len(reviews_data)} reviews to database")
+            total_saved, _ = self.db.save_reviews(reviews_data)
+            return total_saved, self.db.last_saved_ids
+        else:
+            # Legacy CSV mode
+            df = pd.DataFrame(reviews_data).drop(columns=[PARTIAL_TEXT], errors='ignore')
+            master_db_path = config.data_dir / 'reviews_master_database.csv'
+            
+            # Add collection timestamp to new reviews
+            df['Collection_Timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            
+            # Append to master database (or create if doesn't exist)
+            try:
                 if master_db_path.exists():
-                    logger.info(f"Reading master database: {master_db_path}")
-                    df = pd.read_csv(master_db_path)
-                    
-                    if 'Review ID' in df.columns:
-                        existing_ids = set(df['Review ID'].dropna().astype(str))
-                        logger.info(f"Found {len(existing_ids)} existing review IDs in master database")
-                    else:
-                        logger.warning("Master database missing 'Review ID' column")
+                    logger.info(f"Appending {len(reviews_data)} new reviews to master database")
+                    self._align_columns(df, master_db_path).to_csv(
+                        master_db_path, mode='a', header=False, index=False, escapechar='\\', doublequote=True, quoting=1
+                    )
                 else:
-                    logger.info("Master database not found - will create new one")
-                
-                return existing_ids
+                    logger.info(f"Creating new master database with {len(reviews_data)} reviews")
+                    df.to_csv(master_db_path, index=False, escapechar='\\', doublequote=True, quoting=1)
+            except OSError as e:
+                logger.error(f"Error writing {len(reviews_data)} reviews to master database: {e}")
+                return 0, []
             
-        except Exception as e:
-            logger.warning(f"Error reading existing reviews: {e}")
-            return set()
+            # Append to the timestamped backup copy for this collection run
+            try:
+                backup_exists = self._backup_path.exists()
+                backup = self._align_columns(df, self._backup_path) if backup_exists else df
+                backup.to_csv(self._backup_path, mode='a', header=not backup_exists, index=False, escapechar='\\', doublequote=True, quoting=1)
+                logger.info(f"Updated backup: {self._backup_path}")
+            except OSError as e:
+                logger.warning(f"Error updating backup {self._backup_path}: {e}")
+            return len(reviews_data), [str(review.get('Review ID')) for review in reviews_data]
+    
+    def _align_columns(self, df: pd.DataFrame, csv_path: Path) -> pd.DataFrame:
+        """Reorder (and pad) a chunk to an existing CSV's header, since chunks can lack fields."""
+        return df.reindex(columns=pd.read_csv(csv_path, nrows=0).columns)
     
     def collect_unreplied_reviews(self) -> Tuple[int, Optional[str]]:
         """Collect unreplied reviews and save to database."""
         logger.info("Starting review collection process")
+        timer = self.extractor.timer = RunTimer()
         
         # Get existing review IDs to prevent duplicates
-        existing_ids = self._get_existing_review_ids()
+        with timer.phase('load_known_ids') as span:
+            existing_ids = self._get_existing_review_ids()
+            span['items'] = len(existing_ids)
+        
+        # Resume an interrupted run without re-extracting what it already flushed
+        checkpoint = CollectionCheckpoint()
+        skip_ids = checkpoint.load()
+        sync_mode = config.collection_mode == 'sync'
+        if not (config.use_database and (config.detect_edits or sync_mode)):
+            skip_ids = skip_ids | existing_ids
+        
+        # A sync walks all reviews newest-first and stops at each listing's cursor
+        sync_cursor = SyncCursor(self.db if config.use_database else None) if sync_mode else None
+        if sync_cursor:
+            self.extractor.cursors = {
+                listing.listing_id: (sync_cursor.load(listing.listing_id) or {}).get('review_id')
+                for listing in config.listings
+            }
+        self.listing_runs = {
+            listing.listing_id: {'listing': listing, 'collected': 0, 'saved': 0, 'save': {}, 'pagination': [], 'extraction': []}
+            for listing in config.listings
+        }
+        self._backup_path = config.data_dir / f"reviews_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         
         with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=config.headless,
-                args=['--disable-blink-features=AutomationControlled']
-            )
+            # Authenticate, reusing a saved session when possible
+            with timer.phase('auth'):
+                session = self.authenticator.open_session(p)
+            if not session:
+                return 0, None
+            browser, context, page = session
             
-            context = browser.new_context(
-                user_agent=config.user_agent,
-                viewport={'width': config.viewport_width, 'height': config.viewport_height}
-            )
+            # Skip images, fonts and trackers - only the DOM and XHR are needed
+            resource_policy = ResourcePolicy() if config.block_resources else None
+            if resource_policy:
+                resource_policy.install(context)
             
-            page = context.new_page()
+            # The trace is only written to disk if something fails
+            failure_recorder = self.extractor.failure_recorder
+            if config.failure_tracing:
+                context.tracing.start(screenshots=True, snapshots=True)
             
             try:
-                # Authenticate
-                if not self.authenticator.authenticate(page):
-                    return 0, None
+                # Extract reviews from each list, flushing every flush_every records
+                chunk = []
+                seen_ids = set()
+                known_ids = None if sync_mode else existing_ids
+                for listing, iframe_locator, capture, pagination_stats in self._iter_review_sources(page, context, known_ids):
+                    run = self.listing_runs[listing.listing_id]
+                    run['pagination'].append(pagination_stats)
+                    # A sync reads only the cards above its cursor
+                    limit = pagination_stats.get('cursor_index') if sync_mode else config.max_reviews
+                    newest_time = None
+                    for review_data in timer.iterate('extract', self.extractor.iter_reviews(
+                        iframe_locator, capture, limit=limit, skip_ids=skip_ids | seen_ids
+                    )):
+                        seen_ids.add(str(review_data.get('Review ID')))
+                        review_data['Listing ID'] = review_data.get('Listing ID') or listing.listing_id
+                        if review_data.get('Review ID') == pagination_stats.get('newest_review_id'):
+                            newest_time = review_data.get('Time')
+                        chunk.append(review_data)
+                        if len(chunk) >= config.flush_every:
+                            self._flush_reviews(chunk, checkpoint, listing.listing_id)
+                            chunk = []
+                    # Chunks never mix listings, so saves are counted per listing
+                    if chunk:
+                        self._flush_reviews(chunk, checkpoint, listing.listing_id)
+                        chunk = []
+                    run['extraction'].append(self.extractor.last_extraction_stats)
+                    if sync_cursor:
+                        self._advance_sync_cursor(sync_cursor, listing, pagination_stats, newest_time)
                 
-                # Navigate to reviews
-                iframe_locator = self.extractor.navigate_to_reviews(page)
-                if not iframe_locator:
+                runs = self.listing_runs.values()
+                if not any(run['extraction'] for run in runs):
                     return 0, None
+                reviews_collected = sum(run['collected'] for run in runs)
+                total_saved = sum(run['saved'] for run in runs)
                 
-                # Extract reviews
-                reviews_data = []
-                duplicates_skipped = 0
-                review_elements = iframe_locator.locator('div.noyJyc').all()
-                
-                logger.info(f"Found {len(review_elements)} review elements")
-                
-                for i, review_element in enumerate(review_elements):
-                    if i >= config.max_reviews:
-                        break
-                    
-                    # Take screenshot every 50 reviews for debugging
-                    if i > 0 and i % 50 == 0:
-                        try:
-                            screenshot_path = config.data_dir / f'debug_screenshot_{i}.png'
-                            page.screenshot(path=str(screenshot_path))
-                            logger.info(f"Took debug screenshot at review {i}: {screenshot_path}")
-                        except Exception as e:
-                            logger.warning(f"Failed to take screenshot: {e}")
-                        
-                    review_data = self.extractor.extract_review_data(review_element, i)
-                    if review_data:
-                        review_id = str(review_data.get('Review ID', ''))
-                        
-                        # Check for duplicates
-                        if review_id and review_id in existing_ids:
-                            duplicates_skipped += 1
-                            logger.debug(f"Skipping duplicate review ID: {review_id}")
-                            continue
-                        
-                        reviews_data.append(review_data)
-                        logger.info(f"Extracted review {i+1}/{len(review_elements)}: {review_data.get('Reviewer Name', 'Unknown')}")
-                    else:
-                        logger.warning(f"Failed to extract review {i+1}/{len(review_elements)}")
+                logger.info(f"Duplicate reviews skipped: {sum(stats.get('skipped', 0) for run in runs for stats in run['extraction'])}")
+                checkpoint.clear()
                 
-                logger.info(f"Duplicate reviews skipped: {duplicates_skipped}")
+                timer.log_summary('Collection')
+                if config.use_database:
+                    # Log the collection run, one entry per listing
+                    self._log_listing_runs(timer, resource_policy)
                 
-                # Save to database or CSV based on configuration
-                if reviews_data:
-                    if config.use_database:
-                        # Save to database
-                        logger.info(f"Saving {len(reviews_data)} new reviews to database")
-                        total_saved, new_reviews = self.db.save_reviews(reviews_data)
-                        
-                        # Log the collection run
-                        timestamp = datetime.now().strftime('%Y-%m-%d')
-                        self.db.log_run(
-                            run_date=timestamp,
-                            reviews_collected=len(reviews_data),
-                            new_reviews=total_saved,
-                            duration_seconds=0,  # Could be calculated if needed
-                            status='completed'
-                        )
-                        
-                        logger.info(f"Successfully saved {total_saved} new reviews to database")
-                        return total_saved, "database"
-                    else:
-                        # Legacy CSV mode
-                        df = pd.DataFrame(reviews_data)
-                        master_db_path = config.data_dir / 'reviews_master_database.csv'
-                        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                        
-                        # Add collection timestamp to new reviews
-                        df['Collection_Timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                        
-                        # Append to master database (or create if doesn't exist)
-                        if master_db_path.exists():
-                            logger.info(f"Appending {len(reviews_data)} new reviews to master database")
-                            df.to_csv(master_db_path, mode='a', header=False, index=False, escapechar='\\', doublequote=True, quoting=1)
-                        else:
-                            logger.info(f"Creating new master database with {len(reviews_data)} reviews")
-                            df.to_csv(master_db_path, index=False, escapechar='\\', doublequote=True, quoting=1)
-                        
-                        # Create timestamped backup copy for this collection run
-                        backup_filename = config.data_dir / f'reviews_backup_{timestamp}.csv'
-                        df.to_csv(backup_filename, index=False, escapechar='\\', doublequote=True, quoting=1)
-                        
-                        logger.info(f"Successfully saved {len(reviews_data)} new reviews to master database")
-                        logger.info(f"Created backup: {backup_filename}")
-                        return len(reviews_data), str(master_db_path)
+                if not reviews_collected:
+                    return 0, None
+                if config.use_database:
+                    logger.info(f"Successfully saved {total_saved} new or edited reviews to database")
+                    return total_saved, "database"
                 
-                return 0, None
+                master_db_path = config.data_dir / 'reviews_master_database.csv'
+                logger.info(f"Successfully saved {reviews_collected} new reviews to master database")
+                return reviews_collected, str(master_db_path)
                 
             except Exception as e:
                 logger.error(f"Error during review collection: {e}")
+                failure_recorder.dump(f"collection error: {e}")
                 return 0, None
             
             finally:
+                if config.failure_tracing:
+                    self._stop_tracing(context, failure_recorder)
+                if resource_policy:
+                    resource_policy.log_summary()
+                self.extractor.selectors.log_summary()
+                self.extractor.selectors.save()
+                self.authenticator.save_session(context)
                 browser.close()
 
 def main():
     """Main entry point."""
     collector = ReviewCollector()
-    count, filename = collector.collect_unreplied_reviews()
+    try:
+        count, filename = collector.collect_unreplied_reviews()
+    finally:
+        collector.db.close()
     
     if count > 0:
         print(f"Successfully collected {count} unreplied reviews")
@@ -0,0 +1,80 @@
+"""Browser-independent helpers for turning raw review card fields into records.
+
+Shared by the live Playwright extractor and the offline snapshot parser so both
+produce exactly the same record dict.
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+
+def extract_number(text: Optional[str], pattern: str) -> Optional[int]:
+    """Extract number using regex pattern."""
+    if not text:
+        return None
+    match = re.search(pattern, text)
+    return int(match.group(1)) if match else None
+
+
+def parse_metadata(texts: List[str]) -> Tuple[Optional[bool], Optional[str], Optional[str]]:
+    """Parse dining metadata from the metadata span texts."""
+    dine_in, session, price_range = None, None, None
+    for text in texts:
+        if not text:
+            continue
+        if "Dine in" in text:
+            dine_in = True
+        if "Lunch" in text:
+            session = "Lunch"
+        elif "Dinner" in text:
+            session = "Dinner"
+        if "₹" in text:
+            price_range = text
+    return dine_in, session, price_range
+
+
+def parse_individual_ratings(ratings_text: Optional[str]) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    """Parse Food, Service, Atmosphere ratings from the ratings block text."""
+    food_rating = extract_number(ratings_text, r"Food:\s*(\d+)/5")
+    service_rating = extract_number(ratings_text, r"Service:\s*(\d+)/5")
+    atmosphere_rating = extract_number(ratings_text, r"Atmosphere:\s*(\d+)/5")
+    return food_rating, service_rating, atmosphere_rating
+
+
+def build_review_record(raw: Dict) -> Dict:
+    """Convert raw card fields into the review record format.
+
+    The raw dict uses the keys returned by BULK_EXTRACT_JS: review_id,
+    listing_id, share_url, reviewer_name, reviewer_profile_url,
+    reviewer_details, rating, time, review_text, metadata, ratings_text, images
+    and owner_reply_text.
+    """
+    reviewer_details = raw.get('reviewer_details')
+    dine_in, session, price_range = parse_metadata(raw.get('metadata') or [])
+    food_rating, service_rating, atmosphere_rating = parse_individual_ratings(raw.get('ratings_text'))
+
+    return {
+        'Reviewer Name': raw.get('reviewer_name'),
+        'Reviewer Profile URL': raw.get('reviewer_profile_url'),
+        'Is Local Guide': "Local Guide" in reviewer_details if reviewer_details else False,
+        'Review Count': extract_number(reviewer_details, r"(\d+)\s+reviews"),
+        'Photo Count': extract_number(reviewer_details, r"(\d+)\s+photos"),
+        'Rating': raw.get('rating') or "No rating",
+        'Time': raw.get('time'),
+        'Review Text': raw.get('review_text'),
+        'Review ID': raw.get('review_id'),
+        'Listing ID': raw.get('listing_id'),
+        'Share URL': raw.get('share_url'),
+        'Dine In': dine_in,
+        'Session': session,
+        'Price Range': price_range,
+        'Food Rating': food_rating,
+        'Service Rating': service_rating,
+        'Atmosphere Rating': atmosphere_rating,
+        'Images': raw.get('images') or [],
+        'Owner Reply Text': raw.get('owner_reply_text')
+    }
+
+
+def is_complete(raw: Dict) -> bool:
+    """Whether a raw card has the fields a record cannot do without."""
+    return not raw.get('error') and bool(raw.get('review_id')) and bool(raw.get('reviewer_name'))
@@ -0,0 +1,130 @@
+"""Browser-free review extraction from saved reviews iframe HTML.
+
+Uses the same selectors as ReviewExtractor and returns the same record dicts,
+so historical snapshots can be re-parsed and extraction benchmarked without
+Chromium.
+
+Usage:
+    python src/collectors/snapshot_parser.py "Each Review Outer HTML.html" [more.html ...] [--json]
+"""
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.collectors.review_record import build_review_record, is_complete
+
+# Elements whose boundaries become line breaks, approximating innerText
+BLOCK_TAGS = {'div', 'p', 'br', 'li', 'ul', 'ol', 'article', 'section', 'h1', 'h2', 'h3', 'h4'}
+
+
+class SnapshotParser:
+    """Parses review cards out of saved reviews iframe HTML."""
+
+    def parse_html(self, html: str) -> List[Dict]:
+        """Parse every div.noyJyc card in the HTML into review records."""
+        soup = BeautifulSoup(html, 'html.parser')
+        records = []
+        for index, card in enumerate(soup.select('div.noyJyc')):
+            raw = self.parse_card(card, index)
+            if is_complete(raw):
+                records.append(build_review_record(raw))
+        return records
+
+    def parse_file(self, path: Union[str, Path]) -> List[Dict]:
+        """Parse a saved HTML snapshot file."""
+        return self.parse_html(Path(path).read_text(encoding='utf-8'))
+
+    def parse_card(self, card: Tag, index: int = 0) -> Dict:
+        """Read the raw fields of one card, mirroring BULK_EXTRACT_JS."""
+        try:
+            meta = card.select_one('div.KuKPRc')
+            profile = card.select_one('a.PskQHd[aria-label*="Link to reviewer profile"]')
+            stars = card.select_one('span[role="img"]')
+            full_text = card.select_one('div[jsname="PBWx0c"]')
+            truncated = card.select_one('a[jsname="ix0Hvc"]') is not None
+
+            return {
+                'index': index,
+                'review_id': meta.get('data-review-id') if meta else None,
+                'listing_id': meta.get('data-listing-id') if meta else None,
+                'share_url': meta.get('data-share-review-url') if meta else None,
+                'reviewer_name': self._text(card, 'a.PskQHd[jsname="xs1xe"]'),
+                'reviewer_profile_url': profile.get('href') if profile else None,
+                'reviewer_details': self._text(card, 'div.PROnRd.vq72z'),
+                'rating': stars.get('aria-label') if stars else None,
+                'time': self._text(card, 'span.KEfuhb'),
+                'review_text': inner_text(full_text) if truncated and full_text else self._text(card, 'div.gyKkFe.JhRJje.Fv38Af'),
+                'metadata': [inner_text(span) for span in card.select('span.PROnRd.mpP9nc')],
+                'ratings_text': self._text(card, 'div.fjB0Xb'),
+                'images': [img.get('src') for img in card.select('img.T3g1hc') if img.get('src')],
+                'owner_reply_text': self._owner_reply(card)
+            }
+        except Exception as e:
+            return {'index': index, 'error': str(e)}
+
+    def _owner_reply(self, card: Tag) -> Optional[str]:
+        """Text of the owner's reply next to the card, mirroring OWNER_REPLY_JS."""
+        article = card.find_parent('article')
+        section = article.parent.select_one('div.UP87Yb') if article and article.parent else None
+        if not section:
+            return None
+        section = BeautifulSoup(str(section), 'html.parser')
+        for control in section.select('button, textarea, [role="button"]'):
+            control.decompose()
+        return inner_text(section) or None
+
+    def _text(self, card: Tag, selector: str) -> Optional[str]:
+        """Text of the first element matching selector, or None."""
+        element = card.select_one(selector)
+        return inner_text(element) if element else None
+
+
+def inner_text(element: Tag) -> str:
+    """Approximate the browser's innerText: block boundaries become newlines."""
+    parts = []
+
+    def walk(node):
+        for child in node.children:
+            if isinstance(child, NavigableString):
+                parts.append(str(child))
+            elif isinstance(child, Tag):
+                block = child.name in BLOCK_TAGS
+                if block:
+                    parts.append('\n')
+                walk(child)
+                if block:
+                    parts.append('\n')
+
+    walk(element)
+    lines = [' '.join(line.split()) for line in ''.join(parts).split('\n')]
+    return '\n'.join(line for line in lines if line)
+
+
+def main():
+    """Parse snapshot files and report how long extraction took."""
+    paths = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if not paths:
+        print(__doc__)
+        sys.exit(1)
+
+    parser = SnapshotParser()
+    all_records = []
+    for path in paths:
+        start = time.perf_counter()
+        records = parser.parse_file(path)
+        elapsed = time.perf_counter() - start
+        all_records.extend(records)
+        print(f"{path}: {len(records)} reviews in {elapsed * 1000:.1f} ms", file=sys.stderr)
+
+    if '--json' in sys.argv:
+        print(json.dumps(all_records, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,22 @@ import pandas as pd
 import time
 import random
 import os
+import sys
 import logging
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
+from pathlib import Path
 import json
 
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from config.settings import config
+from src.collectors.review_collector import GoogleAuthenticator
+from src.utils.database import get_database
+from src.utils.resource_policy import ResourcePolicy
+from src.utils.selector_registry import SelectorRegistry
+from src.utils.timing import RunTimer
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,6 +26,8 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+REPLY_FORM_TIMEOUT_MS = 30000  # Reply button and form appear after expanding/clicking; Playwright's default wait
+
 def convert_time_to_datetime(time_str):
     """Convert various time formats to datetime"""
     now = datetime.now()
@@ -67,6 +80,8 @@ def post_replies_to_reviews(responses_data):
     """Post replies to unreplied Google reviews
     Args:
         responses_data: Either DataFrame or path to Excel file
+    Returns:
+        Review IDs whose reply was submitted
     """
     if isinstance(responses_data, str):
         df = pd.read_excel(responses_data)
@@ -75,58 +90,54 @@ def post_replies_to_reviews(responses_data):
     
     df = process_reviews_in_order(df)
     logger.info(f"Processing {len(df)} reviews")
+    timer = RunTimer()
+    selectors = SelectorRegistry()
     
     with sync_playwright() as p:
-        browser = p.chromium.launch(
-            headless=False,
-            args=['--disable-blink-features=AutomationControlled']
-        )
-        context = browser.new_context(
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36',
-            viewport={'width': 1920, 'height': 1080}
-        )
-        page = context.new_page()
+        # Login, reusing the saved session between batches
+        authenticator = GoogleAuthenticator()
+        with timer.phase('auth'):
+            session = authenticator.open_session(p)
+        if not session:
+            logger.error("Google login failed - skipping batch")
+            return []
+        browser, context, page = session
+        resource_policy = ResourcePolicy() if config.block_resources else None
+        if resource_policy:
+            resource_policy.install(context)
 
+        successful_replies = 0
+        posted_ids = []
         try:
-            # Login
-            page.goto('https://accounts.google.com/')
-            time.sleep(random.uniform(2, 5))
-            
-            email = os.getenv('GOOGLE_EMAIL')
-            page.locator('input[type="email"]').fill(email)
-            page.click('button:has-text("Next")')
-            page.wait_for_selector('input[type="password"]', timeout=30000)
-            
-            password = os.getenv('GOOGLE_PASSWORD')
-            page.locator('input[type="password"]').fill(password)
-            page.click('button:has-text("Next")')
-            
-            page.wait_for_url('https://myaccount.google.com/?pli=1', timeout=20000)
-            time.sleep(5)
-            
             # Navigate to reviews
-            page.goto('https://g.co/kgs/HgU3VjS', timeout=20000)
-            read_reviews_button = page.locator('button:has-text("Read reviews")')
-            read_reviews_button.click()
-            
-            iframe_locator = page.frame_locator('iframe[src*="/local/business/11382416837896137085/customers/reviews"]')
-            
-            # Click Unreplied filter
-            unreplied_button = iframe_locator.locator('button:has(span:has-text("Unreplied"))')
-            unreplied_button.click()
+            with timer.phase('navigate'):
+                page.goto('https://g.co/kgs/HgU3VjS', timeout=20000)
+                read_reviews_button = selectors.find(page, 'read_reviews', wait=True)
+                if not read_reviews_button:
+                    raise RuntimeError("'Read reviews' button not found")
+                read_reviews_button.first.click()
+                
+                iframe_locator = page.frame_locator('iframe[src*="/local/business/11382416837896137085/customers/reviews"]')
+                
+                # Click Unreplied filter
+                unreplied_button = selectors.find(iframe_locator, 'unreplied_filter', wait=True)
+                if not unreplied_button:
+                    raise RuntimeError("'Unreplied' filter not found")
+                unreplied_button.first.click()
             
             # Expand all reviews
-            expand_all_reviews(iframe_locator)
+            with timer.phase('paginate'):
+                expand_all_reviews(iframe_locator)
             
             # Scroll to top
             frame = iframe_locator.first
 #            frame.evaluate('window.scrollTo(0, 0)')
             time.sleep(2)
             
-            successful_replies = 0
             failed_replies = 0
             
             for idx, row in df.iterrows():
+                post_start = time.perf_counter()
                 try:
                     review_id = row['Review ID']
                     suggested_response = row['Suggested_Response']
@@ -142,7 +153,10 @@ def post_replies_to_reviews(responses_data):
                     review_container = iframe_locator.locator(f'div.J7elmb:has(div[data-review-id="{review_id}"])')
 
                     # Within this container, get the Reply button
-                    reply_button = review_container.locator('button:has(span:text-is("Reply"))')
+                    reply_button = selectors.find(review_container, 'reply_button', wait=True, timeout_ms=REPLY_FORM_TIMEOUT_MS)
+                    if not reply_button:
+                        raise RuntimeError("Reply button not found")
+                    reply_button = reply_button.first
 
 
                     # Print detailed information about the located button
@@ -162,21 +176,28 @@ def post_replies_to_reviews(responses_data):
                         logger.error("Reply button not found or not enabled")
                         #... (handle the error)
                                                                 
-                    # Fill response
-                    textarea = iframe_locator.locator('textarea[aria-label="Your public reply"]')
-                    textarea.fill(suggested_response)
+                    # Fill response - the reply form opens inside this review's container
+                    textarea = selectors.find(review_container, 'reply_textarea', wait=True, timeout_ms=REPLY_FORM_TIMEOUT_MS)
+                    if not textarea:
+                        raise RuntimeError("Reply text box not found")
+                    textarea.first.fill(suggested_response)
                     
                     # Submit
-                    submit_button = iframe_locator.locator('button.VfPpkd-LgbsSe.DuMIQc[jsname="hrGhad"]')
-                    submit_button.click()
+                    submit_button = selectors.find(review_container, 'reply_submit', wait=True, timeout_ms=REPLY_FORM_TIMEOUT_MS)
+                    if not submit_button:
+                        raise RuntimeError("Submit button not found")
+                    submit_button.first.click()
                     
                     time.sleep(random.uniform(3, 5))
                     successful_replies += 1
+                    posted_ids.append(review_id)
+                    timer.add('post', time.perf_counter() - post_start, 1)
                     #logger.info(f"Successfully replied to review {review_id}")
                     
                 except Exception as e:
                     logger.error(f"Error posting reply to review {review_id}: {e}")
                     failed_replies += 1
+                    timer.add('post_failed', time.perf_counter() - post_start, 1)
                     continue
                     
             logger.info(f"""
@@ -189,7 +210,34 @@ def post_replies_to_reviews(responses_data):
         except Exception as e:
             logger.error(f"Error in post_replies_to_reviews: {e}")
         finally:
+            if resource_policy:
+                resource_policy.log_summary()
+            selectors.log_summary()
+            selectors.save()
+            authenticator.save_session(context)
             browser.close()
+            timer.log_summary('Reply posting')
+            log_posting_run(len(df), successful_replies, timer)
+    return posted_ids
+
+
+def log_posting_run(reviews_processed, responses_posted, timer):
+    """Record a posting batch and its phase timings in processing_logs."""
+    if not config.use_database:
+        return
+    try:
+        db = get_database()
+        try:
+            log_id = db.log_process_start('posting')
+            if log_id:
+                db.log_process_complete(
+                    log_id, reviews_processed=reviews_processed,
+                    responses_posted=responses_posted, metadata=timer.summary()
+                )
+        finally:
+            db.close()
+    except Exception as e:
+        logger.warning(f"Could not log posting run: {e}")
 
 
 def process_in_batches(df, batch_size=25, batch_delay_mins=15):
@@ -239,10 +287,61 @@ def process_in_batches(df, batch_size=25, batch_delay_mins=15):
                 time.sleep(delay)
 
 
+def iter_pending_batches(db, batch_size=25):
+    """Yield generated, not yet posted responses as DataFrames of up to batch_size rows.
+    
+    Rows are streamed from the database one keyset page at a time, so only
+    the current batch is held in memory.
+    """
+    batch = []
+    for row in db.iter_pending_responses():
+        review = row.get('reviews') or {}
+        batch.append({
+            'Review ID': row['review_id'],
+            'Suggested_Response': row['response_text'],
+            'Time': review.get('review_time') or ''
+        })
+        if len(batch) >= batch_size:
+            yield pd.DataFrame(batch)
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch)
+
+
+def process_pending_responses(batch_size=25, batch_delay_mins=15):
+    """Post the database's pending responses batch by batch, marking each posted batch.
+    
+    Posted responses leave the pending set as soon as their batch is marked,
+    so an interrupted run resumes without a progress file.
+    """
+    db = get_database()
+    total_posted = 0
+    try:
+        for batch_num, batch_df in enumerate(iter_pending_batches(db, batch_size)):
+            if batch_num:
+                delay = random.uniform(batch_delay_mins * 0.8, batch_delay_mins * 1.2) * 60
+                logger.info(f"Batch complete. Pausing for {delay/60:.1f} minutes")
+                time.sleep(delay)
+            
+            logger.info(f"Processing batch {batch_num + 1} ({len(batch_df)} responses)")
+            posted_ids = post_replies_to_reviews(batch_df)
+            failures = db.mark_response_posted(posted_ids)
+            for failure in failures:
+                logger.error(f"Could not mark {len(failure['review_ids'])} posted responses in {failure['table']}: {failure['error']}")
+            total_posted += len(posted_ids)
+    finally:
+        db.close()
+    logger.info(f"Posted {total_posted} pending responses")
+    return total_posted
+
+
 if __name__ == "__main__":
     responses_file = '/Users/rajeshpanchanathan/Documents/Documents - Mac/PythonWork/PV_Reviews/Automate_Lower Ratings Last 4-6 months.xlsx'
     
-    if os.path.exists(responses_file):
+    if config.use_database:
+        # Stream pending responses from the database instead of the Excel export
+        process_pending_responses(batch_size=50, batch_delay_mins=5)
+    elif os.path.exists(responses_file):
         try:
             # Load the full dataframe
             df = pd.read_excel(responses_file)
@@ -19,8 +19,9 @@ from anthropic import Anthropic
 from dotenv import load_dotenv
 
 from config.settings import config
-from src.utils.database import ReviewDatabase
+from src.utils.database import get_database
 from src.utils.logging_config import setup_logging
+from src.utils.timing import RunTimer
 
 # Load environment variables
 load_dotenv()
@@ -32,7 +33,7 @@ class ResponseGenerator:
     
     def __init__(self):
         self.client = Anthropic(api_key=config.anthropic_api_key)
-        self.db = ReviewDatabase()
+        self.db = get_database()
     
     def generate_response(self, review_text: str, rating: int, reviewer_name: str = None) -> Dict:
         """
@@ -155,81 +156,94 @@ class ResponseGenerator:
         
         # Log process start
         log_id = self.db.log_process_start('generation', {'limit': limit})
+        timer = RunTimer()
+        reviews_processed = 0
+        responses_generated = 0
+        errors = 0
+        error_details = []
+        pending = []  # Generated responses not yet saved
         
         try:
-            # Get unreplied reviews from database
-            unreplied_reviews = self.db.get_unreplied_reviews(limit=limit)
-            logger.info(f"Found {len(unreplied_reviews)} unreplied reviews")
+            # Stream unreplied reviews from the database a page at a time
+            unreplied_reviews = timer.iterate('fetch', self.db.iter_unreplied_reviews(limit=limit))
             
-            if not unreplied_reviews:
-                logger.info("No unreplied reviews found")
-                if log_id:
-                    self.db.log_process_complete(log_id, 0, 0)
-                return {
-                    'total_reviews': 0,
-                    'responses_generated': 0,
-                    'errors': 0,
-                    'error_details': []
-                }
-            
-            # Process each review
-            responses_generated = 0
-            errors = 0
-            error_details = []
+            def save_pending():
+                nonlocal responses_generated, errors
+                with timer.phase('save', len(pending)):
+                    saved_ids, _ = self.db.save_responses(pending)
+                names = {response['review_id']: response['reviewer_name'] for response in pending}
+                saved = set(saved_ids)
+                for review_id in saved_ids:
+                    responses_generated += 1
+                    logger.info(f"✅ Generated response for {names[review_id]}")
+                for response in pending:
+                    if response['review_id'] not in saved:
+                        errors += 1
+                        error_msg = f"Failed to save response for {response['reviewer_name']}"
+                        logger.error(error_msg)
+                        error_details.append(error_msg)
+                pending.clear()
             
-            for i, review in enumerate(unreplied_reviews):
-                try:
-                    logger.info(f"Processing review {i+1}/{len(unreplied_reviews)}: {review['reviewer_name']}")
-                    
-                    # Generate response
-                    result = self.generate_response(
-                        review_text=review.get('review_text', ''),
-                        rating=review.get('rating', 5),
-                        reviewer_name=review.get('reviewer_name', 'Guest')
-                    )
-                    
-                    if result['success']:
-                        # Save response to database
-                        success = self.db.save_response(
-                            review_id=review['review_id'],
-                            response_text=result['response_text'],
-                            sentiment=result['sentiment'],
-                            issues=result['issues']
-                        )
+            try:
+                for i, review in enumerate(unreplied_reviews):
+                    reviews_processed = i + 1
+                    try:
+                        logger.info(f"Processing review {reviews_processed}: {review['reviewer_name']}")
+                        
+                        # Generate response
+                        with timer.phase('generate', 1):
+                            result = self.generate_response(
+                                review_text=review.get('review_text', ''),
+                                rating=review.get('rating', 5),
+                                reviewer_name=review.get('reviewer_name', 'Guest')
+                            )
                         
-                        if success:
-                            responses_generated += 1
-                            logger.info(f"✅ Generated response for {review['reviewer_name']}")
+                        if result['success']:
+                            # Saved in batches of flush_every
+                            pending.append({
+                                'review_id': review['review_id'],
+                                'reviewer_name': review['reviewer_name'],
+                                'response_text': result['response_text'],
+                                'sentiment': result['sentiment'],
+                                'issues': result['issues']
+                            })
+                            if len(pending) >= config.flush_every:
+                                save_pending()
                         else:
                             errors += 1
-                            error_msg = f"Failed to save response for {review['reviewer_name']}"
+                            error_msg = f"Failed to generate response for {review['reviewer_name']}: {result['error']}"
                             logger.error(error_msg)
                             error_details.append(error_msg)
-                    else:
+                    
+                    except Exception as e:
                         errors += 1
-                        error_msg = f"Failed to generate response for {review['reviewer_name']}: {result['error']}"
+                        error_msg = f"Error processing review from {review.get('reviewer_name', 'Unknown')}: {e}"
                         logger.error(error_msg)
                         error_details.append(error_msg)
-                
-                except Exception as e:
-                    errors += 1
-                    error_msg = f"Error processing review from {review.get('reviewer_name', 'Unknown')}: {e}"
-                    logger.error(error_msg)
-                    error_details.append(error_msg)
+            
+            finally:
+                # Keep what was generated even if a later page fetch or review failed the run
+                if pending:
+                    save_pending()
+            
+            if not reviews_processed:
+                logger.info("No unreplied reviews found")
             
             # Log completion
+            timer.log_summary('Response generation')
             if log_id:
                 self.db.log_process_complete(
                     log_id=log_id,
-                    reviews_processed=len(unreplied_reviews),
+                    reviews_processed=reviews_processed,
                     responses_generated=responses_generated,
-                    error_message='; '.join(error_details[:3]) if error_details else None
+                    error_message='; '.join(error_details[:3]) if error_details else None,
+                    metadata={'limit': limit, **timer.summary()}
                 )
             
             logger.info(f"Response generation completed: {responses_generated} generated, {errors} errors")
             
             return {
-                'total_reviews': len(unreplied_reviews),
+                'total_reviews': reviews_processed,
                 'responses_generated': responses_generated,
                 'errors': errors,
                 'error_details': error_details
@@ -238,13 +252,16 @@ class ResponseGenerator:
         except Exception as e:
             logger.error(f"Error in response generation process: {e}")
             if log_id:
-                self.db.log_process_complete(log_id, 0, 0, error_message=str(e))
+                self.db.log_process_complete(
+                    log_id, reviews_processed, responses_generated,
+                    error_message=str(e), metadata={'limit': limit, **timer.summary()}
+                )
             
             return {
-                'total_reviews': 0,
-                'responses_generated': 0,
-                'errors': 1,
-                'error_details': [str(e)]
+                'total_reviews': reviews_processed,
+                'responses_generated': responses_generated,
+                'errors': errors + 1,
+                'error_details': error_details + [str(e)]
             }
 
 def main():
@@ -255,7 +272,10 @@ def main():
     generator = ResponseGenerator()
     
     # Process all unreplied reviews
-    results = generator.process_unreplied_reviews()
+    try:
+        results = generator.process_unreplied_reviews()
+    finally:
+        generator.db.close()
     
     print(f"\n📊 Results:")
     print(f"   Reviews processed: {results['total_reviews']}")
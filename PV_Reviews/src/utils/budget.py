@@ -0,0 +1,72 @@
+"""Adaptive per-card time budget for the per-field extraction path."""
+
+import logging
+import time
+from collections import deque
+from typing import Optional
+
+from config.settings import config
+
+logger = logging.getLogger(__name__)
+
+MIN_SAMPLES = 5  # Cards timed before the budget starts following latencies
+
+class BudgetExceeded(Exception):
+    """A card took longer than its budget and should be retried later."""
+
+class CardDeadline:
+    """The time one card has left."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def remaining(self) -> float:
+        return max(self.seconds - self.elapsed, 0.0)
+
+    def timeout_ms(self, cap_ms: int) -> int:
+        """A Playwright timeout that does not run past the deadline (at least 1 ms)."""
+        return max(1, min(cap_ms, int(self.remaining * 1000)))
+
+    def check(self, step: str) -> None:
+        """Raise BudgetExceeded if the card is already over budget after a step."""
+        if self.elapsed > self.seconds:
+            raise BudgetExceeded(f"over {self.seconds:.1f}s budget after {step}")
+
+class CardBudget:
+    """Per-card time limit that follows recent card latencies.
+
+    The budget is card_budget_multiplier times the 90th percentile of the last
+    card_budget_window successful cards, clamped to card_budget_min_ms and
+    card_budget_max_ms. Until enough cards are timed it is card_budget_max_ms,
+    which is also what retries of deferred cards get.
+    """
+
+    def __init__(self, window: Optional[int] = None, multiplier: Optional[float] = None,
+                 min_ms: Optional[int] = None, max_ms: Optional[int] = None):
+        self.latencies = deque(maxlen=window or config.card_budget_window)
+        self.multiplier = multiplier or config.card_budget_multiplier
+        self.min_seconds = (min_ms or config.card_budget_min_ms) / 1000
+        self.max_seconds = (max_ms or config.card_budget_max_ms) / 1000
+
+    @property
+    def seconds(self) -> float:
+        """The current per-card budget."""
+        if len(self.latencies) < MIN_SAMPLES:
+            return self.max_seconds
+        ordered = sorted(self.latencies)
+        p90 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))]
+        return min(self.max_seconds, max(self.min_seconds, p90 * self.multiplier))
+
+    def start(self, retry: bool = False) -> CardDeadline:
+        """Deadline for the next card; retries get the full card_budget_max_ms."""
+        return CardDeadline(self.max_seconds if retry else self.seconds)
+
+    def observe(self, seconds: float) -> None:
+        """Record how long a successfully extracted card took."""
+        self.latencies.append(seconds)
@@ -0,0 +1,54 @@
+"""Crash checkpoint for resumable review collection runs."""
+
+import json
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterable, Optional
+
+from config.settings import config
+
+logger = logging.getLogger(__name__)
+
+class CollectionCheckpoint:
+    """Review IDs already flushed by an unfinished collection run."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or config.data_dir / 'collection_checkpoint.json')
+        self.review_ids = set()
+        self.started_at = datetime.now().isoformat()
+
+    def load(self) -> set:
+        """Load IDs from an interrupted run; stale or corrupt checkpoints are ignored."""
+        if not self.path.exists():
+            return self.review_ids
+
+        try:
+            data = json.loads(self.path.read_text())
+            started_at = datetime.fromisoformat(data['started_at'])
+            if datetime.now() - started_at > timedelta(hours=config.checkpoint_max_age_hours):
+                logger.info(f"Ignoring stale checkpoint from {started_at}")
+                return self.review_ids
+
+            self.review_ids = set(data.get('review_ids', []))
+            self.started_at = data['started_at']
+            logger.info(f"Resuming interrupted run from {self.started_at}: {len(self.review_ids)} reviews already processed")
+        except (json.JSONDecodeError, KeyError, ValueError) as e:
+            logger.warning(f"Checkpoint file corrupt ({e}). Starting fresh.")
+        return self.review_ids
+
+    def add(self, review_ids: Iterable[str]) -> None:
+        """Record flushed review IDs and write the checkpoint to disk."""
+        self.review_ids.update(str(review_id) for review_id in review_ids if review_id)
+        tmp_path = self.path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps({
+            'started_at': self.started_at,
+            'updated_at': datetime.now().isoformat(),
+            'review_ids': sorted(self.review_ids)
+        }))
+        tmp_path.replace(self.path)
+
+    def clear(self) -> None:
+        """Remove the checkpoint once a run completes."""
+        self.path.unlink(missing_ok=True)
+        self.review_ids = set()
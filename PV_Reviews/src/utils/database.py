@@ -1,17 +1,127 @@
 """Database utilities for storing review data in Supabase PostgreSQL."""
 
 import os
+import re
+import json
+import hashlib
 import logging
-from typing import List, Dict, Optional, Any
-from datetime import datetime, timedelta
+import sqlite3
+from typing import List, Dict, Iterator, Optional, Any, Sequence, Set, Tuple
+from copy import deepcopy
+from datetime import datetime
 from supabase import create_client
+from postgrest.exceptions import APIError
+from postgrest.types import ReturnMethod
 from dotenv import load_dotenv
 
+from config.settings import config
+
 logger = logging.getLogger(__name__)
 
+ID_FILTER_CHUNK = 200  # Review IDs per in_() filter, keeps request URLs short
+UPSERT_CHUNK = 500  # Rows per bulk upsert request
+ID_PAGE_SIZE = 1000  # Rows per keyset page; PostgREST caps a select at 1,000 rows by default
+UNREPLIED_COLUMNS = ('id', 'review_id', 'reviewer_name', 'rating', 'review_text', 'created_at')  # What response generation reads
+PENDING_COLUMNS = (
+    'id', 'review_id', 'response_text', 'sentiment', 'generated_at',
+    'reviews!inner(reviewer_name, rating, review_text, review_time)'
+)  # What posting a reply reads
+UNDECODED_FIELDS = {
+    'is_local_guide': 'Is Local Guide', 'dine_in': 'Dine In', 'session': 'Session', 'price_range': 'Price Range'
+}  # Record fields network-decoded reviews do not carry
+PARTIAL_TEXT = 'Partial Text'  # Record key set by extractors when the review text may be incomplete
+TRUNCATION_TAIL = re.compile(r'\s*(?:…|\.\.\.)\s*More$')  # Left on texts read before "More" was expanded
+SUB_RATINGS = re.compile(r'\|?\s*(?:Food|Service|Atmosphere):\s*\d/5')  # Rendered around the text in the DOM
+EMPTY_SUMMARY = {
+    'total_reviews': 0, 'unreplied_reviews': 0, 'reviews_by_rating': {},
+    'responses_by_sentiment': {}, 'responses_by_status': {}, 'recent_runs': []
+}
+
+def normalize_review_text(text: Optional[str]) -> str:
+    """Review text as compared for edits, independent of how it was extracted.
+    
+    The sub-rating block ("Food: 5/5 Service: 4/5 ...") and a trailing
+    "… More" link are removed and whitespace is collapsed, so DOM and
+    network reads of the same review match.
+    """
+    text = SUB_RATINGS.sub(' ', str(text or ''))
+    return TRUNCATION_TAIL.sub('', ' '.join(text.split()))
+
+def upsert_in_chunks(client, table: str, rows: List[Dict], on_conflict: str = '',
+                     chunk_size: int = UPSERT_CHUNK) -> Tuple[int, List[Tuple[Dict, str]]]:
+    """Upsert rows with one request per chunk, returning (rows saved, [(failed row, error)]).
+    
+    A chunk rejected for its data is split in half and each half retried,
+    so a bad row costs about log2(chunk_size) extra requests instead of one
+    per row. Any other failure (connection, timeout, server error) fails
+    the whole chunk at once.
+    All rows of a call must have the same keys: PostgREST fills keys missing
+    from a row with NULL.
+    """
+    return _write_in_chunks(
+        lambda chunk: client.table(table).upsert(chunk, on_conflict=on_conflict, returning=ReturnMethod.minimal).execute(),
+        rows, chunk_size
+    )
+
+def is_row_error(error: Exception) -> bool:
+    """Whether a failed write was rejected for the rows it carried, so a smaller chunk may succeed.
+    
+    PostgREST reports data errors with the PostgreSQL SQLSTATE (class 22 data
+    exception, 23 constraint violation) or, for non-JSON error bodies, the
+    HTTP status; SQLite raises its integrity and binding errors.
+    """
+    if isinstance(error, APIError):
+        if isinstance(error.code, int):
+            return 400 <= error.code < 500
+        return str(error.code or '')[:2] in ('22', '23')
+    return isinstance(error, (sqlite3.IntegrityError, sqlite3.DataError, sqlite3.InterfaceError))
+
+def _write_in_chunks(write, rows: List[Dict], chunk_size: int) -> Tuple[int, List[Tuple[Dict, str]]]:
+    failed: List[Tuple[Dict, str]] = []
+    
+    def attempt(chunk: List[Dict]) -> int:
+        try:
+            write(chunk)
+            return len(chunk)
+        except Exception as e:
+            if len(chunk) == 1 or not is_row_error(e):
+                failed.extend((row, str(e)) for row in chunk)
+                return 0
+            middle = len(chunk) // 2
+            return attempt(chunk[:middle]) + attempt(chunk[middle:])
+    
+    saved = sum(attempt(rows[start:start + chunk_size]) for start in range(0, len(rows), chunk_size))
+    return saved, failed
+
+def update_in_chunks(client, table: str, values: Dict, review_ids: List[str],
+                     chunk_size: int = ID_FILTER_CHUNK) -> List[Dict]:
+    """Apply one update to many reviews with a single in_() filter per chunk of IDs.
+    
+    Returns one {table, review_ids, error} report per chunk that failed;
+    the other chunks are still applied.
+    """
+    failures = []
+    for start in range(0, len(review_ids), chunk_size):
+        chunk = review_ids[start:start + chunk_size]
+        try:
+            client.table(table).update(values, returning=ReturnMethod.minimal).in_('review_id', chunk).execute()
+        except Exception as e:
+            logger.error(f"Error updating {len(chunk)} rows of {table}: {e}")
+            failures.append({'table': table, 'review_ids': chunk, 'error': str(e)})
+    return failures
+
+def get_database() -> 'ReviewDatabase':
+    """The review database of the configured storage backend."""
+    if config.storage_backend == 'sqlite':
+        from src.utils.sqlite_database import SQLiteReviewDatabase
+        return SQLiteReviewDatabase()
+    return ReviewDatabase()
+
 class ReviewDatabase:
     """Supabase PostgreSQL database manager for review data."""
     
+    backend = 'supabase'
+    
     def __init__(self):
         load_dotenv()
         self.url = os.getenv('SUPABASE_URL')
@@ -21,34 +131,166 @@ class ReviewDatabase:
             raise ValueError("Missing SUPABASE_URL or SUPABASE_SERVICE_KEY in environment")
         
         self.client = create_client(self.url, self.service_key)
+        self.last_save_stats: Dict[str, int] = {}
+        self.last_saved_ids: List[str] = []
+    
+    def close(self) -> None:
+        """Release the backend's connection at the end of a run (nothing to do for Supabase)."""
     
     def save_reviews(self, reviews_data: List[Dict]) -> tuple[int, int]:
-        """Save reviews to database, returning (total_saved, new_reviews)."""
-        total_saved = 0
-        new_reviews = 0
+        """Save new and changed reviews, returning (total_saved, new_reviews).
         
+        Reviews whose content hash matches the stored one are not written.
+        A different hash means the review was edited: it is saved with
+        is_edited set and has_response reset so it gets a new response.
+        An owner reply seen for the first time (full-history sync) is stored
+        without counting as an edit. Reviews whose text may be incomplete
+        (marked PARTIAL_TEXT, or still ending in "… More") never count as
+        edits and never overwrite a stored text; new ones are saved without
+        a hash, so the next complete read backfills it. Rows are written
+        with chunked upserts on review_id; per-outcome counts (of rows
+        actually written) are kept in last_save_stats, and the IDs now
+        stored (written or already up to date) in last_saved_ids. Reviews
+        whose stored state could not be looked up are not written and count
+        as failed.
+        """
+        stats = {
+            'new': 0, 'changed': 0, 'unchanged': 0, 'backfilled': 0, 'reply_updated': 0, 'partial': 0, 'failed': 0
+        }
+        
+        cleaned_reviews = {}
+        partial_ids = set()
         for review in reviews_data:
-            try:
-                # Clean and validate review data
-                cleaned_review = self._clean_review_data(review)
-                if not cleaned_review:
+            cleaned_review = self._clean_review_data(review)
+            if cleaned_review:
+                review_id = cleaned_review['review_id']
+                if review.get(PARTIAL_TEXT) or TRUNCATION_TAIL.search(cleaned_review['review_text']):
+                    partial_ids.add(review_id)
+                    cleaned_review['content_hash'] = None
+                else:
+                    cleaned_review['content_hash'] = self._content_hash(cleaned_review)
+                cleaned_reviews[review_id] = cleaned_review
+        
+        stored, lookup_failed = self._get_stored_reviews(list(cleaned_reviews))
+        
+        # Full rows per outcome; rows with the same keys go into the same upserts
+        saved_ids = []
+        batches: Dict[Tuple[str, frozenset], List[Dict]] = {}
+        for review_id, cleaned_review in cleaned_reviews.items():
+            if review_id in lookup_failed:
+                # Unknown whether it is new or edited - leave it for the next run
+                stats['failed'] += 1
+                continue
+            owner_reply = cleaned_review.get('owner_reply_text')
+            stored_hash = stored.get(review_id, {}).get('content_hash')
+            if review_id not in stored:
+                outcome, row = 'new', cleaned_review
+            elif review_id in partial_ids:
+                # Keep the stored text; only a new owner reply is worth writing
+                if not owner_reply or owner_reply == stored[review_id]['owner_reply_text']:
+                    stats['partial'] += 1
+                    saved_ids.append(review_id)
                     continue
-                
-                # Try to insert, if exists it will update
-                result = self.client.table('reviews').upsert(cleaned_review).execute()
-                
-                if result.data:
-                    new_reviews += 1  # Simplified: counting all as new
-                total_saved += 1
-                    
+                outcome = 'reply_updated'
+                row = {key: value for key, value in cleaned_review.items() if key not in ('review_text', 'content_hash')}
+            elif stored_hash != cleaned_review['content_hash'] and stored_hash in (
+                None, self._content_hash(cleaned_review, normalize=False)
+            ):
+                # Stored before (normalized) hashing existed - record the hash, don't flag an edit or touch has_response
+                outcome = 'backfilled'
+                row = {key: value for key, value in cleaned_review.items() if key != 'has_response' or owner_reply}
+            elif stored_hash != cleaned_review['content_hash']:
+                outcome = 'changed'
+                row = {**cleaned_review, 'is_edited': True, 'has_response': False}
+                logger.info(f"Review {review_id} was edited - flagged for a new response")
+            elif owner_reply and owner_reply != stored[review_id]['owner_reply_text']:
+                outcome, row = 'reply_updated', cleaned_review
+            else:
+                stats['unchanged'] += 1
+                saved_ids.append(review_id)
+                continue
+            batches.setdefault((outcome, frozenset(row)), []).append(row)
+        
+        for (outcome, _), rows in batches.items():
+            saved, failed = self._upsert_reviews(rows)
+            stats[outcome] += saved
+            stats['failed'] += len(failed)
+            for row, error in failed:
+                logger.error(f"Error saving review {row['review_id']}: {error}")
+            failed_ids = {row['review_id'] for row, _ in failed}
+            saved_ids += [row['review_id'] for row in rows if row['review_id'] not in failed_ids]
+        
+        self.last_save_stats = stats
+        self.last_saved_ids = saved_ids
+        logger.info(f"Saved reviews: {stats}")
+        return stats['new'] + stats['changed'], stats['new']
+    
+    def _upsert_reviews(self, rows: List[Dict]) -> Tuple[int, List[Tuple[Dict, str]]]:
+        """Write cleaned review rows (all with the same keys), as upsert_in_chunks does."""
+        return upsert_in_chunks(self.client, 'reviews', rows, on_conflict='review_id')
+    
+    def _get_stored_reviews(self, review_ids: List[str]) -> Tuple[Dict[str, Dict[str, Optional[str]]], Set[str]]:
+        """Stored content hash and owner reply per review ID, for the IDs that exist.
+        
+        Also returns the IDs whose lookup failed; they are not in the dict.
+        """
+        stored, failed = {}, set()
+        for start in range(0, len(review_ids), ID_FILTER_CHUNK):
+            chunk = review_ids[start:start + ID_FILTER_CHUNK]
+            try:
+                result = self.client.table('reviews').select('review_id, content_hash, owner_reply_text').in_(
+                    'review_id', chunk
+                ).execute()
             except Exception as e:
-                logger.error(f"Error saving review {review.get('Review ID', 'Unknown')}: {e}")
+                logger.error(f"Error looking up {len(chunk)} stored reviews: {e}")
+                failed.update(chunk)
+                continue
+            stored.update({
+                row['review_id']: {'content_hash': row.get('content_hash'), 'owner_reply_text': row.get('owner_reply_text')}
+                for row in result.data or []
+            })
+        return stored, failed
+    
+    def iter_review_ids(self, updated_after: Optional[Tuple[str, str]] = None,
+                        page_size: int = ID_PAGE_SIZE) -> Iterator[List[Dict]]:
+        """Yield pages of {review_id, updated_at} rows changed after an (updated_at, review_id) key.
+    
+        Pages are ordered by (updated_at, review_id) and fetched with keyset
+        filters, so rows written in the same statement (same updated_at) are
+        neither skipped nor repeated, and no page hits the server's row cap.
+        """
+        while True:
+            query = self.client.table('reviews').select('review_id, updated_at')
+            if updated_after:
+                updated_at, review_id = updated_after
+                query = query.or_(
+                    f'updated_at.gt."{updated_at}",and(updated_at.eq."{updated_at}",review_id.gt."{review_id}")'
+                )
+            result = query.order('updated_at').order('review_id').limit(page_size).execute()
+            rows = result.data or []
+            if rows:
+                yield rows
+            if len(rows) < page_size:
+                return
+            updated_after = (rows[-1]['updated_at'], rows[-1]['review_id'])
+    
+    def _content_hash(self, cleaned_review: Dict[str, Any], normalize: bool = True) -> str:
+        """Hash of the parts of a review a reviewer can edit: rating, text and sub-ratings.
         
-        return total_saved, new_reviews
+        normalize=False gives the hash of the raw text that older rows were stored with.
+        """
+        text = cleaned_review.get('review_text')
+        content = [
+            cleaned_review.get('rating'),
+            normalize_review_text(text) if normalize else text,
+            *(cleaned_review.get(field) for field in ('food_rating', 'service_rating', 'atmosphere_rating'))
+        ]
+        return hashlib.sha256(json.dumps(content, ensure_ascii=False).encode('utf-8')).hexdigest()
     
     def log_run(self, run_date: str, reviews_collected: int, new_reviews: int, 
-                duration_seconds: float, status: str, error_message: str = None) -> None:
-        """Log a collection run."""
+                duration_seconds: float, status: str, error_message: str = None,
+                metadata: Dict[str, Any] = None) -> None:
+        """Log a collection run, merging any extra metadata into the log entry."""
         try:
             log_data = {
                 'process_type': 'collection',
@@ -57,7 +299,8 @@ class ReviewDatabase:
                 'metadata': {
                     'run_date': run_date,
                     'new_reviews': new_reviews,
-                    'duration_seconds': duration_seconds
+                    'duration_seconds': duration_seconds,
+                    **(metadata or {})
                 }
             }
             
@@ -69,96 +312,138 @@ class ReviewDatabase:
         except Exception as e:
             logger.error(f"Error logging run: {e}")
     
-    def get_unreplied_reviews(self, limit: Optional[int] = None) -> List[Dict]:
-        """Get reviews that haven't been replied to."""
-        query = self.client.table('reviews').select('*').eq('has_response', False).order('created_at', desc=True)
-        
-        if limit:
-            query = query.limit(limit)
-        
-        result = query.execute()
-        return result.data if result.data else []
-    
-    def mark_response_generated(self, review_ids: List[str]) -> None:
-        """Mark reviews as having responses generated."""
+    def get_sync_cursor(self, listing_id: str) -> Optional[Dict]:
+        """The newest review seen by the last full-history sync of a listing, or None."""
         try:
-            for review_id in review_ids:
-                self.client.table('reviews').update({'has_response': True}).eq('review_id', review_id).execute()
+            result = self.client.table('sync_cursors').select('*').eq('listing_id', listing_id).limit(1).execute()
+            return result.data[0] if result.data else None
         except Exception as e:
-            logger.error(f"Error marking responses generated: {e}")
+            logger.error(f"Error loading sync cursor for listing {listing_id}: {e}")
+            return None
     
-    def mark_response_posted(self, review_ids: List[str]) -> None:
-        """Mark reviews as having responses posted."""
+    def save_sync_cursor(self, listing_id: str, review_id: str, review_time: Optional[str]) -> None:
+        """Record the newest review a full-history sync of a listing has seen."""
         try:
-            for review_id in review_ids:
-                # Update review
-                self.client.table('reviews').update({'has_response': True}).eq('review_id', review_id).execute()
-                
-                # Update response status
-                self.client.table('review_responses').update({
-                    'status': 'posted',
-                    'posted_at': datetime.utcnow().isoformat()
-                }).eq('review_id', review_id).execute()
-                
+            self.client.table('sync_cursors').upsert({
+                'listing_id': listing_id,
+                'review_id': review_id,
+                'review_time': review_time,
+                'synced_at': datetime.now().isoformat()
+            }).execute()
         except Exception as e:
-            logger.error(f"Error marking responses posted: {e}")
+            logger.error(f"Error saving sync cursor for listing {listing_id}: {e}")
+    
+    def get_unreplied_reviews(self, limit: Optional[int] = None) -> List[Dict]:
+        """Get reviews that haven't been replied to."""
+        return list(self.iter_unreplied_reviews(limit, columns=('*',)))
+    
+    def iter_unreplied_reviews(self, limit: Optional[int] = None,
+                               columns: Sequence[str] = UNREPLIED_COLUMNS) -> Iterator[Dict]:
+        """Yield unreplied reviews newest first, one keyset page at a time, with only the given columns.
+        
+        Marking yielded reviews as replied while iterating is safe: pages
+        continue after the last (created_at, id) seen instead of at an offset.
+        """
+        return self._iter_keyset('reviews', columns, 'created_at', {'has_response': False}, limit)
+    
+    def mark_response_generated(self, review_ids: List[str]) -> List[Dict]:
+        """Mark reviews as having responses generated, returning per-chunk failure reports."""
+        return update_in_chunks(self.client, 'reviews', {'has_response': True}, list(review_ids))
+    
+    def mark_response_posted(self, review_ids: List[str]) -> List[Dict]:
+        """Mark reviews and their responses as posted, returning per-chunk failure reports."""
+        review_ids = list(review_ids)
+        return update_in_chunks(self.client, 'reviews', {'has_response': True}, review_ids) + update_in_chunks(
+            self.client, 'review_responses', {'status': 'posted', 'posted_at': datetime.utcnow().isoformat()}, review_ids
+        )
     
     def get_run_summary(self, days: int = 7) -> Dict:
-        """Get summary of recent runs."""
+        """Exact review and response counts plus the last days of runs, from one get_review_summary call.
+        
+        Keys: total_reviews, unreplied_reviews, reviews_by_rating,
+        responses_by_sentiment, responses_by_status and recent_runs (newest
+        first, at most 50, with run_date, status, reviews_collected,
+        new_reviews, duration_seconds and error_message).
+        """
         try:
-            # Get recent processing logs
-            from_date = (datetime.utcnow() - timedelta(days=days)).isoformat()
-            
-            recent_runs_result = self.client.table('processing_logs').select('*').gte('started_at', from_date).order('started_at', desc=True).execute()
-            
-            # Get total stats
-            total_reviews_result = self.client.table('reviews').select('count').execute()
-            unreplied_result = self.client.table('reviews').select('count').eq('has_response', False).execute()
-            
-            return {
-                'recent_runs': recent_runs_result.data if recent_runs_result.data else [],
-                'total_reviews': len(total_reviews_result.data) if total_reviews_result.data else 0,
-                'unreplied_reviews': len(unreplied_result.data) if unreplied_result.data else 0
-            }
+            result = self.client.rpc('get_review_summary', {'days': days}).execute()
+            return {**deepcopy(EMPTY_SUMMARY), **(result.data or {})}
             
         except Exception as e:
             logger.error(f"Error getting run summary: {e}")
-            return {'recent_runs': [], 'total_reviews': 0, 'unreplied_reviews': 0}
+            return deepcopy(EMPTY_SUMMARY)
     
     def save_response(self, review_id: str, response_text: str, sentiment: str = '', issues: str = '') -> bool:
         """Save a generated response for a review."""
-        try:
-            response_data = {
-                'review_id': review_id,
-                'response_text': response_text,
-                'sentiment': sentiment,
-                'issues': issues,
-                'status': 'generated'
+        saved, _ = self.save_responses([{
+            'review_id': review_id,
+            'response_text': response_text,
+            'sentiment': sentiment,
+            'issues': issues
+        }])
+        return bool(saved)
+    
+    def save_responses(self, responses: List[Dict]) -> Tuple[List[str], List[Dict]]:
+        """Save generated responses ({review_id, response_text, sentiment, issues}) in bulk.
+        
+        Each chunk is one save_review_responses call, which inserts the
+        responses and marks their reviews in a single transaction, so a
+        response is never stored without its review being flagged. A chunk
+        rejected for its data is halved and retried. Returns the review IDs whose
+        response was saved and {table, review_ids, error} reports for the rest.
+        """
+        rows = [
+            {
+                'review_id': response['review_id'],
+                'response_text': response['response_text'],
+                'sentiment': response.get('sentiment') or '',
+                'issues': response.get('issues') or ''
             }
-            
-            result = self.client.table('review_responses').insert(response_data).execute()
-            
-            if result.data:
-                # Update the review to mark it as having a response
-                self.client.table('reviews').update({'has_response': True}).eq('review_id', review_id).execute()
-                return True
-                
-        except Exception as e:
-            logger.error(f"Error saving response for review {review_id}: {e}")
-            
-        return False
+            for response in responses
+        ]
+        _, failed = _write_in_chunks(
+            lambda chunk: self.client.rpc('save_review_responses', {'responses': chunk}).execute(),
+            rows, UPSERT_CHUNK
+        )
+        for row, error in failed:
+            logger.error(f"Error saving response for review {row['review_id']}: {error}")
+        
+        failed_ids = {row['review_id'] for row, _ in failed}
+        saved_ids = [row['review_id'] for row in rows if row['review_id'] not in failed_ids]
+        return saved_ids, [{'table': 'review_responses', 'review_ids': [row['review_id']], 'error': error} for row, error in failed]
     
     def get_pending_responses(self, limit: Optional[int] = None) -> List[Dict]:
         """Get responses that are ready to be posted."""
-        query = self.client.table('review_responses').select(
-            '*, reviews!inner(*)'
-        ).eq('status', 'generated').order('generated_at', desc=True)
-        
-        if limit:
-            query = query.limit(limit)
-        
-        result = query.execute()
-        return result.data if result.data else []
+        return list(self.iter_pending_responses(limit, columns=('*', 'reviews!inner(*)')))
+    
+    def iter_pending_responses(self, limit: Optional[int] = None,
+                               columns: Sequence[str] = PENDING_COLUMNS) -> Iterator[Dict]:
+        """Yield generated, not yet posted responses newest first, paged by (generated_at, id)."""
+        return self._iter_keyset('review_responses', columns, 'generated_at', {'status': 'generated'}, limit)
+    
+    def _iter_keyset(self, table: str, columns: Sequence[str], sort_column: str, filters: Dict[str, Any],
+                     limit: Optional[int] = None, page_size: int = ID_PAGE_SIZE) -> Iterator[Dict]:
+        """Yield matching rows by descending (sort_column, id), fetching a page at a time."""
+        columns = list(columns)
+        if '*' not in columns:
+            columns += [column for column in (sort_column, 'id') if column not in columns]
+        after = None
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            query = self.client.table(table).select(', '.join(columns))
+            for column, value in filters.items():
+                query = query.eq(column, value)
+            if after:
+                sort_value, row_id = after
+                query = query.or_(f'{sort_column}.lt."{sort_value}",and({sort_column}.eq."{sort_value}",id.lt.{row_id})')
+            rows = query.order(sort_column, desc=True).order('id', desc=True).limit(size).execute().data or []
+            yield from rows
+            if len(rows) < size:
+                return
+            if remaining is not None:
+                remaining -= len(rows)
+            after = (rows[-1][sort_column], rows[-1]['id'])
     
     def _clean_review_data(self, review: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Clean and validate review data for database insertion."""
@@ -192,6 +477,17 @@ class ReviewDatabase:
             'has_response': bool(review.get('has_response', False))
         }
         
+        # Network-decoded records leave out fields they cannot read; keep what is stored
+        for column, field in UNDECODED_FIELDS.items():
+            if field not in review:
+                del cleaned[column]
+        
+        # Replied reviews (full-history sync) need no generated response
+        owner_reply = str(review.get('Owner Reply Text') or '').strip()
+        if owner_reply:
+            cleaned['owner_reply_text'] = owner_reply
+            cleaned['has_response'] = True
+        
         # Rating is required
         if not cleaned['rating']:
             return None
@@ -237,8 +533,8 @@ class ReviewDatabase:
     
     def log_process_complete(self, log_id: int, reviews_processed: int = 0, 
                            responses_generated: int = 0, responses_posted: int = 0,
-                           error_message: str = None) -> bool:
-        """Log the completion of a process"""
+                           error_message: str = None, metadata: Dict[str, Any] = None) -> bool:
+        """Log the completion of a process, replacing its metadata if given"""
         try:
             update_data = {
                 'status': 'failed' if error_message else 'completed',
@@ -250,6 +546,8 @@ class ReviewDatabase:
             
             if error_message:
                 update_data['error_message'] = error_message
+            if metadata is not None:
+                update_data['metadata'] = metadata
             
             result = self.client.table('processing_logs').update(update_data).eq('id', log_id).execute()
             return bool(result.data)
@@ -0,0 +1,72 @@
+"""Debug material that is only written to disk when collection goes wrong."""
+
+import logging
+from collections import deque
+from datetime import datetime
+from html import escape
+from pathlib import Path
+from typing import Optional
+
+from config.settings import config
+
+logger = logging.getLogger(__name__)
+
+class FailureRecorder:
+    """Keeps the HTML of recent cards the bulk pass could not read in memory and dumps it on failure.
+
+    Healthy cards are never serialized; only cards that came back incomplete
+    (and were recovered by the per-field path) are buffered as context.
+
+    With config.failure_tracing the collector also records a Playwright trace,
+    which is kept only if a failure was recorded. Everything is written to
+    data/debug, pruned oldest-first to stay under config.debug_max_bytes.
+    """
+
+    def __init__(self, debug_dir: Optional[Path] = None, buffer_size: Optional[int] = None):
+        self.debug_dir = Path(debug_dir or config.data_dir / 'debug')
+        self.cards = deque(maxlen=buffer_size or config.failure_buffer_size)
+        self.failures = 0
+        self.started_at = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    def record(self, index: int, html: Optional[str]) -> None:
+        """Remember a problem card's HTML; the oldest card drops out when the buffer is full."""
+        if html:
+            self.cards.append((index, html))
+
+    def dump(self, reason: str, html: Optional[str] = None) -> Optional[Path]:
+        """Write the buffered cards (and the failing card's HTML, if given) to data/debug."""
+        self.failures += 1
+        try:
+            self.debug_dir.mkdir(parents=True, exist_ok=True)
+            path = self.debug_dir / f"failure_{self.started_at}_{self.failures}.html"
+            parts = [f"<!-- {escape(reason)} -->"]
+            if html:
+                parts.append(f"<!-- failing element -->\n{html}")
+            parts.extend(f"<!-- card {index} -->\n{card_html}" for index, card_html in self.cards)
+            path.write_text('\n'.join(parts), encoding='utf-8')
+            logger.warning(f"Extraction failure ({reason}) - saved {len(self.cards)} recent cards to {path}")
+            self.prune()
+            return path
+        except Exception as e:
+            logger.warning(f"Could not save failure debug data: {e}")
+            return None
+
+    @property
+    def trace_path(self) -> Optional[Path]:
+        """Where to save the Playwright trace, or None to discard it (healthy run)."""
+        if not self.failures:
+            return None
+        self.debug_dir.mkdir(parents=True, exist_ok=True)
+        return self.debug_dir / f"trace_{self.started_at}.zip"
+
+    def prune(self) -> None:
+        """Delete the oldest debug files until the directory is under debug_max_bytes."""
+        if not self.debug_dir.exists():
+            return
+        files = sorted((path for path in self.debug_dir.iterdir() if path.is_file()), key=lambda path: path.stat().st_mtime)
+        total = sum(path.stat().st_size for path in files)
+        while files and total > config.debug_max_bytes:
+            oldest = files.pop(0)
+            total -= oldest.stat().st_size
+            oldest.unlink(missing_ok=True)
+            logger.info(f"Removed old debug file {oldest.name}")
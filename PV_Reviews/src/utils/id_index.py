@@ -0,0 +1,224 @@
+"""Memory-mapped index of known review IDs, synced incrementally from the database or master CSV."""
+
+import hashlib
+import logging
+import mmap
+import struct
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+import pandas as pd
+
+from config.settings import config
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'PVRI'
+VERSION = 1
+HEADER = struct.Struct('<4sIQQ256s')  # magic, version, capacity, count, watermark
+HEADER_SIZE = 288  # HEADER.size rounded up so the slot table is 8-byte aligned
+SLOT = 8  # One 64-bit ID hash per slot; 0 marks an empty slot
+MIN_CAPACITY = 4096
+MAX_LOAD = 0.5  # The table doubles before it is more than half full
+
+def id_hash(review_id: str) -> int:
+    """64-bit hash of a review ID (never 0, which marks empty slots)."""
+    return int.from_bytes(hashlib.blake2b(str(review_id).encode('utf-8'), digest_size=SLOT).digest(), 'little') or 1
+
+def _snapshot(ids):
+    """Freeze plain sets so a union behaves like set union; other ID collections stay live."""
+    return frozenset(ids) if isinstance(ids, (set, frozenset)) else ids
+
+class IdUnion:
+    """Membership across several ID collections without copying them into one set."""
+
+    def __init__(self, *parts):
+        self.parts = parts
+
+    def __contains__(self, review_id) -> bool:
+        return any(review_id in part for part in self.parts)
+
+    def __or__(self, other) -> 'IdUnion':
+        return IdUnion(*self.parts, _snapshot(other))
+
+    __ror__ = __or__
+
+class ReviewIdIndex:
+    """Open-addressing hash table of review IDs in a memory-mapped file.
+
+    Membership is a hash and a short linear probe over data/review_id_index.bin,
+    so startup costs a file open instead of downloading every review ID.
+    sync() adds only what changed since the stored watermark: rows with a
+    newer (updated_at, review_id) in database mode, or the master CSV's ID
+    column when the file changed in CSV mode. IDs are stored as 64-bit
+    hashes; the false-positive rate at 100k reviews is about 1 in 10^9.
+    Deleted reviews are not removed - delete the file to rebuild it.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or config.data_dir / 'review_id_index.bin')
+        self._file = None
+        self._map = None
+        self._slots = None
+        self.capacity = 0
+        self.count = 0
+        self.watermark = ''
+        self._open()
+
+    def _open(self) -> None:
+        """Map the index file, starting an empty one if it is missing or unreadable."""
+        if self.path.exists():
+            try:
+                self._map_file()
+                return
+            except (OSError, ValueError, struct.error) as e:
+                self.close()
+                logger.warning(f"Review ID index unreadable ({e}). Rebuilding it.")
+        self._write_table(bytearray(HEADER_SIZE + MIN_CAPACITY * SLOT), MIN_CAPACITY, 0, '')
+        self._map_file()
+
+    def _map_file(self) -> None:
+        self._file = open(self.path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, version, capacity, count, watermark = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION or len(self._map) != HEADER_SIZE + capacity * SLOT:
+            raise ValueError('bad header')
+        self._slots = memoryview(self._map)[HEADER_SIZE:].cast('Q')
+        self.capacity, self.count = capacity, count
+        self.watermark = watermark.rstrip(b'\0').decode('utf-8')
+
+    def _write_table(self, data: bytearray, capacity: int, count: int, watermark: str) -> None:
+        """Write a complete index file atomically."""
+        HEADER.pack_into(data, 0, MAGIC, VERSION, capacity, count, watermark.encode('utf-8'))
+        tmp_path = self.path.with_suffix('.tmp')
+        tmp_path.write_bytes(data)
+        tmp_path.replace(self.path)
+
+    def close(self) -> None:
+        if self._slots is not None:
+            self._slots.release()
+            self._slots = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, review_id) -> bool:
+        target = id_hash(review_id)
+        mask = self.capacity - 1
+        slot = target & mask
+        while True:
+            value = self._slots[slot]
+            if value == target:
+                return True
+            if not value:
+                return False
+            slot = (slot + 1) & mask
+
+    def __or__(self, other) -> IdUnion:
+        return IdUnion(self, _snapshot(other))
+
+    __ror__ = __or__
+
+    def add(self, review_ids: Iterable[str]) -> int:
+        """Add IDs, growing the table as needed; returns how many were new."""
+        hashes = {id_hash(review_id) for review_id in review_ids}
+        if (self.count + len(hashes)) > self.capacity * MAX_LOAD:
+            self._grow(self.count + len(hashes))
+        added = sum(1 for value in hashes if self._insert(self._slots, self.capacity - 1, value))
+        self.count += added
+        self._write_header()
+        return added
+
+    @staticmethod
+    def _insert(slots, mask: int, value: int) -> bool:
+        slot = value & mask
+        while slots[slot]:
+            if slots[slot] == value:
+                return False
+            slot = (slot + 1) & mask
+        slots[slot] = value
+        return True
+
+    def _grow(self, needed: int) -> None:
+        """Rehash into a table big enough for needed IDs at MAX_LOAD."""
+        capacity = self.capacity
+        while needed > capacity * MAX_LOAD:
+            capacity *= 2
+        data = bytearray(HEADER_SIZE + capacity * SLOT)
+        slots = memoryview(data)[HEADER_SIZE:].cast('Q')
+        for value in self._slots:
+            if value:
+                self._insert(slots, capacity - 1, value)
+        slots.release()
+        watermark = self.watermark
+        self.close()
+        self._write_table(data, capacity, self.count, watermark)
+        self._map_file()
+
+    def _write_header(self) -> None:
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, self.capacity, self.count, self.watermark.encode('utf-8'))
+        self._map.flush()
+
+    def _set_watermark(self, watermark: str) -> None:
+        if len(watermark.encode('utf-8')) > 256:
+            raise ValueError(f"Watermark too long: {watermark}")
+        self.watermark = watermark
+        self._write_header()
+
+    def _reset(self) -> None:
+        """Drop all IDs, e.g. when the index was built from a different source."""
+        self.close()
+        self._write_table(bytearray(HEADER_SIZE + MIN_CAPACITY * SLOT), MIN_CAPACITY, 0, '')
+        self._map_file()
+
+    def sync(self, db=None) -> int:
+        """Bring the index up to date with the database (or the master CSV without db); returns IDs added."""
+        source = db.backend if db else 'csv'
+        if self.watermark and not self.watermark.startswith(f'{source}:'):
+            logger.info(f"Review ID index was built from {self.watermark.split(':')[0]}, rebuilding from {source}")
+            self._reset()
+        try:
+            added = self._sync_db(db) if db else self._sync_csv()
+        except Exception as e:
+            logger.warning(f"Review ID index sync failed ({e}). Using {self.count} indexed IDs.")
+            return 0
+        logger.info(f"Review ID index: {self.count} IDs ({added} new from {source})")
+        return added
+
+    def _sync_db(self, db) -> int:
+        added = 0
+        for rows in db.iter_review_ids(self._db_watermark()):
+            added += self.add(row['review_id'] for row in rows)
+            # Advance after every page, so an interrupted sync resumes where it stopped
+            self._set_watermark(f"{db.backend}:{rows[-1]['updated_at']}|{rows[-1]['review_id']}")
+        return added
+
+    def _db_watermark(self) -> Optional[Tuple[str, str]]:
+        if not self.watermark:
+            return None
+        updated_at, review_id = self.watermark.split(':', 1)[1].split('|', 1)
+        return updated_at, review_id
+
+    def _sync_csv(self) -> int:
+        """Re-read only the master CSV's ID column, and only if the file changed."""
+        master_db_path = config.data_dir / 'reviews_master_database.csv'
+        if not master_db_path.exists():
+            return 0
+        stat = master_db_path.stat()
+        watermark = f'csv:{stat.st_mtime_ns}:{stat.st_size}'
+        if watermark == self.watermark:
+            return 0
+        try:
+            review_ids = pd.read_csv(master_db_path, usecols=['Review ID'], dtype=str)['Review ID'].dropna()
+        except ValueError:
+            logger.warning("Master database missing 'Review ID' column")
+            return 0
+        added = self.add(review_ids)
+        self._set_watermark(watermark)
+        return added
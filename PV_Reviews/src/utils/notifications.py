@@ -58,9 +58,18 @@ class EmailNotifier:
             logger.error(f"Failed to send email: {e}")
             return False
     
+    def _collection_runs(self, run_summary: Dict) -> List[Dict]:
+        """Recent collection runs, newest first (the summary also lists generation and posting runs)."""
+        return [run for run in run_summary.get('recent_runs', []) if run.get('process_type', 'collection') == 'collection']
+    
+    def _format_counts(self, counts: Dict, order: List[str] = None) -> str:
+        """'5★ 40 · 4★ 12'-style line from a {key: count} breakdown."""
+        keys = order or sorted(counts)
+        return ' · '.join(f"{key} {counts[key]}" for key in keys if key in counts) or 'none'
+    
     def _generate_subject(self, run_summary: Dict) -> str:
         """Generate email subject line."""
-        recent_runs = run_summary.get('recent_runs', [])
+        recent_runs = self._collection_runs(run_summary)
         if not recent_runs:
             return "🔍 PV Reviews: No recent runs"
         
@@ -78,9 +87,15 @@ class EmailNotifier:
     
     def _generate_html_body(self, run_summary: Dict) -> str:
         """Generate HTML email body."""
-        recent_runs = run_summary.get('recent_runs', [])
+        recent_runs = self._collection_runs(run_summary)
         total_reviews = run_summary.get('total_reviews', 0)
         unreplied_reviews = run_summary.get('unreplied_reviews', 0)
+        ratings = self._format_counts(
+            {f"{rating}★": count for rating, count in run_summary.get('reviews_by_rating', {}).items()},
+            [f"{rating}★" for rating in range(5, 0, -1)]
+        )
+        sentiments = self._format_counts(run_summary.get('responses_by_sentiment', {}))
+        statuses = self._format_counts(run_summary.get('responses_by_status', {}))
         
         # Header
         html = f"""
@@ -96,6 +111,9 @@ class EmailNotifier:
                     <ul style="list-style: none; padding: 0;">
                         <li style="margin: 8px 0;"><strong>Total Reviews:</strong> {total_reviews}</li>
                         <li style="margin: 8px 0;"><strong>Unreplied Reviews:</strong> {unreplied_reviews}</li>
+                        <li style="margin: 8px 0;"><strong>By Rating:</strong> {ratings}</li>
+                        <li style="margin: 8px 0;"><strong>Responses by Sentiment:</strong> {sentiments}</li>
+                        <li style="margin: 8px 0;"><strong>Responses by Status:</strong> {statuses}</li>
                         <li style="margin: 8px 0;"><strong>Generated:</strong> {datetime.now().strftime('%B %d, %Y at %H:%M UTC')}</li>
                     </ul>
                 </div>
@@ -0,0 +1,109 @@
+"""Request blocking for lean collection and posting browser sessions."""
+
+import logging
+from collections import Counter
+from typing import Dict, Optional
+
+from config.settings import config
+
+logger = logging.getLogger(__name__)
+
+# Typical transfer size per blocked request, used when no request of that type was loaded to measure
+TYPICAL_BYTES = {'image': 25_000, 'media': 250_000, 'font': 30_000, 'stylesheet': 15_000, 'tracking': 1_000}
+DEFAULT_TYPICAL_BYTES = 10_000
+
+class ResourcePolicy:
+    """Aborts images, media, fonts and tracking requests; keeps documents and XHR.
+
+    Aborted requests never report a size, so bytes saved is an estimate:
+    blocked requests per type times the average size of loaded requests of
+    that type, or TYPICAL_BYTES when none was loaded.
+    """
+
+    def __init__(self, blocked_types: Optional[tuple] = None, blocked_url_patterns: Optional[tuple] = None):
+        self.blocked_types = set(blocked_types if blocked_types is not None else config.blocked_resource_types)
+        self.blocked_url_patterns = tuple(blocked_url_patterns if blocked_url_patterns is not None else config.blocked_url_patterns)
+        self.blocked = Counter()
+        self.requests_loaded = 0
+        self.bytes_loaded = 0
+        self.loaded_by_type = Counter()  # resource type -> requests with a content-length
+        self.bytes_by_type = Counter()
+
+    def install(self, context) -> None:
+        """Route every request in the context through the policy."""
+        context.route('**/*', self._handle_route)
+        context.on('response', self._on_response)
+        logger.info(f"Blocking {sorted(self.blocked_types)} and {len(self.blocked_url_patterns)} tracking patterns")
+
+    async def install_async(self, context) -> None:
+        """install() for an async Playwright context."""
+        await context.route('**/*', self._handle_route_async)
+        context.on('response', self._on_response)
+        logger.info(f"Blocking {sorted(self.blocked_types)} and {len(self.blocked_url_patterns)} tracking patterns")
+
+    def _handle_route(self, route) -> None:
+        request = route.request
+        reason = self._block_reason(request.resource_type, request.url)
+        if reason:
+            self.blocked[reason] += 1
+            route.abort()
+        else:
+            route.continue_()
+
+    async def _handle_route_async(self, route) -> None:
+        request = route.request
+        reason = self._block_reason(request.resource_type, request.url)
+        if reason:
+            self.blocked[reason] += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def _block_reason(self, resource_type: str, url: str) -> Optional[str]:
+        """Why a request should be blocked, or None to let it through."""
+        if resource_type in ('document', 'xhr', 'fetch'):
+            # Tracking beacons are often sent as XHR/fetch
+            return 'tracking' if any(pattern in url for pattern in self.blocked_url_patterns) else None
+        if resource_type in self.blocked_types:
+            return resource_type
+        if any(pattern in url for pattern in self.blocked_url_patterns):
+            return 'tracking'
+        return None
+
+    def _on_response(self, response) -> None:
+        self.requests_loaded += 1
+        try:
+            size = int(response.headers.get('content-length', 0))
+        except ValueError:
+            return
+        self.bytes_loaded += size
+        if size:
+            resource_type = response.request.resource_type
+            self.loaded_by_type[resource_type] += 1
+            self.bytes_by_type[resource_type] += size
+
+    def _estimated_bytes(self, reason: str) -> int:
+        """Likely size of one request blocked for a reason (a resource type or 'tracking')."""
+        if self.loaded_by_type[reason]:
+            return self.bytes_by_type[reason] // self.loaded_by_type[reason]
+        return TYPICAL_BYTES.get(reason, DEFAULT_TYPICAL_BYTES)
+
+    def summary(self) -> Dict:
+        """Requests blocked per type and the bytes that likely saved, plus what was actually downloaded."""
+        saved_by_type = {reason: count * self._estimated_bytes(reason) for reason, count in self.blocked.items()}
+        return {
+            'requests_blocked': sum(self.blocked.values()),
+            'blocked_by_type': dict(self.blocked),
+            'estimated_bytes_saved': sum(saved_by_type.values()),
+            'estimated_bytes_saved_by_type': saved_by_type,
+            'requests_loaded': self.requests_loaded,
+            'bytes_loaded': self.bytes_loaded
+        }
+
+    def log_summary(self) -> None:
+        summary = self.summary()
+        logger.info(
+            f"Resource policy: blocked {summary['requests_blocked']} requests {summary['blocked_by_type']} "
+            f"(~{summary['estimated_bytes_saved'] / 1024 / 1024:.1f} MB saved), "
+            f"loaded {summary['requests_loaded']} requests ({summary['bytes_loaded'] / 1024 / 1024:.1f} MB)"
+        )
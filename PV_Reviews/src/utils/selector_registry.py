@@ -0,0 +1,180 @@
+"""Ordered selector fallbacks for Google Business markup, tuned by what worked last."""
+
+import json
+import logging
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config.settings import config
+
+logger = logging.getLogger(__name__)
+
+# Candidate selectors per field, most trusted first. Card fields are looked up
+# inside a review card (div.noyJyc), the rest inside the reviews iframe or page.
+SELECTORS: Dict[str, tuple] = {
+    # Review card fields
+    'review_meta': ('div.KuKPRc', 'div[data-review-id]'),
+    'reviewer_name': ('a.PskQHd[jsname="xs1xe"]', 'a[jsname="xs1xe"]', 'a[href*="/contrib/"]:not([aria-label])'),
+    'reviewer_profile': ('a.PskQHd[aria-label*="Link to reviewer profile"]', 'a[aria-label*="reviewer profile"]', 'a[href*="/contrib/"]'),
+    'reviewer_details': ('div.PROnRd.vq72z', 'div.PROnRd:has-text("review")'),
+    'rating': ('span[role="img"]', '[role="img"][aria-label*="star"]'),
+    'review_time': ('span.KEfuhb', 'span:text-matches("ago$")'),
+    'read_more': ('a[jsname="ix0Hvc"]', 'a:has-text("More")'),
+    'review_text_full': ('div[jsname="PBWx0c"]',),
+    'review_text': ('div.gyKkFe.JhRJje.Fv38Af', 'div.gyKkFe', 'div[jsname="PBWx0c"]'),
+    'metadata': ('span.PROnRd.mpP9nc', 'span.mpP9nc'),
+    'sub_ratings': ('div.fjB0Xb',),
+    'images': ('img.T3g1hc', 'img[src*="googleusercontent"]'),
+    # Reviews panel
+    'read_reviews': ('button:has-text("Read reviews")', 'a:has-text("Read reviews")', '[role="button"]:has-text("reviews")'),
+    'unreplied_filter': ('button:has(span:has-text("Unreplied"))', 'button:has-text("Unreplied")', '[role="tab"]:has-text("Unreplied")'),
+    # Posting replies - looked up inside the review's container, and only by
+    # selectors specific to the reply form: a loose match would post to the wrong review
+    'reply_button': ('button:has(span:text-is("Reply"))', 'button[aria-label="Reply"]'),
+    'reply_textarea': ('textarea[aria-label="Your public reply"]', 'textarea[aria-label*="reply" i]'),
+    'reply_submit': ('button.VfPpkd-LgbsSe.DuMIQc[jsname="hrGhad"]', 'button[jsname="hrGhad"]'),
+}
+
+class SelectorRegistry:
+    """Finds elements by field name, trying the last selector that worked first.
+
+    Lookups never wait on a missing candidate for longer than
+    config.selector_probe_timeout_ms, so a selector broken by a markup change
+    costs milliseconds before the next candidate is tried. Winners are saved to
+    data/selector_winners.json by save() and tried right after the field's
+    primary selector on the next run, so a working primary always wins back.
+    """
+
+    def __init__(self, path: Optional[Path] = None, probe_timeout_ms: Optional[int] = None):
+        self.path = Path(path or config.data_dir / 'selector_winners.json')
+        self.probe_timeout_ms = probe_timeout_ms or config.selector_probe_timeout_ms
+        self.winners: Dict[str, str] = {}
+        self.hits = Counter()
+        self.fallbacks = Counter()
+        self.misses = Counter()
+        self._changed = False
+        self._load()
+
+    def _load(self) -> None:
+        """Load saved winners; ones no longer among the candidates are dropped."""
+        if not self.path.exists():
+            return
+        try:
+            saved = json.loads(self.path.read_text()).get('winners', {})
+            self.winners = {field: selector for field, selector in saved.items() if selector in SELECTORS.get(field, ())}
+        except (json.JSONDecodeError, AttributeError) as e:
+            logger.warning(f"Selector winners file corrupt ({e}). Using default order.")
+
+    def candidates(self, field: str) -> List[str]:
+        """The field's selectors: primary first, then the last winner, then the rest."""
+        selectors = list(SELECTORS[field])
+        winner = self.winners.get(field)
+        if winner and winner != selectors[0]:
+            selectors.remove(winner)
+            selectors.insert(1, winner)
+        return selectors
+
+    def _wait_timeout(self, candidates: List[str], timeout_ms: Optional[int]) -> int:
+        return timeout_ms or self.probe_timeout_ms * len(candidates)
+
+    def find(self, scope, field: str, wait: bool = False, timeout_ms: Optional[int] = None):
+        """Locator for the first candidate that matches inside scope, or None.
+
+        Without wait only elements already attached count, which suits fields of
+        a rendered card. With wait, any candidate may appear within timeout_ms
+        (default: the probe timeout per candidate), for elements that show up
+        after a click; the candidates are then checked again in order.
+        """
+        candidates = self.candidates(field)
+        for attempt in range(2 if wait else 1):
+            if attempt:
+                try:
+                    scope.locator(', '.join(candidates)).first.wait_for(
+                        state='attached', timeout=self._wait_timeout(candidates, timeout_ms)
+                    )
+                except Exception:
+                    break
+            for selector in candidates:
+                locator = scope.locator(selector)
+                if locator.count():
+                    return self._hit(field, selector, locator)
+        self.misses[field] += 1
+        return None
+
+    async def find_async(self, scope, field: str, wait: bool = False, timeout_ms: Optional[int] = None):
+        """find() for async Playwright locators."""
+        candidates = self.candidates(field)
+        for attempt in range(2 if wait else 1):
+            if attempt:
+                try:
+                    await scope.locator(', '.join(candidates)).first.wait_for(
+                        state='attached', timeout=self._wait_timeout(candidates, timeout_ms)
+                    )
+                except Exception:
+                    break
+            for selector in candidates:
+                locator = scope.locator(selector)
+                if await locator.count():
+                    return self._hit(field, selector, locator)
+        self.misses[field] += 1
+        return None
+
+    def text(self, scope, field: str) -> Optional[str]:
+        """Inner text of the field's first match, or None if no candidate matches."""
+        locator = self.find(scope, field)
+        return locator.first.inner_text(timeout=self.probe_timeout_ms) if locator else None
+
+    def attribute(self, scope, field: str, name: str) -> Optional[str]:
+        """An attribute of the field's first match, or None if no candidate matches."""
+        locator = self.find(scope, field)
+        return locator.first.get_attribute(name, timeout=self.probe_timeout_ms) if locator else None
+
+    async def text_async(self, scope, field: str) -> Optional[str]:
+        locator = await self.find_async(scope, field)
+        return await locator.first.inner_text(timeout=self.probe_timeout_ms) if locator else None
+
+    async def attribute_async(self, scope, field: str, name: str) -> Optional[str]:
+        locator = await self.find_async(scope, field)
+        return await locator.first.get_attribute(name, timeout=self.probe_timeout_ms) if locator else None
+
+    def _hit(self, field: str, selector: str, locator):
+        """Count a match and make its selector the field's winner."""
+        self.hits[field] += 1
+        if selector != SELECTORS[field][0]:
+            self.fallbacks[field] += 1
+        if self.winners.get(field) != selector:
+            if field in self.winners:
+                logger.info(f"Selector for '{field}' changed to {selector}")
+            self.winners[field] = selector
+            self._changed = True
+        return locator
+
+    def save(self) -> None:
+        """Write the winners to disk if any changed during the run."""
+        if not self._changed:
+            return
+        try:
+            tmp_path = self.path.with_suffix('.tmp')
+            tmp_path.write_text(json.dumps({
+                'updated_at': datetime.now().isoformat(),
+                'winners': self.winners
+            }, indent=2, sort_keys=True))
+            tmp_path.replace(self.path)
+            self._changed = False
+        except OSError as e:
+            logger.warning(f"Could not save selector winners: {e}")
+
+    def summary(self) -> Dict:
+        """Lookups per field that needed a fallback selector or found nothing."""
+        return {
+            'lookups': sum(self.hits.values()) + sum(self.misses.values()),
+            'fallbacks': dict(self.fallbacks),
+            'misses': dict(self.misses)
+        }
+
+    def log_summary(self) -> None:
+        summary = self.summary()
+        if summary['fallbacks'] or summary['misses']:
+            logger.info(f"Selector fallbacks {summary['fallbacks']}, misses {summary['misses']}")
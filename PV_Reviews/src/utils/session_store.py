@@ -0,0 +1,80 @@
+"""Encrypted on-disk storage for the authenticated Playwright session state."""
+
+import base64
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+from config.settings import config
+
+logger = logging.getLogger(__name__)
+
+SALT_SIZE = 16  # Random salt stored in front of each encrypted session
+KDF_ITERATIONS = 600_000  # PBKDF2-HMAC-SHA256 rounds per key derivation
+
+class SessionStore:
+    """Saves and reloads Playwright storage_state encrypted with SESSION_ENCRYPTION_KEY.
+
+    The file is a random salt followed by a Fernet token whose key is derived
+    from the passphrase and that salt with PBKDF2.
+    """
+
+    def __init__(self, path: Optional[Path] = None, secret: Optional[str] = None):
+        self.path = Path(path or config.session_state_path)
+        self.secret = config.session_encryption_key if secret is None else secret
+
+        if not self.secret:
+            logger.warning("SESSION_ENCRYPTION_KEY not set - session reuse disabled")
+
+    @property
+    def enabled(self) -> bool:
+        """Whether sessions can be saved and loaded."""
+        return bool(self.secret)
+
+    def load(self) -> Optional[Dict]:
+        """Load the saved storage_state, or None if missing or unreadable."""
+        if not self.enabled or not self.path.exists():
+            return None
+
+        try:
+            data = self.path.read_bytes()
+            salt, token = data[:SALT_SIZE], data[SALT_SIZE:]
+            return json.loads(self._fernet(salt).decrypt(token))
+        except InvalidToken:
+            logger.warning("Saved session could not be decrypted - ignoring it")
+        except Exception as e:
+            logger.warning(f"Error loading saved session: {e}")
+        return None
+
+    def save(self, state: Dict) -> bool:
+        """Encrypt and write a storage_state to disk."""
+        if not self.enabled:
+            return False
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            salt = os.urandom(SALT_SIZE)
+            self.path.write_bytes(salt + self._fernet(salt).encrypt(json.dumps(state).encode('utf-8')))
+            self.path.chmod(0o600)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving session: {e}")
+            return False
+
+    def clear(self) -> None:
+        """Remove the saved session."""
+        try:
+            self.path.unlink(missing_ok=True)
+        except Exception as e:
+            logger.warning(f"Error removing saved session: {e}")
+
+    def _fernet(self, salt: bytes) -> Fernet:
+        """Fernet for the passphrase and a salt, with the key stretched by PBKDF2."""
+        kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=KDF_ITERATIONS)
+        return Fernet(base64.urlsafe_b64encode(kdf.derive(self.secret.encode('utf-8'))))
@@ -0,0 +1,412 @@
+"""Local SQLite storage for review data, with the same interface as the Supabase ReviewDatabase."""
+
+import json
+import logging
+import re
+import sqlite3
+import threading
+from copy import deepcopy
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from config.settings import config
+from src.utils.database import (
+    ID_FILTER_CHUNK, ID_PAGE_SIZE, UPSERT_CHUNK, EMPTY_SUMMARY, ReviewDatabase, _write_in_chunks
+)
+
+logger = logging.getLogger(__name__)
+
+NOW = "strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"  # UTC ISO timestamps that sort as text
+
+def utc_now() -> str:
+    """The current time in the format of NOW."""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    review_id TEXT UNIQUE NOT NULL,
+    listing_id TEXT NOT NULL,
+    reviewer_name TEXT NOT NULL,
+    reviewer_profile_url TEXT,
+    is_local_guide INTEGER DEFAULT 0,
+    review_count INTEGER,
+    photo_count INTEGER,
+    rating INTEGER NOT NULL,
+    review_time TEXT NOT NULL,
+    review_text TEXT,
+    share_url TEXT,
+    dine_in TEXT,
+    session TEXT,
+    price_range TEXT,
+    food_rating INTEGER,
+    service_rating INTEGER,
+    atmosphere_rating INTEGER,
+    images TEXT,                     -- JSON array of image URLs
+    has_response INTEGER DEFAULT 0,
+    content_hash TEXT,
+    is_edited INTEGER DEFAULT 0,
+    owner_reply_text TEXT,
+    created_at TEXT DEFAULT ({NOW}),
+    updated_at TEXT DEFAULT ({NOW})
+);
+
+CREATE TABLE IF NOT EXISTS review_responses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    review_id TEXT NOT NULL REFERENCES reviews(review_id),
+    response_text TEXT NOT NULL,
+    sentiment TEXT,
+    issues TEXT,
+    generated_at TEXT DEFAULT ({NOW}),
+    posted_at TEXT,
+    status TEXT DEFAULT 'generated',
+    post_attempts INTEGER DEFAULT 0,
+    last_error TEXT
+);
+
+CREATE TABLE IF NOT EXISTS processing_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    process_type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    reviews_processed INTEGER DEFAULT 0,
+    responses_generated INTEGER DEFAULT 0,
+    responses_posted INTEGER DEFAULT 0,
+    error_message TEXT,
+    started_at TEXT DEFAULT ({NOW}),
+    completed_at TEXT,
+    metadata TEXT                    -- JSON
+);
+
+CREATE TABLE IF NOT EXISTS sync_cursors (
+    listing_id TEXT PRIMARY KEY,
+    review_id TEXT NOT NULL,
+    review_time TEXT,
+    synced_at TEXT DEFAULT ({NOW})
+);
+
+CREATE INDEX IF NOT EXISTS idx_reviews_updated_at_review_id ON reviews(updated_at, review_id);
+CREATE INDEX IF NOT EXISTS idx_reviews_unreplied_keyset ON reviews(created_at DESC, id DESC) WHERE NOT has_response;
+CREATE INDEX IF NOT EXISTS idx_review_responses_review_id ON review_responses(review_id);
+CREATE INDEX IF NOT EXISTS idx_review_responses_pending_keyset ON review_responses(generated_at DESC, id DESC) WHERE status = 'generated';
+CREATE INDEX IF NOT EXISTS idx_processing_logs_started_at ON processing_logs(started_at DESC);
+"""
+
+BOOLEAN_COLUMNS = {'is_local_guide', 'has_response', 'is_edited'}
+JSON_COLUMNS = {'images', 'metadata'}
+EMBEDDED = re.compile(r'^(\w+)!inner\((.*)\)$')  # PostgREST embedding, e.g. reviews!inner(rating, review_text)
+
+class SQLiteReviewDatabase(ReviewDatabase):
+    """ReviewDatabase stored in a local SQLite file (config.sqlite_path).
+
+    Runs in WAL mode so reads do not block the writer, and writes each batch
+    in one transaction. Review cleaning, edit detection and the streaming
+    readers are inherited; only the storage calls differ. One connection is
+    shared by all threads of a run behind a lock.
+    """
+
+    backend = 'sqlite'
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or config.sqlite_path)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA foreign_keys=ON')
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.RLock()
+        self.last_save_stats: Dict[str, int] = {}
+        self.last_saved_ids: List[str] = []
+        self._table_columns: Dict[str, List[str]] = {}
+
+    def close(self) -> None:
+        """Fold the WAL back into the database file and close the connection."""
+        with self.lock:
+            try:
+                self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            except sqlite3.Error as e:
+                logger.warning(f"Could not checkpoint {self.path}: {e}")
+            self.conn.close()
+
+    def _upsert_reviews(self, rows: List[Dict]) -> Tuple[int, List[Tuple[Dict, str]]]:
+        columns = list(rows[0])
+        updates = ', '.join(f'{column} = excluded.{column}' for column in columns if column != 'review_id')
+        sql = (
+            f"INSERT INTO reviews ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT(review_id) DO UPDATE SET {updates}, updated_at = {NOW}"
+        )
+
+        def write(chunk: List[Dict]) -> None:
+            with self.lock, self.conn:
+                self.conn.executemany(sql, [[self._to_sql(row[column]) for column in columns] for row in chunk])
+
+        return _write_in_chunks(write, rows, UPSERT_CHUNK)
+
+    def _get_stored_reviews(self, review_ids: List[str]) -> Tuple[Dict[str, Dict[str, Optional[str]]], Set[str]]:
+        stored, failed = {}, set()
+        for start in range(0, len(review_ids), ID_FILTER_CHUNK):
+            chunk = review_ids[start:start + ID_FILTER_CHUNK]
+            try:
+                rows = self._query(
+                    f"SELECT review_id, content_hash, owner_reply_text FROM reviews WHERE review_id IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                )
+            except sqlite3.Error as e:
+                logger.error(f"Error looking up {len(chunk)} stored reviews: {e}")
+                failed.update(chunk)
+                continue
+            stored.update({
+                row['review_id']: {'content_hash': row['content_hash'], 'owner_reply_text': row['owner_reply_text']}
+                for row in rows
+            })
+        return stored, failed
+
+    def iter_review_ids(self, updated_after: Optional[Tuple[str, str]] = None,
+                        page_size: int = ID_PAGE_SIZE) -> Iterator[List[Dict]]:
+        while True:
+            where, params = ('WHERE (updated_at, review_id) > (?, ?)', list(updated_after)) if updated_after else ('', [])
+            rows = self._query(
+                f'SELECT review_id, updated_at FROM reviews {where} ORDER BY updated_at, review_id LIMIT ?',
+                params + [page_size]
+            )
+            if rows:
+                yield rows
+            if len(rows) < page_size:
+                return
+            updated_after = (rows[-1]['updated_at'], rows[-1]['review_id'])
+
+    def log_run(self, run_date: str, reviews_collected: int, new_reviews: int,
+                duration_seconds: float, status: str, error_message: str = None,
+                metadata: Dict[str, Any] = None) -> None:
+        try:
+            self._execute(
+                'INSERT INTO processing_logs (process_type, status, reviews_processed, error_message, metadata) VALUES (?, ?, ?, ?, ?)',
+                ['collection', status, reviews_collected, error_message, json.dumps({
+                    'run_date': run_date,
+                    'new_reviews': new_reviews,
+                    'duration_seconds': duration_seconds,
+                    **(metadata or {})
+                }, default=str)]
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Error logging run: {e}")
+
+    def get_sync_cursor(self, listing_id: str) -> Optional[Dict]:
+        rows = self._query('SELECT * FROM sync_cursors WHERE listing_id = ?', [listing_id])
+        return rows[0] if rows else None
+
+    def save_sync_cursor(self, listing_id: str, review_id: str, review_time: Optional[str]) -> None:
+        try:
+            self._execute(
+                'INSERT INTO sync_cursors (listing_id, review_id, review_time, synced_at) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(listing_id) DO UPDATE SET review_id = excluded.review_id, '
+                'review_time = excluded.review_time, synced_at = excluded.synced_at',
+                [listing_id, review_id, review_time, datetime.now().isoformat()]
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Error saving sync cursor for listing {listing_id}: {e}")
+
+    def mark_response_generated(self, review_ids: List[str]) -> List[Dict]:
+        return self._update_in_chunks('reviews', {'has_response': True}, list(review_ids))
+
+    def mark_response_posted(self, review_ids: List[str]) -> List[Dict]:
+        review_ids = list(review_ids)
+        return self._update_in_chunks('reviews', {'has_response': True}, review_ids) + self._update_in_chunks(
+            'review_responses', {'status': 'posted', 'posted_at': utc_now()}, review_ids
+        )
+
+    def _update_in_chunks(self, table: str, values: Dict, review_ids: List[str]) -> List[Dict]:
+        """update_in_chunks for SQLite: one transaction per chunk of IDs."""
+        assignments = ', '.join(f'{column} = ?' for column in values)
+        if table == 'reviews':
+            assignments += f', updated_at = {NOW}'
+        failures = []
+        for start in range(0, len(review_ids), ID_FILTER_CHUNK):
+            chunk = review_ids[start:start + ID_FILTER_CHUNK]
+            try:
+                self._execute(
+                    f"UPDATE {table} SET {assignments} WHERE review_id IN ({', '.join('?' * len(chunk))})",
+                    [self._to_sql(value) for value in values.values()] + chunk
+                )
+            except sqlite3.Error as e:
+                logger.error(f"Error updating {len(chunk)} rows of {table}: {e}")
+                failures.append({'table': table, 'review_ids': chunk, 'error': str(e)})
+        return failures
+
+    def get_run_summary(self, days: int = 7) -> Dict:
+        try:
+            counts = self._query('SELECT COUNT(*) AS total, COALESCE(SUM(NOT has_response), 0) AS unreplied FROM reviews')[0]
+            from_date = (datetime.now(timezone.utc) - timedelta(days=days)).strftime('%Y-%m-%dT%H:%M:%S')
+            runs = self._query(
+                "SELECT process_type, status, started_at, reviews_processed AS reviews_collected, error_message, "
+                "COALESCE(json_extract(metadata, '$.run_date'), started_at) AS run_date, "
+                "COALESCE(json_extract(metadata, '$.new_reviews'), 0) AS new_reviews, "
+                "COALESCE(json_extract(metadata, '$.duration_seconds'), 0) AS duration_seconds "
+                "FROM processing_logs WHERE started_at >= ? ORDER BY started_at DESC LIMIT 50",
+                [from_date]
+            )
+            return {
+                'total_reviews': counts['total'],
+                'unreplied_reviews': counts['unreplied'],
+                'reviews_by_rating': self._counts('SELECT rating AS key, COUNT(*) AS total FROM reviews GROUP BY rating'),
+                'responses_by_sentiment': self._counts(
+                    "SELECT COALESCE(NULLIF(sentiment, ''), 'unknown') AS key, COUNT(*) AS total FROM review_responses GROUP BY 1"
+                ),
+                'responses_by_status': self._counts(
+                    "SELECT COALESCE(status, 'unknown') AS key, COUNT(*) AS total FROM review_responses GROUP BY 1"
+                ),
+                'recent_runs': runs
+            }
+        except sqlite3.Error as e:
+            logger.error(f"Error getting run summary: {e}")
+            return deepcopy(EMPTY_SUMMARY)
+
+    def _counts(self, sql: str) -> Dict[str, int]:
+        return {str(row['key']): row['total'] for row in self._query(sql)}
+
+    def save_responses(self, responses: List[Dict]) -> Tuple[List[str], List[Dict]]:
+        """Insert responses and mark their reviews in one transaction per chunk."""
+        rows = [
+            {
+                'review_id': response['review_id'],
+                'response_text': response['response_text'],
+                'sentiment': response.get('sentiment') or '',
+                'issues': response.get('issues') or ''
+            }
+            for response in responses
+        ]
+
+        def write(chunk: List[Dict]) -> None:
+            review_ids = [row['review_id'] for row in chunk]
+            with self.lock, self.conn:
+                self.conn.executemany(
+                    'INSERT INTO review_responses (review_id, response_text, sentiment, issues) VALUES (?, ?, ?, ?)',
+                    [[row['review_id'], row['response_text'], row['sentiment'], row['issues']] for row in chunk]
+                )
+                self.conn.execute(
+                    f"UPDATE reviews SET has_response = 1, updated_at = {NOW} WHERE review_id IN ({', '.join('?' * len(chunk))})",
+                    review_ids
+                )
+
+        _, failed = _write_in_chunks(write, rows, UPSERT_CHUNK)
+        for row, error in failed:
+            logger.error(f"Error saving response for review {row['review_id']}: {error}")
+        failed_ids = {row['review_id'] for row, _ in failed}
+        saved_ids = [row['review_id'] for row in rows if row['review_id'] not in failed_ids]
+        return saved_ids, [{'table': 'review_responses', 'review_ids': [row['review_id']], 'error': error} for row, error in failed]
+
+    def _iter_keyset(self, table: str, columns: Sequence[str], sort_column: str, filters: Dict[str, Any],
+                     limit: Optional[int] = None, page_size: int = ID_PAGE_SIZE) -> Iterator[Dict]:
+        """Keyset pages as in ReviewDatabase; PostgREST-style column lists (incl. x!inner(...)) are translated to a join."""
+        selected, joins = [f't.{sort_column}', 't.id'], []
+        for column in columns:
+            embedded = EMBEDDED.match(column.strip())
+            if embedded:
+                other, other_columns = embedded.group(1), [name.strip() for name in embedded.group(2).split(',')]
+                if other_columns == ['*']:
+                    other_columns = self._columns(other)
+                joins.append(f'JOIN {other} ON {other}.review_id = t.review_id')
+                selected += [f'{other}.{name} AS "{other}.{name}"' for name in other_columns]
+            else:
+                selected.append('t.*' if column == '*' else f't.{column}')
+        where = ' AND '.join(f't.{column} = ?' for column in filters)
+        params = [self._to_sql(value) for value in filters.values()]
+
+        after = None
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            conditions, page_params = [where] if where else [], list(params)
+            if after:
+                conditions.append(f'(t.{sort_column}, t.id) < (?, ?)')
+                page_params += list(after)
+            rows = self._query(
+                f"SELECT {', '.join(selected)} FROM {table} t {' '.join(joins)} "
+                f"{'WHERE ' + ' AND '.join(conditions) if conditions else ''} "
+                f"ORDER BY t.{sort_column} DESC, t.id DESC LIMIT ?",
+                page_params + [size]
+            )
+            for row in rows:
+                yield self._nest(row)
+            if len(rows) < size:
+                return
+            if remaining is not None:
+                remaining -= len(rows)
+            after = (rows[-1][sort_column], rows[-1]['id'])
+
+    def _nest(self, row: Dict) -> Dict:
+        """Move "table.column" keys of joined rows into a nested dict, as PostgREST embeds them."""
+        nested: Dict[str, Any] = {}
+        for key, value in row.items():
+            if '.' in key:
+                other, column = key.split('.', 1)
+                nested.setdefault(other, {})[column] = value
+            else:
+                nested[key] = value
+        return nested
+
+    def _columns(self, table: str) -> List[str]:
+        if table not in self._table_columns:
+            self._table_columns[table] = [row['name'] for row in self._query(f'PRAGMA table_info({table})')]
+        return self._table_columns[table]
+
+    def log_process_start(self, process_type: str, metadata: Dict[str, Any] = None) -> int:
+        try:
+            return self._execute(
+                'INSERT INTO processing_logs (process_type, status, metadata) VALUES (?, ?, ?)',
+                [process_type, 'started', json.dumps(metadata or {}, default=str)]
+            ).lastrowid
+        except sqlite3.Error as e:
+            logger.error(f"Error logging process start: {e}")
+            return None
+
+    def log_process_complete(self, log_id: int, reviews_processed: int = 0,
+                           responses_generated: int = 0, responses_posted: int = 0,
+                           error_message: str = None, metadata: Dict[str, Any] = None) -> bool:
+        update_data = {
+            'status': 'failed' if error_message else 'completed',
+            'reviews_processed': reviews_processed,
+            'responses_generated': responses_generated,
+            'responses_posted': responses_posted,
+            'completed_at': utc_now()
+        }
+        if error_message:
+            update_data['error_message'] = error_message
+        if metadata is not None:
+            update_data['metadata'] = metadata
+        try:
+            cursor = self._execute(
+                f"UPDATE processing_logs SET {', '.join(f'{column} = ?' for column in update_data)} WHERE id = ?",
+                [self._to_sql(value) for value in update_data.values()] + [log_id]
+            )
+            return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            logger.error(f"Error logging process completion: {e}")
+            return False
+
+    def _execute(self, sql: str, params: Sequence = ()) -> sqlite3.Cursor:
+        """Run one write statement in its own transaction."""
+        with self.lock, self.conn:
+            return self.conn.execute(sql, params)
+
+    def _query(self, sql: str, params: Sequence = ()) -> List[Dict]:
+        with self.lock:
+            return [self._from_sql(row) for row in self.conn.execute(sql, params).fetchall()]
+
+    @staticmethod
+    def _to_sql(value: Any) -> Any:
+        return json.dumps(value, default=str) if isinstance(value, (list, dict)) else value
+
+    @staticmethod
+    def _from_sql(row: sqlite3.Row) -> Dict:
+        """Row as a dict with booleans and JSON columns decoded, matching what PostgREST returns."""
+        decoded = {}
+        for key, value in dict(row).items():
+            column = key.rsplit('.', 1)[-1]
+            if column in BOOLEAN_COLUMNS and value is not None:
+                value = bool(value)
+            elif column in JSON_COLUMNS and isinstance(value, str):
+                value = json.loads(value)
+            decoded[key] = value
+        return decoded
@@ -0,0 +1,54 @@
+"""Per-listing cursor for full-history sync runs."""
+
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from config.settings import config
+
+logger = logging.getLogger(__name__)
+
+class SyncCursor:
+    """The newest review each listing's last full-history sync saw.
+
+    A sync walks reviews newest-first and stops once it reaches the cursor.
+    Cursors live in the sync_cursors table in database mode and in
+    data/sync_cursor.json otherwise.
+    """
+
+    def __init__(self, db=None, path: Optional[Path] = None):
+        self.db = db
+        self.path = Path(path or config.data_dir / 'sync_cursor.json')
+
+    def load(self, listing_id: str) -> Optional[Dict]:
+        """The listing's cursor ({review_id, review_time, synced_at}), or None before its first sync."""
+        if self.db:
+            return self.db.get_sync_cursor(listing_id)
+        return self._read().get(listing_id)
+
+    def save(self, listing_id: str, review_id: str, review_time: Optional[str]) -> None:
+        """Move the listing's cursor to the newest review of a completed sync."""
+        if self.db:
+            self.db.save_sync_cursor(listing_id, review_id, review_time)
+        else:
+            cursors = self._read()
+            cursors[listing_id] = {
+                'review_id': review_id,
+                'review_time': review_time,
+                'synced_at': datetime.now().isoformat()
+            }
+            tmp_path = self.path.with_suffix('.tmp')
+            tmp_path.write_text(json.dumps(cursors, indent=2))
+            tmp_path.replace(self.path)
+        logger.info(f"Sync cursor for listing {listing_id} moved to review {review_id} ({review_time})")
+
+    def _read(self) -> Dict:
+        if not self.path.exists():
+            return {}
+        try:
+            return json.loads(self.path.read_text())
+        except json.JSONDecodeError as e:
+            logger.warning(f"Sync cursor file corrupt ({e}). Syncing full history.")
+            return {}
@@ -0,0 +1,76 @@
+"""Lightweight per-phase timing for collection, generation and posting runs."""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+class RunTimer:
+    """Accumulates wall time and item counts per named phase of a run.
+
+    Phases may be entered many times (e.g. one "save" per flush); their times
+    and items add up. summary() is what goes into processing_logs.metadata.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, Dict] = {}
+
+    @contextmanager
+    def phase(self, name: str, items: int = 0) -> Iterator[Dict]:
+        """Time a block; set span['items'] inside it if the count is only known later."""
+        span = {'items': items}
+        start = time.perf_counter()
+        try:
+            yield span
+        finally:
+            self.add(name, time.perf_counter() - start, span['items'])
+
+    def iterate(self, name: str, iterable: Iterable) -> Iterator:
+        """Yield from an iterable, charging only the time spent producing items to a phase.
+
+        Time the consumer spends between items (e.g. saving them) is not counted.
+        """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(name, time.perf_counter() - start)
+                return
+            self.add(name, time.perf_counter() - start, 1)
+            yield item
+
+    def add(self, name: str, seconds: float, items: int = 0) -> None:
+        """Add time and items to a phase."""
+        totals = self.phases.setdefault(name, {'seconds': 0.0, 'items': 0})
+        totals['seconds'] += seconds
+        totals['items'] += items
+
+    @property
+    def total_seconds(self) -> float:
+        return time.perf_counter() - self.started
+
+    def summary(self) -> Dict:
+        """Total duration and, per phase, seconds, items and items per second."""
+        return {
+            'duration_seconds': round(self.total_seconds, 2),
+            'phases': {
+                name: {
+                    'seconds': round(totals['seconds'], 2),
+                    'items': totals['items'],
+                    'items_per_second': round(totals['items'] / totals['seconds'], 2) if totals['seconds'] > 0 and totals['items'] else None
+                }
+                for name, totals in self.phases.items()
+            }
+        }
+
+    def log_summary(self, label: str = 'Run') -> None:
+        summary = self.summary()
+        phases = ', '.join(
+            f"{name} {totals['seconds']:.1f}s/{totals['items']}" for name, totals in summary['phases'].items()
+        )
+        logger.info(f"{label} took {summary['duration_seconds']:.1f}s: {phases}")
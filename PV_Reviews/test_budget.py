@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for the adaptive per-card extraction budget
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent))
+
+import pytest
+
+from src.utils.budget import MIN_SAMPLES, BudgetExceeded, CardBudget, CardDeadline
+
+
+def test_budget_is_max_until_enough_samples():
+    budget = CardBudget(window=10, multiplier=3.0, min_ms=1000, max_ms=8000)
+    for _ in range(MIN_SAMPLES - 1):
+        budget.observe(0.1)
+    assert budget.seconds == 8.0
+
+
+def test_budget_follows_p90_latency():
+    budget = CardBudget(window=10, multiplier=3.0, min_ms=100, max_ms=8000)
+    for seconds in (0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.5):
+        budget.observe(seconds)
+    assert budget.seconds == pytest.approx(1.5)
+
+
+def test_budget_is_clamped():
+    budget = CardBudget(window=10, multiplier=3.0, min_ms=1000, max_ms=2000)
+    for _ in range(MIN_SAMPLES):
+        budget.observe(0.01)
+    assert budget.seconds == 1.0
+    for _ in range(10):
+        budget.observe(5.0)
+    assert budget.seconds == 2.0
+
+
+def test_window_drops_old_latencies():
+    budget = CardBudget(window=5, multiplier=1.0, min_ms=1, max_ms=60000)
+    for _ in range(5):
+        budget.observe(10.0)
+    for _ in range(5):
+        budget.observe(0.2)
+    assert budget.seconds == pytest.approx(0.2)
+
+
+def test_retries_get_the_full_budget():
+    budget = CardBudget(window=10, multiplier=1.0, min_ms=100, max_ms=9000)
+    for _ in range(MIN_SAMPLES):
+        budget.observe(0.2)
+    assert budget.start().seconds == pytest.approx(0.2)
+    assert budget.start(retry=True).seconds == 9.0
+
+
+def test_deadline_timeout_and_check():
+    deadline = CardDeadline(10.0)
+    assert deadline.timeout_ms(1500) == 1500
+    deadline.check('fast step')
+
+    expired = CardDeadline(0.0)
+    assert expired.timeout_ms(1500) == 1
+    with pytest.raises(BudgetExceeded):
+        expired.started -= 0.01
+        expired.check('slow step')
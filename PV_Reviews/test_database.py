@@ -7,7 +7,7 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent))
 
-from src.utils.database import ReviewDatabase
+from src.utils.database import get_database
 
 def test_database():
     """Test basic database functionality"""
@@ -17,7 +17,7 @@ def test_database():
     try:
         # Initialize database
         print("1️⃣  Initializing database connection...")
-        db = ReviewDatabase()
+        db = get_database()
         print("✅ Database connection successful")
         
         # Test getting unreplied reviews
@@ -60,6 +60,7 @@ def test_database():
             print(f"   {i+1}. Response for: {response.get('reviews', {}).get('reviewer_name', 'Unknown')}")
             print(f"      Response: {response['response_text'][:50]}...")
         
+        db.close()
         print("\n🎉 All database tests completed successfully!")
         return True
         
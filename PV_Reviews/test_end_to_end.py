@@ -8,7 +8,7 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent))
 
-from src.utils.database import ReviewDatabase
+from src.utils.database import get_database
 from src.processors.response_generator_db import ResponseGenerator
 
 def test_complete_system():
@@ -19,7 +19,7 @@ def test_complete_system():
     try:
         # 1. Test Database Connection
         print("\n1️⃣  Testing database connection...")
-        db = ReviewDatabase()
+        db = get_database()
         
         # Get initial stats
         initial_stats = db.get_run_summary()
@@ -29,7 +29,7 @@ def test_complete_system():
         
         # 2. Test Getting Unreplied Reviews
         print("\n2️⃣  Testing unreplied reviews query...")
-        unreplied = db.get_unreplied_reviews(limit=5)
+        unreplied = list(db.iter_unreplied_reviews(limit=5))
         print(f"✅ Found {len(unreplied)} unreplied reviews")
         
         if unreplied:
@@ -59,7 +59,7 @@ def test_complete_system():
         
         # 4. Test Getting Pending Responses
         print("\n4️⃣  Testing pending responses query...")
-        pending = db.get_pending_responses(limit=5)
+        pending = list(db.iter_pending_responses(limit=5))
         print(f"✅ Found {len(pending)} pending responses")
         
         if pending:
@@ -89,6 +89,9 @@ def test_complete_system():
         print(f"✅ Final Statistics:")
         print(f"   📊 Total reviews: {final_stats.get('total_reviews', 0)}")
         print(f"   💬 Unreplied reviews: {final_stats.get('unreplied_reviews', 0)}")
+        print(f"   ⭐ By rating: {final_stats.get('reviews_by_rating', {})}")
+        print(f"   😊 Responses by sentiment: {final_stats.get('responses_by_sentiment', {})}")
+        print(f"   📮 Responses by status: {final_stats.get('responses_by_status', {})}")
         print(f"   📝 Recent runs: {len(final_stats.get('recent_runs', []))}")
         
         # 7. System Health Check
@@ -103,7 +106,10 @@ def test_complete_system():
         elif final_stats.get('unreplied_reviews', 0) > 100:
             health_issues.append(f"High number of unreplied reviews: {final_stats.get('unreplied_reviews', 0)}")
         
-        if len(pending) == 0:
+        if final_stats.get('total_reviews', 0) != sum(final_stats.get('reviews_by_rating', {}).values()):
+            health_issues.append("Rating breakdown does not add up to the total review count")
+        
+        if final_stats.get('responses_by_status', {}).get('generated', 0) == 0:
             health_issues.append("No pending responses to post")
         
         if health_issues:
@@ -113,6 +119,8 @@ def test_complete_system():
         else:
             print("   ✅ System health: EXCELLENT")
         
+        generator.db.close()
+        db.close()
         print("\n🎉 End-to-end test completed successfully!")
         print("\n📋 Next Steps:")
         print("   1. Set up GitHub secrets for automation")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for the memory-mapped review ID index
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent))
+
+import pandas as pd
+
+from config.settings import config
+from src.utils.id_index import MAX_LOAD, MIN_CAPACITY, ReviewIdIndex
+
+
+class FakeDatabase:
+    """iter_review_ids over an in-memory list of (updated_at, review_id) rows."""
+
+    def __init__(self, backend, rows):
+        self.backend = backend
+        self.rows = sorted(rows)
+        self.calls = []
+
+    def iter_review_ids(self, updated_after=None, page_size=2):
+        self.calls.append(updated_after)
+        rows = [row for row in self.rows if updated_after is None or row > tuple(updated_after)]
+        for start in range(0, len(rows), page_size):
+            yield [{'updated_at': updated_at, 'review_id': review_id} for updated_at, review_id in rows[start:start + page_size]]
+
+
+def test_add_and_membership(tmp_path):
+    index = ReviewIdIndex(tmp_path / 'index.bin')
+    assert index.add(['a', 'b', 'b']) == 2
+    assert index.add(['b', 'c']) == 1
+    assert len(index) == 3
+    assert 'a' in index and 'c' in index
+    assert 'd' not in index
+    index.close()
+
+
+def test_grows_past_max_load(tmp_path):
+    index = ReviewIdIndex(tmp_path / 'index.bin')
+    review_ids = [f'review-{n}' for n in range(int(MIN_CAPACITY * MAX_LOAD) + 100)]
+    index.add(review_ids[:10])
+    index.add(review_ids[10:])
+    assert index.capacity == MIN_CAPACITY * 2
+    assert len(index) == len(review_ids)
+    assert all(review_id in index for review_id in review_ids)
+    assert 'review-missing' not in index
+    index.close()
+
+
+def test_reopen_keeps_ids_and_watermark(tmp_path):
+    path = tmp_path / 'index.bin'
+    index = ReviewIdIndex(path)
+    index.add([f'review-{n}' for n in range(3000)])
+    index._set_watermark('sqlite:2025-01-01T00:00:00|review-9')
+    index.close()
+
+    reopened = ReviewIdIndex(path)
+    assert len(reopened) == 3000
+    assert reopened.capacity == MIN_CAPACITY * 2
+    assert reopened.watermark == 'sqlite:2025-01-01T00:00:00|review-9'
+    assert 'review-2999' in reopened
+    reopened.close()
+
+
+def test_corrupt_file_is_rebuilt(tmp_path):
+    path = tmp_path / 'index.bin'
+    path.write_bytes(b'not an index')
+    index = ReviewIdIndex(path)
+    assert len(index) == 0
+    assert index.capacity == MIN_CAPACITY
+    index.close()
+
+
+def test_union_with_sets(tmp_path):
+    index = ReviewIdIndex(tmp_path / 'index.bin')
+    index.add(['a'])
+    seen = {'b'}
+    union = index | seen
+    seen.add('c')
+    assert 'a' in union and 'b' in union
+    assert 'c' not in union  # plain sets are snapshotted
+    assert 'd' in ({'d'} | index)
+    index.close()
+
+
+def test_sync_resumes_from_watermark(tmp_path):
+    db = FakeDatabase('sqlite', [('2025-01-01', 'r1'), ('2025-01-01', 'r2'), ('2025-01-02', 'r3')])
+    index = ReviewIdIndex(tmp_path / 'index.bin')
+    assert index.sync(db) == 3
+    assert index.watermark == 'sqlite:2025-01-02|r3'
+
+    db.rows.append(('2025-01-03', 'r4'))
+    assert index.sync(db) == 1
+    assert db.calls[-1] == ('2025-01-02', 'r3')
+    assert 'r4' in index
+    index.close()
+
+
+def test_backend_switch_rebuilds(tmp_path):
+    index = ReviewIdIndex(tmp_path / 'index.bin')
+    index.sync(FakeDatabase('supabase', [('2025-01-01', 'old')]))
+    assert 'old' in index
+
+    assert index.sync(FakeDatabase('sqlite', [('2025-02-01', 'new')])) == 1
+    assert 'old' not in index
+    assert 'new' in index
+    assert index.watermark.startswith('sqlite:')
+    index.close()
+
+
+def test_csv_sync_reads_only_when_file_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'data_dir', tmp_path)
+    pd.DataFrame({'Review ID': ['r1', 'r2'], 'Reviewer Name': ['A', 'B']}).to_csv(
+        tmp_path / 'reviews_master_database.csv', index=False
+    )
+    index = ReviewIdIndex(tmp_path / 'index.bin')
+    assert index.sync() == 2
+    assert index.watermark.startswith('csv:')
+    assert index.sync() == 0
+    index.close()
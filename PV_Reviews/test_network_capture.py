@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for decoding review records from captured batchexecute payloads
+"""
+
+import json
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent))
+
+from src.collectors.network_capture import (
+    REVIEW_ID_PATTERN, ReviewPayloadDecoder, find_review_nodes, parse_batchexecute
+)
+from src.utils.sqlite_database import SQLiteReviewDatabase
+
+PLACE_ID = 'ChIJ0aBcDeFgHiJkLmNoPqRs'
+REVIEWS = [
+    ('ChdDSUhNMG9nS0VJQ0FnSUNhYWEQAQ', 'Asha', 5, '2 days ago', 'Lovely filter coffee and quick service.'),
+    ('ChdDSUhNMG9nS0VJQ0FnSUNiYmIQAQ', 'Ravi', 4, 'a week ago', 'Good meals, a little crowded at lunch.'),
+    ('ChdDSUhNMG9nS0VJQ0FnSUNjY2MQAQ', 'Meena', 3, '3 weeks ago', 'Average dosa, but the chutney was great.'),
+    ('ChdDSUhNMG9nS0VJQ0FnSUNkZGQQAQ', 'Karthik', 5, 'a month ago', 'Best sambar rice in the neighbourhood.'),
+]
+REPLIES = {
+    'Asha': 'Thank you so much, see you again soon!',
+    'Ravi': 'Sorry about the wait, we are adding more tables.',
+    'Meena': 'Thanks for the feedback on the dosa, Meena.'
+}
+
+
+def review_node(review_id, name, rating, time, text):
+    # Every review also carries the place ID, as the real payloads do
+    reply = [REPLIES[name], 1700000000] if name in REPLIES else None
+    return [review_id, [name, f'https://maps.example/{name}'], rating, time, [text], PLACE_ID,
+            ['https://lh3.googleusercontent.com/p/photo-' + name], reply]
+
+
+def batchexecute_body(reviews):
+    payload = json.dumps([[review_node(*review) for review in reviews], 'next-page-token'])
+    envelope = json.dumps([['wrb.fr', 'rpcid', payload, None, None, None, 'generic']])
+    return f")]}}'\n\n{len(envelope)}\n{envelope}\n"
+
+
+def dom_record(review_id, name, rating, time, text):
+    return {
+        'Review ID': review_id,
+        'Reviewer Name': name,
+        'Reviewer Profile URL': f'https://maps.example/{name}',
+        'Rating': f'{rating} out of 5 stars',
+        'Time': time,
+        # DOM text can carry the sub-ratings block after the review
+        'Review Text': f'{text}\nFood: 5/5',
+        'Is Local Guide': True,
+        'Dine In': True,
+        # The DOM reply section also holds its header
+        'Owner Reply Text': f'Response from the owner 2 days ago\n{REPLIES[name]}' if name in REPLIES else None
+    }
+
+
+def test_review_id_pattern_skips_place_ids():
+    assert REVIEW_ID_PATTERN.match(REVIEWS[0][0])
+    assert not REVIEW_ID_PATTERN.match(PLACE_ID)
+    assert not REVIEW_ID_PATTERN.match('Chicken biryani')
+
+
+def test_parse_batchexecute_unwraps_envelopes():
+    payloads = parse_batchexecute(batchexecute_body(REVIEWS[:1]))
+    assert len(payloads) == 1
+    assert payloads[0][1] == 'next-page-token'
+    assert parse_batchexecute('[1, 2]') == [[1, 2]]
+
+
+def test_find_review_nodes_isolates_each_review():
+    payload = parse_batchexecute(batchexecute_body(REVIEWS))[0]
+    nodes = find_review_nodes(payload)
+    assert set(nodes) == {review[0] for review in REVIEWS}
+    assert nodes[REVIEWS[1][0]][1][0] == 'Ravi'
+
+
+def test_find_review_nodes_returns_only_known_ids():
+    payload = parse_batchexecute(batchexecute_body(REVIEWS))[0]
+    nodes = find_review_nodes(payload, {REVIEWS[0][0]})
+    assert list(nodes) == [REVIEWS[0][0]]
+    # Other reviews still keep the known review's node from growing
+    assert nodes[REVIEWS[0][0]][1][0] == 'Asha'
+
+
+def test_calibrate_cross_check_and_decode():
+    decoder = ReviewPayloadDecoder(review[0] for review in REVIEWS)
+    assert decoder.feed(batchexecute_body(REVIEWS)) == len(REVIEWS)
+
+    sample = [dom_record(*review) for review in REVIEWS]
+    paths = decoder.calibrate(sample[::2])
+    assert {'Reviewer Name', 'Rating', 'Time', 'Review Text'} <= set(paths)
+    agreement = decoder.cross_check(sample[1::2])
+    assert agreement['Reviewer Name'] == 1.0
+    assert agreement['Review Text'] == 1.0
+
+    record = decoder.decode(REVIEWS[1][0])
+    assert record['Reviewer Name'] == 'Ravi'
+    assert record['Rating'] == '4 out of 5 stars'
+    assert record['Review Text'] == REVIEWS[1][4]
+    assert record['Images'] == ['https://lh3.googleusercontent.com/p/photo-Ravi']
+    # Fields the payload mapping cannot vouch for are left out, not guessed
+    for field in ('Is Local Guide', 'Dine In', 'Session', 'Price Range'):
+        assert field not in record
+    assert decoder.decode('unknown') is None
+
+
+def test_calibration_needs_agreement():
+    decoder = ReviewPayloadDecoder()
+    decoder.feed(batchexecute_body(REVIEWS))
+    sample = [dict(dom_record(*review), **{'Reviewer Name': f'Someone {n}'}) for n, review in enumerate(REVIEWS)]
+    assert 'Reviewer Name' not in decoder.calibrate(sample)
+
+
+def test_decoded_owner_reply_keeps_review_replied(tmp_path):
+    decoder = ReviewPayloadDecoder(review[0] for review in REVIEWS)
+    decoder.feed(batchexecute_body(REVIEWS))
+    sample = [dom_record(*review) for review in REVIEWS]
+    decoder.calibrate(sample[::2])
+    assert decoder.cross_check(sample[1::2])['Owner Reply Text'] == 1.0
+
+    replied, unreplied = decoder.decode(REVIEWS[1][0]), decoder.decode(REVIEWS[3][0])
+    assert replied['Owner Reply Text'] == REPLIES['Ravi']
+    assert unreplied['Owner Reply Text'] is None
+
+    db = SQLiteReviewDatabase(tmp_path / 'reviews.db')
+    db.save_reviews([replied, unreplied])
+    rows = {row['review_id']: row for row in db._query('SELECT review_id, has_response FROM reviews')}
+    db.close()
+    assert rows[REVIEWS[1][0]]['has_response'] is True
+    assert rows[REVIEWS[3][0]]['has_response'] is False
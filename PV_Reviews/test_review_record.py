@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for raw card parsing: build_review_record and the offline SnapshotParser
+"""
+
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent))
+
+from src.collectors.review_record import build_review_record, is_complete, parse_individual_ratings, parse_metadata
+from src.collectors.snapshot_parser import SnapshotParser, inner_text
+
+SAMPLE_HTML = Path(__file__).parent / 'Each Review Outer HTML.html'
+
+CARD_HTML = """
+<div>
+  <article>
+    <div class="noyJyc">
+      <div class="KuKPRc" data-review-id="ChdDSUhNMG9nS0VJQ0FnSUR0ZXN0EAE" data-listing-id="123"
+           data-share-review-url="https://maps.example/r1"></div>
+      <a class="PskQHd" jsname="xs1xe" aria-label="Link to reviewer profile" href="https://maps.example/u1">Asha R</a>
+      <div class="PROnRd vq72z">Local Guide · 42 reviews · 7 photos</div>
+      <span role="img" aria-label="4 out of 5 stars"></span>
+      <span class="KEfuhb">3 days ago</span>
+      <div class="gyKkFe JhRJje Fv38Af">Lovely <b>filter coffee</b>.<br>Will be back.</div>
+      <span class="PROnRd mpP9nc">Dine in</span>
+      <span class="PROnRd mpP9nc">Lunch</span>
+      <span class="PROnRd mpP9nc">₹200–400</span>
+      <div class="fjB0Xb">Food: 5/5 | Service: 4/5 | Atmosphere: 3/5</div>
+      <img class="T3g1hc" src="https://img.example/1.jpg">
+    </div>
+  </article>
+  <div class="UP87Yb">Thank you for visiting!<button>Edit</button></div>
+</div>
+<div class="noyJyc"><span class="KEfuhb">card without an ID</span></div>
+"""
+
+
+def test_build_review_record_parses_details():
+    record = build_review_record({
+        'review_id': 'r1',
+        'reviewer_name': 'Asha',
+        'reviewer_details': 'Local Guide · 42 reviews · 7 photos',
+        'rating': '4 out of 5 stars',
+        'review_text': 'Lovely',
+        'metadata': ['Dine in', 'Dinner', '₹200–400'],
+        'ratings_text': 'Food: 5/5 | Service: 4/5',
+        'images': None
+    })
+    assert record['Is Local Guide'] is True
+    assert (record['Review Count'], record['Photo Count']) == (42, 7)
+    assert (record['Dine In'], record['Session'], record['Price Range']) == (True, 'Dinner', '₹200–400')
+    assert (record['Food Rating'], record['Service Rating'], record['Atmosphere Rating']) == (5, 4, None)
+    assert record['Images'] == []
+    assert record['Owner Reply Text'] is None
+
+
+def test_build_review_record_defaults():
+    record = build_review_record({'review_id': 'r1', 'reviewer_name': 'Asha'})
+    assert record['Rating'] == 'No rating'
+    assert record['Is Local Guide'] is False
+    assert record['Review Count'] is None
+
+
+def test_parsers_handle_missing_input():
+    assert parse_metadata([None, '']) == (None, None, None)
+    assert parse_individual_ratings(None) == (None, None, None)
+
+
+def test_is_complete():
+    assert is_complete({'review_id': 'r1', 'reviewer_name': 'Asha'})
+    assert not is_complete({'review_id': 'r1', 'reviewer_name': ''})
+    assert not is_complete({'review_id': 'r1', 'reviewer_name': 'Asha', 'error': 'boom'})
+
+
+def test_snapshot_parser_reads_card_fields():
+    records = SnapshotParser().parse_html(CARD_HTML)
+    assert len(records) == 1  # the card without an ID is skipped
+    record = records[0]
+    assert record['Review ID'] == 'ChdDSUhNMG9nS0VJQ0FnSUR0ZXN0EAE'
+    assert record['Listing ID'] == '123'
+    assert record['Reviewer Name'] == 'Asha R'
+    assert record['Reviewer Profile URL'] == 'https://maps.example/u1'
+    assert record['Rating'] == '4 out of 5 stars'
+    assert record['Time'] == '3 days ago'
+    assert record['Review Text'] == 'Lovely filter coffee.\nWill be back.'
+    assert (record['Dine In'], record['Session'], record['Price Range']) == (True, 'Lunch', '₹200–400')
+    assert (record['Food Rating'], record['Service Rating'], record['Atmosphere Rating']) == (5, 4, 3)
+    assert record['Images'] == ['https://img.example/1.jpg']
+    assert record['Owner Reply Text'] == 'Thank you for visiting!'
+
+
+def test_snapshot_parser_reads_saved_sample():
+    records = SnapshotParser().parse_file(SAMPLE_HTML)
+    assert [record['Review ID'] for record in records] == ['ChdDSUhNMG9nS0VJQ0FnSUNfck5TbC1nRRAB']
+    assert records[0]['Rating'] == '5 out of 5 stars'
+    assert records[0]['Is Local Guide'] is True
+
+
+def test_inner_text_breaks_on_blocks():
+    from bs4 import BeautifulSoup
+    element = BeautifulSoup('<div>one <span>two</span><p>three</p>  four</div>', 'html.parser').div
+    assert inner_text(element) == 'one two\nthree\nfour'
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite review database backend
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent))
+
+import pytest
+
+from src.utils.database import PARTIAL_TEXT
+from src.utils.sqlite_database import SQLiteReviewDatabase
+
+
+def review(n, text=None, **fields):
+    return {
+        'Review ID': f'review-{n}',
+        'Listing ID': 'listing-1',
+        'Reviewer Name': f'Reviewer {n}',
+        'Rating': '4 out of 5 stars',
+        'Time': 'a week ago',
+        'Review Text': text or f'Review number {n}',
+        **fields
+    }
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = SQLiteReviewDatabase(tmp_path / 'reviews.db')
+    yield database
+    database.close()
+
+
+def stored(db, review_id):
+    return db._query('SELECT * FROM reviews WHERE review_id = ?', [review_id])[0]
+
+
+def test_save_new_and_unchanged(db):
+    assert db.save_reviews([review(1), review(2), {'Review ID': 'no-name'}]) == (2, 2)
+    assert db.last_save_stats['new'] == 2
+    assert sorted(db.last_saved_ids) == ['review-1', 'review-2']
+
+    assert db.save_reviews([review(1), review(2)]) == (0, 0)
+    assert db.last_save_stats['unchanged'] == 2
+    assert sorted(db.last_saved_ids) == ['review-1', 'review-2']
+
+
+def test_edit_resets_response(db):
+    db.save_reviews([review(1)])
+    db.mark_response_generated(['review-1'])
+    assert stored(db, 'review-1')['has_response'] is True
+
+    # Whitespace and the "More" tail are not edits
+    assert db.save_reviews([review(1, text='Review   number 1 … More')]) == (0, 0)
+
+    assert db.save_reviews([review(1, text='Review number 1, updated')]) == (1, 0)
+    assert db.last_save_stats['changed'] == 1
+    row = stored(db, 'review-1')
+    assert row['is_edited'] is True
+    assert row['has_response'] is False
+    assert row['review_text'] == 'Review number 1, updated'
+
+
+def test_owner_reply_is_not_an_edit(db):
+    db.save_reviews([review(1)])
+    db.save_reviews([review(1, **{'Owner Reply Text': 'Thank you!'})])
+    assert db.last_save_stats['reply_updated'] == 1
+    row = stored(db, 'review-1')
+    assert row['owner_reply_text'] == 'Thank you!'
+    assert row['has_response'] is True
+    assert not row['is_edited']
+
+
+def test_partial_text_keeps_stored_text(db):
+    db.save_reviews([review(1, text='The complete review text')])
+    db.save_reviews([review(1, text='The complete', **{PARTIAL_TEXT: True})])
+    assert db.last_save_stats['partial'] == 1
+    assert stored(db, 'review-1')['review_text'] == 'The complete review text'
+
+    db.save_reviews([review(2, text='Cut short … More')])
+    assert stored(db, 'review-2')['content_hash'] is None
+    db.save_reviews([review(2, text='Cut short, now read in full')])
+    assert db.last_save_stats['backfilled'] == 1
+    assert stored(db, 'review-2')['content_hash']
+
+
+def test_failed_lookup_counts_as_failed(db, monkeypatch):
+    db.save_reviews([review(1)])
+    query = db._query
+
+    def flaky_query(sql, params=()):
+        if 'content_hash' in sql:
+            raise sqlite3.OperationalError('database is locked')
+        return query(sql, params)
+
+    monkeypatch.setattr(db, '_query', flaky_query)
+    assert db.save_reviews([review(1, text='Edited'), review(2)]) == (0, 0)
+    assert db.last_save_stats['failed'] == 2
+    assert db.last_saved_ids == []
+    monkeypatch.undo()
+    assert stored(db, 'review-1')['review_text'] == 'Review number 1'
+
+
+def test_responses_round_trip(db):
+    db.save_reviews([review(1), review(2)])
+    saved, failures = db.save_responses([
+        {'review_id': 'review-1', 'response_text': 'Thanks for visiting', 'sentiment': 'positive', 'issues': ''}
+    ])
+    assert (saved, failures) == (['review-1'], [])
+    assert [row['review_id'] for row in db.iter_unreplied_reviews()] == ['review-2']
+
+    pending = db.get_pending_responses()
+    assert len(pending) == 1
+    assert pending[0]['response_text'] == 'Thanks for visiting'
+    assert pending[0]['reviews']['reviewer_name'] == 'Reviewer 1'
+
+    assert db.mark_response_posted(['review-1']) == []
+    assert db.get_pending_responses() == []
+    assert db.get_run_summary()['responses_by_status'] == {'posted': 1}
+
+
+def test_keyset_paging(db):
+    db.save_reviews([review(n) for n in range(7)])
+    pages = list(db._iter_keyset('reviews', ('review_id',), 'created_at', {'has_response': False}, page_size=3))
+    review_ids = [row['review_id'] for row in pages]
+    assert sorted(review_ids) == [f'review-{n}' for n in range(7)]
+    assert len(set(review_ids)) == 7
+
+    limited = list(db._iter_keyset('reviews', ('review_id',), 'created_at', {'has_response': False}, limit=4, page_size=3))
+    assert [row['review_id'] for row in limited] == review_ids[:4]
+
+    # Replying while iterating neither skips nor repeats reviews
+    seen = []
+    for row in db._iter_keyset('reviews', ('review_id',), 'created_at', {'has_response': False}, page_size=2):
+        seen.append(row['review_id'])
+        db.mark_response_generated([row['review_id']])
+    assert seen == review_ids
+    assert list(db.iter_unreplied_reviews()) == []
+
+
+def test_iter_review_ids_pages(db):
+    db.save_reviews([review(n) for n in range(5)])
+    pages = list(db.iter_review_ids(page_size=2))
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert sorted(row['review_id'] for page in pages for row in page) == [f'review-{n}' for n in range(5)]
+
+    last = pages[1][-1]
+    rest = [row['review_id'] for page in db.iter_review_ids((last['updated_at'], last['review_id'])) for row in page]
+    assert rest == [pages[2][0]['review_id']]
+
+
+def test_close_folds_the_wal(tmp_path):
+    database = SQLiteReviewDatabase(tmp_path / 'reviews.db')
+    database.save_reviews([review(1)])
+    database.close()
+    assert [path.name for path in tmp_path.iterdir()] == ['reviews.db']